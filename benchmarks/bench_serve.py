@@ -0,0 +1,128 @@
+"""
+Load test for `serve`: latency (time to first byte + total) and throughput per
+concurrency level, against a server started as its own process:
+
+    python -m benchmarks.bench_serve --rows 1000 --clients 1,8,32,64 --requests 64
+    python -m benchmarks.bench_serve --url-port 8765      # an already running server
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+import numpy as np
+
+from src.server import Response, fetch
+
+SCHEMA = {
+    "domain": "bench",
+    "entity": "orders",
+    "fields": [
+        "entity_id",
+        {"name": "email", "pool_size": 50_000},
+        {"name": "city", "pool_size": 5_000},
+        {"name": "amount", "dtype": "money", "min_value": 1, "max_value": 5000},
+        "status",
+        "order_date",
+    ],
+}
+
+
+async def _wait_ready(port: int, timeout: float = 60.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            if (await fetch("127.0.0.1", port, "/health")).status == 200:
+                return
+        except OSError:
+            pass
+        if time.perf_counter() > deadline:
+            raise TimeoutError("server did not come up")
+        await asyncio.sleep(0.2)
+
+
+async def _level(port: int, target: str, clients: int, requests: int) -> List[Response]:
+    # `clients` connections in parallel until `requests` responses are in
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(target)
+    out: List[Response] = []
+
+    async def client() -> None:
+        while not queue.empty():
+            out.append(await fetch("127.0.0.1", port, queue.get_nowait()))
+
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return out
+
+
+def _ms(values: List[float], q: float) -> float:
+    return float(np.percentile(values, q) * 1000)
+
+
+async def _run(args: argparse.Namespace, port: int) -> None:
+    await _wait_ready(port)
+    target = f"/stream/{args.kind}?rows={args.rows}&format={args.format}" + (
+        "&source=S1" if args.kind == "polluted" else ""
+    )
+    await _level(port, target, 1, 2)  # first requests after startup
+
+    print(f"GET {target}")
+    print(f"{'clients':>7} {'req':>5} {'ttfb p50':>9} {'p95':>8} {'total p50':>10} {'p95':>8} {'p99':>8} {'req/s':>7} {'rows/s':>10} {'MB/s':>6}")
+    for clients in [int(c) for c in args.clients.split(",")]:
+        t = time.perf_counter()
+        res = await _level(port, target, clients, max(args.requests, clients))
+        wall = time.perf_counter() - t
+        assert all(r.status == 200 for r in res), {r.status for r in res}
+        rows = sum(r.body.count(b"\n") for r in res)
+        ttfb, total = [r.ttfb_s for r in res], [r.total_s for r in res]
+        print(
+            f"{clients:>7} {len(res):>5} {_ms(ttfb, 50):>7.1f}ms {_ms(ttfb, 95):>6.1f}ms {_ms(total, 50):>8.1f}ms "
+            f"{_ms(total, 95):>6.1f}ms {_ms(total, 99):>6.1f}ms {len(res) / wall:>7.1f} {rows / wall:>10,.0f} "
+            f"{sum(len(r.body) for r in res) / wall / 1e6:>6.1f}"
+        )
+    print("server /metrics:", json.dumps((await fetch("127.0.0.1", port, "/metrics")).json()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--kind", default="polluted", choices=["clean", "polluted", "integrated", "gold"])
+    parser.add_argument("--format", default="ndjson", choices=["ndjson", "csv"])
+    parser.add_argument("--rows", type=int, default=1000, help="rows (entities) per request")
+    parser.add_argument("--clients", default="1,8,32,64", help="concurrency levels")
+    parser.add_argument("--requests", type=int, default=64, help="requests per level")
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--url-port", type=int, default=0, help="use a running server on this port")
+    args = parser.parse_args()
+
+    if args.url_port:
+        asyncio.run(_run(args, args.url_port))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        schema_file = os.path.join(tmp, "schema.json")
+        with open(schema_file, "w", encoding="utf-8") as fh:
+            json.dump(SCHEMA, fh)
+        t = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "src.main", "serve", schema_file, "--port", str(args.port)],
+            stdout=subprocess.DEVNULL,
+        )
+        try:
+            asyncio.run(_wait_ready(args.port))
+            print(f"server ready after {time.perf_counter() - t:.2f}s (startup + warm-up, paid once)")
+            asyncio.run(_run(args, args.port))
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
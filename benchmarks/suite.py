@@ -0,0 +1,228 @@
+"""
+Benchmark suite for all pipeline phases (rows/s + peak memory per phase).
+
+    python -m benchmarks.suite --quick                       # small sweep
+    python -m benchmarks.suite --save benchmarks/baseline.json
+    python -m benchmarks.suite --compare benchmarks/baseline.json --threshold 0.15
+
+Postgres phases run only if DAPO_BENCH_PG_DSN (or --pg-dsn) points to a local instance.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import importlib.util
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.config import STRING_BACKENDS, GenerationConfig
+from src.etl import build_integrated, fill_nulls, integrate_sources, normalize_strings
+from src.generator import generate_clean
+from src.instrumentation import reset_rss_peak, rss_peak_mb
+from src.pollution import create_sources
+from src.quality import QualityTracker, compute_quality_metrics
+from src.schemas import DatasetSchema, FieldSchema
+from src.storage import save_csv_bundle, save_parquet_bundle, save_postgres_bundle
+
+# field mixes: numeric-heavy, the CLI default mix, text-heavy
+FIELD_MIXES: Dict[str, List[FieldSchema]] = {
+    "numeric": [
+        FieldSchema("entity_id", "id", pattern="E-{seq:08d}"),
+        FieldSchema("amount", "money", min_value=1, max_value=5000),
+        FieldSchema("qty", "int", min_value=1, max_value=50),
+        FieldSchema("score", "float"),
+        FieldSchema("status", "enum", values=["new", "ok", "error"]),
+    ],
+    "mixed": [
+        FieldSchema("entity_id", "id", pattern="E-{seq:08d}"),
+        FieldSchema("email", "email", pool_size=20_000),
+        FieldSchema("city", "city", pool_size=5_000),
+        FieldSchema("amount", "money", min_value=1, max_value=5000),
+        FieldSchema("status", "enum", values=["new", "ok", "error"]),
+        FieldSchema("order_date", "date"),
+    ],
+    "text": [
+        FieldSchema("entity_id", "id", pattern="E-{seq:08d}"),
+        *[FieldSchema(f"{dt}_{k}", dt, pool_size=10_000) for k in range(2) for dt in ("email", "city", "company", "sentence")],
+    ],
+}
+
+POLLUTION_LEVELS = {
+    "low": dict(missing_rate=0.01, typo_rate=0.01, outdated_rate=0.01, duplicate_rate=0.05),
+    "default": dict(),
+    "high": dict(missing_rate=0.10, typo_rate=0.10, outdated_rate=0.10, duplicate_rate=0.30),
+}
+
+SWEEPS = {
+    "quick": dict(rows=[20_000], n_sources=[3], mix=["mixed"], pollution=["default"]),
+    "default": dict(rows=[50_000, 200_000], n_sources=[3, 10], mix=list(FIELD_MIXES), pollution=["default", "high"]),
+    "full": dict(rows=[100_000, 1_000_000], n_sources=[3, 20], mix=list(FIELD_MIXES), pollution=list(POLLUTION_LEVELS)),
+}
+
+
+@dataclass
+class Result:
+    case: str
+    phase: str
+    rows: int
+    seconds: float
+    rows_per_s: float
+    peak_mb: float  # tracemalloc peak (Python/NumPy heap)
+    peak_rss_mb: Optional[float]  # process high-water mark during the phase (Linux only)
+
+
+def _measure(fn: Callable[[], object], repeat: int) -> Tuple[object, float, float, Optional[float]]:
+    # best-of-N wall time without tracing, then one traced run for peak memory
+    best = float("inf")
+    out = None
+    for _ in range(repeat):
+        gc.collect()
+        t = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t)
+
+    del out
+    gc.collect()
+    rss_ok = reset_rss_peak()
+    tracemalloc.start()
+    out = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return out, best, peak / 1024 / 1024, rss_peak_mb() if rss_ok else None
+
+
+def warm_up(mix: str, string_backend: str = "default") -> None:
+    # untimed: Faker/locale setup and lazy imports would otherwise land in the
+    # first generate_clean measurement of the mix
+    schema = DatasetSchema(domain="bench", entity="entities", fields=list(FIELD_MIXES[mix]))
+    generate_clean(schema, GenerationConfig(rows=1_000, string_backend=string_backend))
+
+
+def run_case(
+    rows: int, n_sources: int, mix: str, pollution: str, repeat: int, pg_dsn: str, string_backend: str = "default"
+) -> List[Result]:
+    case = f"rows={rows},sources={n_sources},mix={mix},pollution={pollution}"
+    if string_backend != "default":
+        case += f",strings={string_backend}"
+    schema = DatasetSchema(domain="bench", entity="entities", fields=list(FIELD_MIXES[mix]))
+    cfg = GenerationConfig(rows=rows, n_sources=n_sources, string_backend=string_backend, **POLLUTION_LEVELS[pollution])
+    results: List[Result] = []
+
+    def record(phase: str, fn: Callable[[], object], n_rows: int) -> object:
+        out, seconds, peak_mb, rss_mb = _measure(fn, repeat)
+        results.append(
+            Result(
+                case, phase, n_rows, round(seconds, 4), round(n_rows / seconds, 1), round(peak_mb, 2),
+                round(rss_mb, 1) if rss_mb is not None else None,
+            )
+        )
+        return out
+
+    clean = record("generate_clean", lambda: generate_clean(schema, cfg), rows)
+    # with a tracker, as main.run pollutes: the quality counts are collected on the way
+    trackers: List[QualityTracker] = []
+
+    def pollute():
+        trackers.append(QualityTracker())
+        return create_sources(schema, clean, cfg, tracker=trackers[-1])
+
+    srcs, gold = record("create_sources", pollute, rows * n_sources)
+    n_src_rows = sum(len(df) for df in srcs.values())
+
+    integrated = record("integrate_sources", lambda: integrate_sources(srcs, schema), n_src_rows)
+    normalized = record("normalize_strings", lambda: normalize_strings(integrated), n_src_rows)
+    record("fill_nulls", lambda: fill_nulls(normalized), n_src_rows)
+    # the chain as main.run executes it (in place, no intermediate copies)
+    integrated = record("integrate_etl", lambda: build_integrated(srcs, schema), n_src_rows)
+    tracker = trackers[-1]
+    quality_df, _ = record("quality", lambda: (tracker.to_frame(), tracker.columns_frame()), n_src_rows)
+    # reference only: the scan over the finished sources that main.run no longer uses
+    record("compute_quality_metrics_scan", lambda: compute_quality_metrics(srcs, schema.primary_entity_id), n_src_rows)
+
+    bundle_rows = n_src_rows + len(integrated) + len(gold)
+    with tempfile.TemporaryDirectory() as tmp:
+        record("save_csv_bundle", lambda: save_csv_bundle(tmp, srcs, integrated, gold, quality_df), bundle_rows)
+        if importlib.util.find_spec("pyarrow") is not None:
+            record(
+                "save_parquet_bundle",
+                lambda: save_parquet_bundle(tmp, srcs, integrated, gold, quality_df, schema=schema),
+                bundle_rows,
+            )
+    if pg_dsn:
+        record(
+            "save_postgres_bundle",
+            lambda: save_postgres_bundle(pg_dsn, srcs, integrated, gold, quality_df, schema=schema),
+            bundle_rows,
+        )
+    return results
+
+
+def compare(current: List[dict], baseline: List[dict], threshold: float) -> List[str]:
+    """Regressions: rows/s down or peak memory up by more than `threshold` (relative)."""
+    base = {(r["case"], r["phase"]): r for r in baseline}
+    problems = []
+    for r in current:
+        b = base.get((r["case"], r["phase"]))
+        if b is None:
+            continue
+        if r["rows_per_s"] < b["rows_per_s"] * (1 - threshold):
+            problems.append(
+                f"{r['phase']} [{r['case']}]: {r['rows_per_s']:,.0f} rows/s vs {b['rows_per_s']:,.0f} baseline"
+            )
+        if b["peak_mb"] > 1 and r["peak_mb"] > b["peak_mb"] * (1 + threshold):
+            problems.append(f"{r['phase']} [{r['case']}]: peak {r['peak_mb']:.1f} MB vs {b['peak_mb']:.1f} MB baseline")
+    return problems
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sweep", choices=list(SWEEPS), default="default")
+    parser.add_argument("--quick", action="store_true", help="shortcut for --sweep quick")
+    parser.add_argument("--repeat", type=int, default=1, help="timed runs per phase (best is kept)")
+    parser.add_argument("--pg-dsn", default=os.environ.get("DAPO_BENCH_PG_DSN", ""))
+    parser.add_argument("--string-backend", choices=list(STRING_BACKENDS), default="default")
+    parser.add_argument("--save", help="write results as JSON baseline")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative regression")
+    args = parser.parse_args(argv)
+
+    sweep = SWEEPS["quick" if args.quick else args.sweep]
+    results: List[Result] = []
+    for mix in sweep["mix"]:
+        warm_up(mix, args.string_backend)
+    for rows, n_sources, mix, pollution in itertools.product(
+        sweep["rows"], sweep["n_sources"], sweep["mix"], sweep["pollution"]
+    ):
+        for r in run_case(rows, n_sources, mix, pollution, args.repeat, args.pg_dsn, args.string_backend):
+            rss = f"{r.peak_rss_mb:>8.0f} MB RSS" if r.peak_rss_mb is not None else ""
+            print(f"{r.phase:<28} {r.case:<55} {r.rows_per_s:>14,.0f} rows/s {r.peak_mb:>10.1f} MB {rss}")
+            results.append(r)
+
+    payload = {
+        "meta": {"python": sys.version.split()[0], "platform": platform.platform(), "sweep": args.sweep},
+        "results": [asdict(r) for r in results],
+    }
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as fh:
+            json.dump(payload, fh, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            baseline = json.load(fh)["results"]
+        problems = compare(payload["results"], baseline, args.threshold)
+        for p in problems:
+            print(f"REGRESSION {p}")
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, fields, replace
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from .config import GenerationConfig
+from .generator import generate_clean
+from .instrumentation import RunRecorder
+from .pipeline import run_in_memory
+from .schemas import DatasetSchema, read_mapping_file
+
+BATCH_STORES = ("csv", "parquet")
+
+# batch runs are in memory and use the process pool across configs, not inside one
+_FIXED = {"chunk_size", "workers"}
+
+# (rows, seed, string_backend): everything in GenerationConfig that changes the clean base
+CleanKey = Tuple[int, int, str]
+
+# clean bases of the current batch, set once per worker process (inherited on fork)
+_CLEAN_BASES: Dict[CleanKey, pd.DataFrame] = {}
+
+
+def load_sweep(source: Union[str, Dict[str, Any]]) -> Tuple[Dict[str, Any], Dict[str, List[Any]]]:
+    """Sweep spec: {"base": {param: value}, "grid": {param: [values]}} (JSON/YAML file or dict)."""
+    data = read_mapping_file(source) if isinstance(source, str) else source
+    unknown = set(data) - {"base", "grid"}
+    if unknown:
+        raise ValueError(f"Unknown sweep keys {sorted(unknown)}; expected 'base' and 'grid'")
+    grid = {k: v if isinstance(v, list) else [v] for k, v in (data.get("grid") or {}).items()}
+    return dict(data.get("base") or {}), grid
+
+
+def expand_grid(base: Dict[str, Any], grid: Dict[str, List[Any]]) -> List[GenerationConfig]:
+    # cartesian product of the grid values on top of base (grid order = file order)
+    allowed = {f.name for f in fields(GenerationConfig)} - _FIXED
+    unknown = (set(base) | set(grid)) - allowed
+    if unknown:
+        raise ValueError(f"Unknown/unsupported config parameters {sorted(unknown)}; allowed: {sorted(allowed)}")
+    if "rows" not in base and "rows" not in grid:
+        raise ValueError("'rows' must be set in base or grid")
+
+    keys = list(grid)
+    return [GenerationConfig(**{**base, **dict(zip(keys, combo))}) for combo in itertools.product(*grid.values())]
+
+
+def _clean_key(cfg: GenerationConfig) -> CleanKey:
+    # besides the schema, the clean base depends on rows, seed and the string dtype;
+    # pollution params can share it
+    return cfg.rows, cfg.seed, cfg.string_backend
+
+
+def _init_worker(clean_bases: Dict[CleanKey, pd.DataFrame]) -> None:
+    global _CLEAN_BASES
+    _CLEAN_BASES = clean_bases
+
+
+def _run_one(
+    schema: DatasetSchema,
+    cfg: GenerationConfig,
+    run_folder: str,
+    store: str,
+    row_group_size: int,
+    partition_by_source: bool,
+) -> Dict[str, Any]:
+    rec = RunRecorder()
+    t0 = time.perf_counter()
+    quality_df = run_in_memory(
+        schema, cfg, run_folder, store, rec,
+        row_group_size=row_group_size, partition_by_source=partition_by_source,
+        clean=_CLEAN_BASES[_clean_key(cfg)],
+    )
+    seconds = time.perf_counter() - t0
+    rec.save(run_folder)
+    with open(os.path.join(run_folder, "config.json"), "w", encoding="utf-8") as fh:
+        json.dump(asdict(cfg), fh, indent=2)
+
+    phases = rec.to_frame().set_index("phase")["rows"]
+    return {
+        "source_rows": int(phases.get("sources_gold", 0)),
+        "integrated_rows": int(phases.get("integrate_etl", 0)),
+        # measured over all sources (the config rates are per-step probabilities)
+        "measured_missing_rate": round(float(quality_df["missing_rate"].mean()), 4),
+        "measured_duplicate_rate": round(float(quality_df["duplicate_rate"].mean()), 4),
+        "measured_typo_rate": round(float(quality_df["typo_rate"].mean()), 4),
+        "seconds": round(seconds, 3),
+    }
+
+
+def run_batch(
+    schema: DatasetSchema,
+    configs: List[GenerationConfig],
+    batch_folder: str,
+    store: str = "csv",
+    workers: int = 1,
+    row_group_size: int = 500_000,
+    partition_by_source: bool = False,
+    grid_keys: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """
+    Runs all configs in one process pool (warm workers: imports/Faker once per process).
+    Configs with the same rows, seed and string backend share one clean base. Writes one bundle per
+    config (<batch_folder>/run_000, ...) and an index (index.csv / index.json).
+    """
+    if store not in BATCH_STORES:
+        raise ValueError(f"batch store must be one of {BATCH_STORES}")
+    schema.validate()
+    configs = [replace(c, workers=1, chunk_size=None) for c in configs]
+
+    # shared clean bases, generated up front (block generation may use all workers)
+    clean_bases: Dict[CleanKey, pd.DataFrame] = {}
+    clean_seconds: Dict[CleanKey, float] = {}
+    for cfg in configs:
+        key = _clean_key(cfg)
+        if key not in clean_bases:
+            t0 = time.perf_counter()
+            clean_bases[key] = generate_clean(schema, replace(cfg, workers=workers))
+            clean_seconds[key] = round(time.perf_counter() - t0, 3)
+
+    folders = [os.path.join(batch_folder, f"run_{i:03d}") for i in range(len(configs))]
+    jobs = [(schema, cfg, folder, store, row_group_size, partition_by_source) for cfg, folder in zip(configs, folders)]
+
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(jobs)), initializer=_init_worker, initargs=(clean_bases,)
+        ) as pool:
+            futures = [pool.submit(_run_one, *job) for job in jobs]
+            results = [f.result() for f in futures]
+    else:
+        _init_worker(clean_bases)
+        try:
+            results = [_run_one(*job) for job in jobs]
+        finally:
+            _init_worker({})
+
+    keys = grid_keys or []
+    index = pd.DataFrame(
+        [
+            {
+                "run": os.path.basename(folder),
+                "path": folder,
+                **{k: getattr(cfg, k) for k in ["rows", "seed", "n_sources", *keys]},
+                "clean_base": "rows={}|seed={}|strings={}".format(*_clean_key(cfg)),
+                "clean_base_seconds": clean_seconds[_clean_key(cfg)],
+                **res,
+            }
+            for cfg, folder, res in zip(configs, folders, results)
+        ]
+    )
+
+    os.makedirs(batch_folder, exist_ok=True)
+    index.to_csv(os.path.join(batch_folder, "index.csv"), index=False)
+    index.to_json(os.path.join(batch_folder, "index.json"), orient="records", indent=2)
+    return index
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+
+def cache_dir() -> str:
+    return os.environ.get("DAPO_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "dapo_cli"))
+
+
+class ColumnCache:
+    """
+    Content-addressed on-disk cache for clean-base columns (one .npy per column).
+    The key is a hash over everything the column depends on; reads refresh the
+    file's mtime, and the oldest files are evicted once `max_bytes` is exceeded (LRU).
+    """
+
+    def __init__(self, max_bytes: int, root: Optional[str] = None) -> None:
+        self.root = root or os.path.join(cache_dir(), "columns")
+        self.max_bytes = max_bytes
+        os.makedirs(self.root, exist_ok=True)
+
+    @staticmethod
+    def key(parts: Dict[str, Any]) -> str:
+        blob = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.npy")
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        path = self._path(key)
+        try:
+            values = np.load(path, allow_pickle=False)
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass  # evicted by another run in the meantime; the loaded values are still fine
+        return values
+
+    def put(self, key: str, values: np.ndarray) -> None:
+        arr = np.asarray(values)
+        if arr.dtype == object:
+            arr = arr.astype(str)
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fh:
+            np.save(fh, arr, allow_pickle=False)
+        os.replace(tmp, path)
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for name in os.listdir(self.root):
+            if name.endswith(".npy"):
+                try:
+                    st = os.stat(os.path.join(self.root, name))
+                except FileNotFoundError:
+                    continue  # evicted by another run sharing the cache dir
+                entries.append((st.st_mtime, st.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.root, name))
+            except FileNotFoundError:
+                pass
+            total -= size
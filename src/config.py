@@ -1,6 +1,17 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+STRING_BACKENDS = ("default", "python", "arrow")
+DUPLICATE_CLUSTERS = ("fixed", "geometric", "zipf")
+DIVERGENCE_OPERATORS = ("typo", "abbreviate", "swap", "null", "space")
+CSV_COMPRESSIONS = ("none", "gzip", "zstd")
+FANOUTS = ("uniform", "fixed", "zipf")
+TYPO_ERRORS = ("insert", "delete", "transpose", "keyboard", "phonetic", "ocr")
+KEYBOARDS = ("qwertz", "azerty", "qwerty")
+# share of each error type among the typos (normalized, need not add up to 1)
+TYPO_WEIGHTS = {"insert": 0.15, "delete": 0.2, "transpose": 0.15, "keyboard": 0.3, "phonetic": 0.15, "ocr": 0.05}
 
 
 @dataclass
@@ -15,4 +26,45 @@ class GenerationConfig:
     outdated_rate: float = 0.03
     copy_rate: float = 0.20  # share of rows partially copied from previous source
 
-    seed: int = 42
\ No newline at end of file
+    # typos: error type per string drawn by weight (TYPO_ERRORS + registered ones),
+    # keyboard layout behind neighbouring-key errors
+    typo_weights: Dict[str, float] = field(default_factory=lambda: dict(TYPO_WEIGHTS))
+    typo_keyboard: str = "qwertz"
+
+    # duplicates: copies per duplicated record ("fixed": duplicate_cluster_size,
+    # "geometric": mean duplicate_cluster_size, "zipf": exponent duplicate_zipf_a),
+    # capped at duplicate_cluster_max; duplicate_rate stays the share of extra rows
+    duplicate_cluster: str = "fixed"
+    duplicate_cluster_size: float = 1.0
+    duplicate_zipf_a: float = 2.0
+    duplicate_cluster_max: int = 50
+    # share of cells changed in each copy, spread over the operators
+    duplicate_divergence: float = 0.4
+    duplicate_operators: Tuple[str, ...] = DIVERGENCE_OPERATORS
+
+    # history behind outdated values: snapshots incl. the current one (the clean base),
+    # share of rows per column that change between two snapshots
+    history_snapshots: int = 2
+    history_change_rate: float = 0.10
+
+    seed: int = 42
+
+    # streaming mode: rows per chunk (None = whole run in memory)
+    chunk_size: Optional[int] = None
+
+    # process pool size for generation + pollution (output does not depend on it)
+    workers: int = 1
+
+    # on-disk column cache for the clean base (generate_clean); size cap in MB
+    column_cache: bool = False
+    column_cache_max_mb: int = 2048
+
+    # text columns: "default" (as pandas infers), "python" (object) or
+    # "arrow" (Arrow-backed strings, enums as dictionary/categorical; needs pyarrow)
+    string_backend: str = "default"
+
+    def derive_seed(self, *key: int) -> int:
+        # independent, reproducible sub-stream for e.g. a chunk or a source
+        import numpy as np
+
+        return int(np.random.SeedSequence([self.seed, *key]).generate_state(1)[0])
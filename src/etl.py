@@ -1,24 +1,116 @@
 from __future__ import annotations
 
-from typing import Dict
+from typing import Dict, List, Optional
+
+import numpy as np
 import pandas as pd
+from pandas.api.types import union_categoricals
+
+from .overlay import SourceSet
+from .pollution import _is_text
+from .schemas import DatasetSchema, _norm_col
+
+# placeholder for missing text values in the integrated table
+FILL_VALUE = "UNKNOWN"
+
+
+def _string_columns(df: pd.DataFrame) -> List[str]:
+    return [c for c in df.columns if _is_text(df[c])]
+
+
+def normalize_strings(df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
+    # only string-typed columns; nulls stay nulls (no "None" strings)
+    out = df if inplace else df.copy()
+    for col in _string_columns(out):
+        s = out[col]
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            # strip the categories only, then merge the ones that became equal
+            stripped = s.cat.categories.str.strip()
+            if not stripped.equals(s.cat.categories):
+                codes, uniques = pd.factorize(stripped)
+                new = np.where(s.cat.codes.to_numpy() >= 0, codes[s.cat.codes.to_numpy()], -1)
+                out[col] = pd.Categorical.from_codes(new, categories=uniques)
+        else:
+            out[col] = s.str.strip()
+    return out
 
 
-def normalize_strings(df: pd.DataFrame) -> pd.DataFrame:
-    out = df.copy()
-    for col in out.select_dtypes(include="object").columns:
-        out[col] = out[col].astype(str).str.strip()
+def fill_nulls(df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
+    # text columns get a placeholder, typed (numeric) columns keep their nulls
+    out = df if inplace else df.copy()
+    for col in _string_columns(out):
+        s = out[col]
+        if s.isna().any():
+            if isinstance(s.dtype, pd.CategoricalDtype) and FILL_VALUE not in s.cat.categories:
+                s = s.cat.add_categories([FILL_VALUE])
+            out[col] = s.fillna(FILL_VALUE)
     return out
 
 
-def fill_nulls(df: pd.DataFrame) -> pd.DataFrame:
-    return df.fillna("UNKNOWN")
+def _canonical_columns(sources: Dict[str, pd.DataFrame], schema: Optional[DatasetSchema]) -> Dict[str, str]:
+    # normalized name -> canonical name (schema names first, then first-seen names)
+    canon: Dict[str, str] = {}
+    if schema is not None:
+        for f in schema.fields:
+            canon[_norm_col(f.name)] = f.name
+    for df in sources.values():
+        for c in df.columns:
+            canon.setdefault(_norm_col(c), c)
+    canon.pop(_norm_col("source"), None)
+    return canon
+
+
+def integrate_sources(sources: Dict[str, pd.DataFrame], schema: Optional[DatasetSchema] = None) -> pd.DataFrame:
+    """
+    Stacks all sources into one table in a single pass:
+    camelCase/UPPER columns are mapped back to the canonical (schema) names,
+    `source` is categorical, schema int fields become nullable Int64.
+    """
+    names = list(sources)
+    if isinstance(sources, SourceSet):
+        # overlays on one base: stack rows + patches, no per-source frames
+        stacked = sources.stacked()
+        lengths = [len(o) for o in sources.overlays.values()]
+        columns = {c: stacked[c] for c in stacked.columns}
+        if schema is not None:
+            for f in schema.fields:
+                if f.dtype.lower() == "int" and f.name in columns and pd.api.types.is_numeric_dtype(columns[f.name]):
+                    columns[f.name] = columns[f.name].astype("Int64")
+        codes = np.repeat(np.arange(len(names), dtype=np.int32), lengths)
+        columns["source"] = pd.Categorical.from_codes(codes, categories=names)
+        return pd.DataFrame(columns, copy=False)
+
+    lengths = [len(df) for df in sources.values()]
+    canon = _canonical_columns(sources, schema)
+    int_fields = {_norm_col(f.name) for f in schema.fields if f.dtype.lower() == "int"} if schema is not None else set()
+
+    lookups = [{_norm_col(c): c for c in df.columns} for df in sources.values()]
+
+    columns = {}
+    for norm, name in canon.items():
+        parts = []
+        for df, lookup, n in zip(sources.values(), lookups, lengths):
+            col = lookup.get(norm)
+            parts.append(df[col].reset_index(drop=True) if col is not None else pd.Series(np.nan, index=pd.RangeIndex(n)))
+        if len(parts) == 1:
+            col_data = parts[0]
+        elif all(isinstance(p.dtype, pd.CategoricalDtype) for p in parts):
+            col_data = pd.Series(union_categoricals(parts, ignore_order=True))
+        else:
+            col_data = pd.concat(parts, ignore_index=True)
+        if norm in int_fields and pd.api.types.is_numeric_dtype(col_data):
+            col_data = col_data.astype("Int64")
+        columns[name] = col_data
+
+    codes = np.repeat(np.arange(len(names), dtype=np.int32), lengths)
+    columns["source"] = pd.Categorical.from_codes(codes, categories=names)
+
+    return pd.DataFrame(columns, copy=False)
 
 
-def integrate_sources(sources: Dict[str, pd.DataFrame]) -> pd.DataFrame:
-    frames = []
-    for sname, df in sources.items():
-        tmp = df.copy()
-        tmp["source"] = sname
-        frames.append(tmp)
-    return pd.concat(frames, ignore_index=True, sort=False)
\ No newline at end of file
+def build_integrated(sources: Dict[str, pd.DataFrame], schema: Optional[DatasetSchema] = None) -> pd.DataFrame:
+    # integrate + minimal ETL without intermediate copies
+    integrated = integrate_sources(sources, schema)
+    normalize_strings(integrated, inplace=True)
+    fill_nulls(integrated, inplace=True)
+    return integrated
@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Set
+
+import numpy as np
+import pandas as pd
+
+from .etl import FILL_VALUE
+from .pollution import GoldStandard, _is_text, _pairs_within_groups
+from .schemas import DatasetSchema, _norm_col
+
+BLOCKING_METHODS = ("sorted", "token", "minhash")
+
+# Candidate pairs are handled as one int64 key per pair: i * n_rows + j (i < j).
+
+
+@dataclass
+class BlockingConfig:
+    window: int = 10  # sorted neighbourhood: rows compared after sorting by each field
+    max_block: int = 100  # token / LSH blocks larger than this are skipped (stop words, common values)
+    num_perm: int = 64  # MinHash signature length
+    bands: int = 16  # LSH bands (num_perm must be divisible by bands)
+    qgram: int = 3  # MinHash shingles (characters)
+    max_chars: int = 64  # MinHash: only the first N characters of a record are shingled
+    threshold: float = 0.5  # baseline matcher: share of equal fields for a match
+    workers: int = 1
+    seed: int = 42
+
+
+def normalize_field(s: pd.Series) -> pd.Series:
+    # lower-case, only letters/digits, single spaces; placeholder/empty -> NA
+    out = s.astype("string").str.lower().str.replace(r"[\W_]+", " ", regex=True).str.strip()
+    return out.mask(out.isin(["", FILL_VALUE.lower()]))
+
+
+def _key_columns(integrated: pd.DataFrame, gold: GoldStandard, schema: Optional[DatasetSchema]) -> Set[str]:
+    # The entity key is the gold label itself, other id/ref keys identify the entity as well:
+    # blocking or matching on them would score the ground truth against itself.
+    keys = {_norm_col(schema.primary_entity_id if schema is not None else "entity_id")}
+    if schema is not None:
+        keys.update(_norm_col(f.name) for f in schema.fields if f.dtype.lower() in ("id", "ref"))
+    # without a schema (or with renamed columns): whatever holds the gold labels (checked on a sample)
+    labels = pd.Index(gold.entity_labels.astype(str))
+    for c in integrated.columns:
+        values = integrated[c].dropna().iloc[:1000]
+        if _is_text(integrated[c]) and len(values) and values.astype(str).isin(labels).mean() > 0.5:
+            keys.add(_norm_col(c))
+    return keys
+
+
+def _blocking_fields(
+    integrated: pd.DataFrame,
+    fields: Optional[Sequence[str]],
+    gold: GoldStandard,
+    schema: Optional[DatasetSchema] = None,
+) -> List[str]:
+    if fields:
+        missing = [f for f in fields if f not in integrated.columns]
+        if missing:
+            raise ValueError(f"Unknown fields for blocking: {missing}. Available: {list(integrated.columns)}")
+        return list(fields)
+    keys = _key_columns(integrated, gold, schema)
+    return [
+        c for c in integrated.columns
+        if c not in ("record_id", "source") and _norm_col(c) not in keys and _is_text(integrated[c])
+    ]
+
+
+def _unique(keys: np.ndarray) -> np.ndarray:
+    # sort-based; np.unique's hash path is much slower for large int64 arrays
+    keys = np.sort(keys)
+    return keys[np.r_[True, keys[1:] != keys[:-1]]] if len(keys) else keys
+
+
+def _pair_keys(pairs: np.ndarray, n: int) -> np.ndarray:
+    lo = np.minimum(pairs[:, 0], pairs[:, 1]).astype(np.int64)
+    hi = np.maximum(pairs[:, 0], pairs[:, 1]).astype(np.int64)
+    keep = lo != hi
+    return _unique(lo[keep] * n + hi[keep])
+
+
+def _window_pairs(order: np.ndarray, window: int, n: int) -> np.ndarray:
+    # each row against the next window-1 rows in sort order
+    parts = [np.stack([order[:-d], order[d:]], axis=1) for d in range(1, min(window, len(order)))]
+    if not parts:
+        return np.empty(0, dtype=np.int64)
+    return _pair_keys(np.concatenate(parts), n)
+
+
+def _block_pairs(keys: np.ndarray, rows: np.ndarray, max_block: int, n: int) -> np.ndarray:
+    # all pairs of rows sharing a key (blocks of 2..max_block rows)
+    order = np.lexsort((rows, keys))
+    keys, rows = keys[order], rows[order]
+    if len(keys) == 0:
+        return np.empty(0, dtype=np.int64)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    return _pair_keys(_pairs_within_groups(rows, starts, max_size=max_block), n)
+
+
+def _minhash_chunk(text: np.ndarray, params: np.ndarray, qgram: int) -> np.ndarray:
+    # text: fixed-width unicode array -> (rows, num_perm) MinHash signatures of its q-grams
+    n = len(text)
+    width = max(text.dtype.itemsize // 4, 1)
+    codes = text.view(np.uint32).reshape(n, width).astype(np.uint64)
+    lengths = np.char.str_len(text)
+
+    q = min(qgram, width)
+    grams = np.zeros((n, width - q + 1), dtype=np.uint64)
+    for k in range(q):
+        grams = (grams << np.uint64(21)) ^ codes[:, k:width - q + 1 + k]
+    # short strings: the whole string is one shingle
+    valid = np.arange(grams.shape[1]) < np.maximum(lengths - q + 1, 1)[:, None]
+
+    empty = np.iinfo(np.uint64).max
+    sig = np.empty((n, len(params)), dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for p, (a, b) in enumerate(params):
+            sig[:, p] = np.where(valid, grams * a + b, empty).min(axis=1)
+    return sig
+
+
+def _run_tasks(fn: Callable, jobs: List[tuple], workers: int) -> list:
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            futures = [pool.submit(fn, *job) for job in jobs]
+            return [f.result() for f in futures]
+    return [fn(*job) for job in jobs]
+
+
+def _merge(parts: List[np.ndarray]) -> np.ndarray:
+    return _unique(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+
+
+def sorted_neighbourhood(norm: Dict[str, pd.Series], cfg: BlockingConfig) -> np.ndarray:
+    """One pass per field: sort by the normalized value, pair rows within the window."""
+    n = len(next(iter(norm.values())))
+    jobs = []
+    for values in norm.values():
+        codes, _ = pd.factorize(values, sort=True)
+        rows = np.flatnonzero(codes >= 0)
+        order = rows[np.argsort(codes[rows], kind="stable")]
+        # split the pass into overlapping segments so it spreads over the workers
+        step = max(-(-len(order) // max(cfg.workers, 1)), cfg.window)
+        for start in range(0, len(order), step):
+            jobs.append((order[start:start + step + cfg.window - 1], cfg.window, n))
+    return _merge(_run_tasks(_window_pairs, jobs, cfg.workers))
+
+
+def token_blocking(norm: Dict[str, pd.Series], cfg: BlockingConfig) -> np.ndarray:
+    """Rows sharing a word token (in any field) form a block."""
+    n = len(next(iter(norm.values())))
+    tokens = pd.concat([s.str.split(" ") for s in norm.values()]).explode().dropna()
+    tokens = tokens[tokens != ""]
+    rows = tokens.index.to_numpy(dtype=np.int64)
+    keys, _ = pd.factorize(tokens.to_numpy())
+    return _partitioned_blocks(keys.astype(np.int64), rows, cfg, n)
+
+
+def minhash_lsh(norm: Dict[str, pd.Series], cfg: BlockingConfig) -> np.ndarray:
+    """MinHash over character q-grams of the whole record, LSH banding into buckets."""
+    if cfg.num_perm % cfg.bands:
+        raise ValueError("num_perm must be divisible by bands")
+    n = len(next(iter(norm.values())))
+    first, *rest = norm.values()
+    text = first.str.cat(rest, sep=" ", na_rep="").str.strip() if rest else first.fillna("")
+    rows = np.flatnonzero(text.str.len().to_numpy() > 0)
+    arr = text.to_numpy()[rows].astype(f"<U{cfg.max_chars}")
+
+    rng = np.random.default_rng(cfg.seed)
+    params = rng.integers(1, np.iinfo(np.int64).max, size=(cfg.num_perm, 2), dtype=np.int64).astype(np.uint64)
+    params[:, 0] |= np.uint64(1)  # odd multipliers
+
+    # bounded chunks: the q-gram matrix of a chunk is rows x max_chars x 8 bytes
+    chunk = max(min(-(-len(arr) // max(cfg.workers, 1)), 20_000), 1)
+    jobs = [(arr[i:i + chunk], params, cfg.qgram) for i in range(0, len(arr), chunk)]
+    parts = _run_tasks(_minhash_chunk, jobs, cfg.workers)
+    sig = np.concatenate(parts) if parts else np.empty((0, cfg.num_perm), dtype=np.uint64)
+
+    r = cfg.num_perm // cfg.bands
+    band_keys = []
+    with np.errstate(over="ignore"):
+        for b in range(cfg.bands):
+            key = np.full(len(sig), b, dtype=np.uint64)
+            for col in range(b * r, (b + 1) * r):
+                key = (key ^ sig[:, col]) * np.uint64(0x100000001B3)
+            band_keys.append(key)
+    keys = np.concatenate(band_keys).view(np.int64) if band_keys else np.empty(0, dtype=np.int64)
+    return _partitioned_blocks(keys, np.tile(rows, cfg.bands), cfg, n)
+
+
+def _partitioned_blocks(keys: np.ndarray, rows: np.ndarray, cfg: BlockingConfig, n: int) -> np.ndarray:
+    # blocks are independent: split them by key over the workers
+    parts = max(cfg.workers, 1)
+    part = keys % parts
+    jobs = [(keys[part == p], rows[part == p], cfg.max_block, n) for p in range(parts)]
+    return _merge(_run_tasks(_block_pairs, jobs, cfg.workers))
+
+
+_BLOCKERS: Dict[str, Callable[[Dict[str, pd.Series], BlockingConfig], np.ndarray]] = {
+    "sorted": sorted_neighbourhood,
+    "token": token_blocking,
+    "minhash": minhash_lsh,
+}
+
+
+def _entities(integrated: pd.DataFrame, gold: GoldStandard) -> np.ndarray:
+    # entity ordinal per integrated row (matched via record_id)
+    pos = pd.Index(gold.record_ids()).get_indexer(integrated["record_id"].astype(str))
+    if (pos < 0).any():
+        raise ValueError(f"{int((pos < 0).sum())} integrated records are missing in the gold standard")
+    return gold.entity_ordinals[pos]
+
+
+def _n_pairs_by_group(values: np.ndarray) -> int:
+    v = np.sort(values)
+    sizes = np.diff(np.r_[np.flatnonzero(np.r_[True, v[1:] != v[:-1]]), len(v)]) if len(v) else v
+    return int((sizes * (sizes - 1) // 2).sum())
+
+
+def _match_scores(codes: np.ndarray, keys: np.ndarray, n: int, batch: int = 1_000_000) -> np.ndarray:
+    # baseline matcher: share of fields with equal (non-null) normalized value
+    scores = np.empty(len(keys), dtype=np.float32)
+    for s in range(0, len(keys), batch):
+        i, j = np.divmod(keys[s:s + batch], n)
+        a, b = codes[i], codes[j]
+        scores[s:s + batch] = ((a == b) & (a >= 0)).mean(axis=1)
+    return scores
+
+
+def evaluate_blocking(
+    integrated: pd.DataFrame,
+    gold: GoldStandard,
+    methods: Sequence[str] = BLOCKING_METHODS,
+    fields: Optional[Sequence[str]] = None,
+    config: Optional[BlockingConfig] = None,
+    schema: Optional[DatasetSchema] = None,
+) -> pd.DataFrame:
+    """
+    Builds candidate pairs per blocking method and scores them against the gold standard:
+    - blocking: candidates, pair completeness (recall), pair quality (precision), reduction ratio
+    - baseline matcher on the candidates: precision / recall / F1
+    - throughput of candidate generation (rows/s, pairs/s)
+    Default fields: all text columns except the entity key and other id/ref columns.
+    """
+    cfg = config or BlockingConfig()
+    unknown = [m for m in methods if m not in _BLOCKERS]
+    if unknown:
+        raise ValueError(f"Unknown blocking method(s) {unknown}; choose from {list(_BLOCKERS)}")
+
+    integrated = integrated.reset_index(drop=True)
+    n = len(integrated)
+    entity = _entities(integrated, gold)
+    # true matches among the given rows (the table may be a subset of the gold standard)
+    n_true = gold.n_true_matches() if n == len(gold) else _n_pairs_by_group(entity)
+    all_pairs = n * (n - 1) // 2
+
+    cols = _blocking_fields(integrated, fields, gold, schema)
+    if not cols:
+        raise ValueError("No text fields to block on")
+    norm = {c: normalize_field(integrated[c]) for c in cols}
+    codes = np.stack([pd.factorize(s)[0] for s in norm.values()], axis=1).astype(np.int32)
+
+    rows = []
+    for method in methods:
+        t0 = time.perf_counter()
+        keys = _BLOCKERS[method](norm, cfg)
+        seconds = time.perf_counter() - t0
+
+        i, j = np.divmod(keys, n)
+        is_match = entity[i] == entity[j]
+        found = int(is_match.sum())
+        predicted = _match_scores(codes, keys, n) >= cfg.threshold
+        tp = int((predicted & is_match).sum())
+
+        precision = tp / int(predicted.sum()) if predicted.any() else 0.0
+        recall = tp / n_true if n_true else 0.0
+        rows.append(
+            {
+                "method": method,
+                "rows": n,
+                "candidates": len(keys),
+                "true_matches": n_true,
+                "found_matches": found,
+                "pair_completeness": round(found / n_true, 4) if n_true else 0.0,
+                "pair_quality": round(found / len(keys), 4) if len(keys) else 0.0,
+                "reduction_ratio": round(1 - len(keys) / all_pairs, 6) if all_pairs else 0.0,
+                "precision": round(precision, 4),
+                "recall": round(recall, 4),
+                "f1": round(2 * precision * recall / (precision + recall), 4) if precision + recall else 0.0,
+                "seconds": round(seconds, 3),
+                "rows_per_s": round(n / seconds, 1) if seconds > 0 else 0.0,
+                "pairs_per_s": round(len(keys) / seconds, 1) if seconds > 0 else 0.0,
+            }
+        )
+    return pd.DataFrame(rows)
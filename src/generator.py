@@ -1,91 +1,396 @@
 from __future__ import annotations
 
-import random
-from datetime import datetime, timedelta
-from typing import Any
+import re
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
 
+import numpy as np
+import faker
 import pandas as pd
 from faker import Faker
 
+from .cache import ColumnCache
 from .schemas import DatasetSchema, FieldSchema
-from .config import GenerationConfig
+from .config import FANOUTS, STRING_BACKENDS, GenerationConfig
+from .pools import POOL_DTYPES, get_pool
 
+LOCALES = ["de_DE", "en_US", "fr_FR"]
 
-def _rand_date(fake: Faker, start_days: int, end_days: int) -> str:
-    start = datetime.utcnow() + timedelta(days=start_days)
-    end = datetime.utcnow() + timedelta(days=end_days)
-    dt = fake.date_between(start_date=start.date(), end_date=end.date())
-    return dt.isoformat()
 
+@dataclass
+class ColumnContext:
+    # everything a column generator may use for one block of rows
+    start: int
+    stop: int
+    rng: np.random.Generator
+    fake: Faker
+    seed: int  # run seed (value pools are shared across blocks)
+    rows: int = 0  # rows of the whole table
 
-def _gen_value(fake: Faker, rnd: random.Random, field: FieldSchema, seq: int) -> Any:
-    t = field.dtype.lower()
+    @property
+    def n(self) -> int:
+        return self.stop - self.start
 
-    if t == "id":
-        pattern = field.pattern or "ID-{seq:08d}"
-        return pattern.format(seq=seq)
 
-    if t == "string":
-        return fake.word()
+ColumnGenerator = Callable[[ColumnContext], Sequence]
+GeneratorFactory = Callable[[FieldSchema], ColumnGenerator]
 
-    if t == "text":
-        return fake.text(max_nb_chars=80)
+_REGISTRY: Dict[str, GeneratorFactory] = {}
 
-    if t == "sentence":
-        return fake.sentence(nb_words=6)
 
-    if t == "email":
-        return fake.email()
+def register_generator(dtype: str) -> Callable[[GeneratorFactory], GeneratorFactory]:
+    """
+    Registers a column generator factory for `dtype`.
+    The factory is called once per field (parse params there) and returns a
+    function that produces the whole column for a ColumnContext.
+    Registering an existing dtype replaces the built-in generator.
+    """
 
-    if t == "phone":
-        return fake.phone_number()
+    def deco(factory: GeneratorFactory) -> GeneratorFactory:
+        _REGISTRY[dtype.lower()] = factory
+        return factory
 
-    if t == "city":
-        return fake.city()
+    return deco
 
-    if t == "company":
-        return fake.company()
 
-    if t == "date":
-        # default: last 365 days
-        return _rand_date(fake, start_days=-365, end_days=0)
+def _bounds(field: FieldSchema, default_min: float, default_max: float) -> Tuple[float, float]:
+    mn = field.min_value if field.min_value is not None else default_min
+    mx = field.max_value if field.max_value is not None else default_max
+    return mn, mx
 
-    if t == "int":
-        mn = int(field.min_value) if field.min_value is not None else 0
-        mx = int(field.max_value) if field.max_value is not None else 1000
-        return rnd.randint(mn, mx)
 
-    if t == "float":
-        mn = float(field.min_value) if field.min_value is not None else 0.0
-        mx = float(field.max_value) if field.max_value is not None else 1000.0
-        return round(rnd.uniform(mn, mx), 3)
+_ID_FAST = re.compile(r"([^{}]*)\{seq(?::(?:0(\d+))?d)?\}([^{}]*)")
 
-    if t in ("money",):
-        mn = float(field.min_value) if field.min_value is not None else 0.0
-        mx = float(field.max_value) if field.max_value is not None else 1000.0
-        return round(rnd.uniform(mn, mx), 2)
 
-    if t == "enum":
-        if not field.values:
-            return "unknown"
-        return rnd.choice(field.values)
+def _id_formatter(pattern: str) -> Callable[[np.ndarray], Sequence]:
+    # sequence numbers -> ids; "<prefix>{seq:0Nd}<suffix>" as zero-padded numpy strings
+    fast = _ID_FAST.fullmatch(pattern)
+    if fast:
+        prefix, width, suffix = fast.group(1), int(fast.group(2) or 0), fast.group(3)
 
-    # fallback
-    return fake.word()
+        def fmt(seq: np.ndarray) -> Sequence:
+            nums = np.char.zfill(np.asarray(seq).astype(str), width)
+            return np.char.add(np.char.add(prefix, nums), suffix)
 
+        return fmt
 
-def generate_clean(schema: DatasetSchema, config: GenerationConfig) -> pd.DataFrame:
+    return lambda seq: [pattern.format(seq=int(i)) for i in seq]
+
+
+@register_generator("id")
+def _id_column(field: FieldSchema) -> ColumnGenerator:
+    fmt = _id_formatter(field.pattern or "ID-{seq:08d}")
+    return lambda ctx: fmt(np.arange(ctx.start, ctx.stop))
+
+
+def _coprime_step(n: int) -> int:
+    # step near n / golden ratio with gcd 1: rank -> (rank * step) % n is a permutation
+    step = max(1, int(n * 0.618))
+    while np.gcd(step, n) != 1:
+        step += 1
+    return step
+
+
+@register_generator("ref")
+def _ref_column(field: FieldSchema) -> ColumnGenerator:
+    """
+    Foreign key: a parent ordinal per row, formatted with the parent's id pattern,
+    so no parent rows are looked up. max_value = number of parents.
+    fanout "uniform": random parent (Poisson-like children per parent),
+    "fixed": rows spread evenly in parent order, "zipf": few parents with many children.
+    """
+    if field.max_value is None:
+        raise ValueError(f"ref field '{field.name}' needs the number of parents (max_value or a RelationalSchema)")
+    n_parents = max(1, int(field.max_value))
+    fanout = (field.fanout or "uniform").lower()
+    if fanout not in FANOUTS:
+        raise ValueError(f"fanout must be one of {FANOUTS}")
+    fmt = _id_formatter(field.pattern or "ID-{seq:08d}")
+
+    if fanout == "fixed":
+        return lambda ctx: fmt(np.arange(ctx.start, ctx.stop, dtype=np.int64) * n_parents // max(ctx.rows, 1))
+    if fanout == "uniform":
+        return lambda ctx: fmt(ctx.rng.integers(0, n_parents, size=ctx.n))
+
+    step = _coprime_step(n_parents)
+
+    def gen_zipf(ctx: ColumnContext) -> Sequence:
+        # rank r with P ~ 1 / (r + 1) via inverse CDF, ranks scattered over the parents
+        ranks = np.exp(ctx.rng.random(ctx.n) * np.log(n_parents + 1)).astype(np.int64) - 1
+        return fmt(np.minimum(ranks, n_parents - 1) * step % n_parents)
+
+    return gen_zipf
+
+
+@register_generator("int")
+def _int_column(field: FieldSchema) -> ColumnGenerator:
+    mn, mx = _bounds(field, 0, 1000)
+    mn, mx = int(mn), int(mx)
+    return lambda ctx: ctx.rng.integers(mn, mx + 1, size=ctx.n)
+
+
+@register_generator("float")
+def _float_column(field: FieldSchema) -> ColumnGenerator:
+    mn, mx = _bounds(field, 0.0, 1000.0)
+    return lambda ctx: np.round(ctx.rng.uniform(float(mn), float(mx), size=ctx.n), 3)
+
+
+@register_generator("money")
+def _money_column(field: FieldSchema) -> ColumnGenerator:
+    mn, mx = _bounds(field, 0.0, 1000.0)
+    return lambda ctx: np.round(ctx.rng.uniform(float(mn), float(mx), size=ctx.n), 2)
+
+
+@register_generator("enum")
+def _enum_column(field: FieldSchema) -> ColumnGenerator:
+    values = np.asarray(field.values or ["unknown"], dtype=object)
+    return lambda ctx: values[ctx.rng.integers(0, len(values), size=ctx.n)]
+
+
+@register_generator("date")
+def _date_column(field: FieldSchema) -> ColumnGenerator:
+    # default: last 365 days
+    def gen(ctx: ColumnContext) -> Sequence:
+        today = np.datetime64(datetime.utcnow().date(), "D")
+        return (today - ctx.rng.integers(0, 366, size=ctx.n)).astype(str)
+
+    return gen
+
+
+# Faker-backed dtypes: one Faker call per value, or pool sampling if pool_size is set
+_FAKER_CALLS: Dict[str, Callable[[Faker], str]] = {
+    "string": lambda fake: fake.word(),
+    "text": lambda fake: fake.text(max_nb_chars=80),
+    "sentence": lambda fake: fake.sentence(nb_words=6),
+    "email": lambda fake: fake.email(),
+    "phone": lambda fake: fake.phone_number(),
+    "city": lambda fake: fake.city(),
+    "company": lambda fake: fake.company(),
+}
+
+
+def _faker_factory(dtype: str) -> GeneratorFactory:
+    call = _FAKER_CALLS[dtype]
+
+    def factory(field: FieldSchema) -> ColumnGenerator:
+        if field.pool_size and dtype in POOL_DTYPES:
+            size = int(field.pool_size)
+
+            def gen_pool(ctx: ColumnContext) -> Sequence:
+                pool = _pool_for(dtype, call, ctx.seed, size)
+                return pool[ctx.rng.integers(0, len(pool), size=ctx.n)]
+
+            return gen_pool
+
+        return lambda ctx: [call(ctx.fake) for _ in range(ctx.n)]
+
+    return factory
+
+
+for _dtype in _FAKER_CALLS:
+    register_generator(_dtype)(_faker_factory(_dtype))
+
+
+def _pool_for(dtype: str, call: Callable[[Faker], str], seed: int, size: int) -> np.ndarray:
+    fake = None
+
+    def build(n: int) -> List[str]:
+        # Faker is only set up when the pool is not memoized / cached yet
+        nonlocal fake
+        if fake is None:
+            fake = Faker(LOCALES)
+            fake.seed_instance(seed)
+        return [call(fake) for _ in range(n)]
+
+    return get_pool(dtype, LOCALES, seed, size, build)
+
+
+def compile_schema(schema: DatasetSchema) -> List[Tuple[FieldSchema, ColumnGenerator]]:
+    # unknown dtypes fall back to "string"
+    return [(f, _REGISTRY.get(f.dtype.lower(), _REGISTRY["string"])(f)) for f in schema.fields]
+
+
+# Rows per generation block. Each block has its own seed (config seed + block
+# index), so the result is the same for any number of workers or chunk size.
+BLOCK_ROWS = 10_000
+
+_FAKER: Faker | None = None
+_PLANS: Dict[str, List[Tuple[FieldSchema, ColumnGenerator]]] = {}
+
+
+def _faker() -> Faker:
+    # one Faker per process; re-seeded per column and block
+    global _FAKER
+    if _FAKER is None:
+        _FAKER = Faker(LOCALES)
+    return _FAKER
+
+
+def _plan(schema: DatasetSchema) -> List[Tuple[FieldSchema, ColumnGenerator]]:
+    # compiled once per process (workers receive the schema, not the closures)
+    key = repr(schema.fields)
+    if key not in _PLANS:
+        _PLANS[key] = compile_schema(schema)
+    return _PLANS[key]
+
+
+def _field_key(field: FieldSchema) -> int:
+    # columns are seeded by name, so adding a field leaves the others unchanged
+    return zlib.crc32(field.name.encode("utf-8"))
+
+
+_NUMERIC_DTYPES = {"int", "float", "money"}
+
+
+def _arrow_string_dtype() -> pd.StringDtype:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as exc:  # optional dependency
+        raise ImportError("string_backend='arrow' requires pyarrow (pip install pyarrow)") from exc
+    try:
+        # NaN as missing value, like the default string dtype of pandas >= 3
+        return pd.StringDtype("pyarrow", na_value=np.nan)
+    except TypeError:  # pandas < 2.3
+        return pd.StringDtype("pyarrow")
+
+
+def apply_string_backend(df: pd.DataFrame, schema: DatasetSchema, backend: str) -> pd.DataFrame:
+    """Casts the text columns of a clean frame to the configured string backend (in place)."""
+    if backend == "default":
+        return df
+    if backend not in STRING_BACKENDS:
+        raise ValueError(f"string_backend must be one of {STRING_BACKENDS}")
+
+    text_dtype = object if backend == "python" else _arrow_string_dtype()
+    for f in schema.fields:
+        dtype = f.dtype.lower()
+        if f.name not in df.columns or dtype in _NUMERIC_DTYPES:
+            continue
+        if backend == "arrow" and dtype == "enum":
+            # few distinct values: codes + one dictionary (written as dictionary to Parquet)
+            df[f.name] = pd.Categorical(df[f.name], categories=list(dict.fromkeys(f.values or ["unknown"])))
+        else:
+            df[f.name] = df[f.name].astype(text_dtype)
+    return df
+
+
+def _generate_block(schema: DatasetSchema, config: GenerationConfig, block: int, block_rows: int) -> pd.DataFrame:
+    start = block * block_rows
+    stop = min(start + block_rows, config.rows)
+    fake = _faker()
+
+    columns = {}
+    for f, gen in _plan(schema):
+        seed = config.derive_seed(block, _field_key(f))
+        fake.seed_instance(seed)
+        ctx = ColumnContext(
+            start=start, stop=stop, rng=np.random.default_rng(seed), fake=fake, seed=config.seed, rows=config.rows
+        )
+        columns[f.name] = gen(ctx)
+
+    df = pd.DataFrame(columns, index=pd.RangeIndex(start, stop))
+    return apply_string_backend(df, schema, config.string_backend)
+
+
+def _iter_blocks(schema: DatasetSchema, config: GenerationConfig) -> Iterator[pd.DataFrame]:
+    block_rows = BLOCK_ROWS
+    n_blocks = -(-config.rows // block_rows)
+
+    if config.workers <= 1:
+        for b in range(n_blocks):
+            yield _generate_block(schema, config, b, block_rows)
+        return
+
+    # keep only a few blocks in flight so streaming runs stay bounded
+    window = 2 * config.workers
+    with ProcessPoolExecutor(max_workers=config.workers) as pool:
+        pending: deque = deque()
+        for b in range(n_blocks):
+            pending.append(pool.submit(_generate_block, schema, config, b, block_rows))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def iter_clean_chunks(
+    schema: DatasetSchema,
+    config: GenerationConfig,
+    chunk_size: int,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yields the clean base in chunks of `chunk_size` rows.
+    The index of each chunk is the global row number; concatenating all
+    chunks gives exactly the frame returned by generate_clean.
+    """
     schema.validate()
 
-    fake = Faker(["de_DE", "en_US", "fr_FR"])
-    Faker.seed(config.seed)
-    rnd = random.Random(config.seed)
+    buf = []
+    buffered = 0
+    for block in _iter_blocks(schema, config):
+        buf.append(block)
+        buffered += len(block)
+        while buffered >= chunk_size:
+            merged = pd.concat(buf) if len(buf) > 1 else buf[0]
+            yield merged.iloc[:chunk_size]
+            buf = [merged.iloc[chunk_size:]]
+            buffered -= chunk_size
+    if buffered:
+        yield pd.concat(buf) if len(buf) > 1 else buf[0]
+
 
-    rows = []
-    for i in range(config.rows):
-        row = {}
-        for f in schema.fields:
-            row[f.name] = _gen_value(fake, rnd, f, seq=i)
-        rows.append(row)
+# bump when a built-in generator (or the cached column format) changes its output
+CACHE_VERSION = 1
+
+
+def _column_key(field: FieldSchema, config: GenerationConfig) -> str:
+    # the generator code is part of the key: a dtype replaced via register_generator
+    # must not read the columns of the one before it
+    factory = _REGISTRY.get(field.dtype.lower(), _REGISTRY["string"])
+    parts = {
+        "version": CACHE_VERSION,
+        "generator": f"{factory.__module__}.{factory.__qualname__}",
+        "field": asdict(field),
+        "rows": config.rows,
+        "seed": config.seed,
+        "locales": LOCALES,
+        "block_rows": BLOCK_ROWS,
+        "faker": faker.VERSION,
+    }
+    if field.dtype.lower() == "date":
+        # dates are relative to today
+        parts["today"] = datetime.utcnow().date().isoformat()
+    return ColumnCache.key(parts)
+
+
+def _generate_cached(schema: DatasetSchema, config: GenerationConfig) -> pd.DataFrame:
+    # columns are seeded independently, so only missing/changed fields are generated
+    cache = ColumnCache(max_bytes=config.column_cache_max_mb * 1024 * 1024)
+    keys = {f.name: _column_key(f, config) for f in schema.fields}
+    columns = {name: cache.get(key) for name, key in keys.items()}
+
+    missing = [f for f in schema.fields if columns[f.name] is None]
+    if missing:
+        subset = DatasetSchema(schema.domain, schema.entity, missing, schema.primary_entity_id)
+        fresh = pd.concat(list(_iter_blocks(subset, config)))
+        for f in missing:
+            cache.put(keys[f.name], fresh[f.name].to_numpy())
+            columns[f.name] = fresh[f.name].to_numpy()
+
+    df = pd.DataFrame(columns, index=pd.RangeIndex(0, config.rows))
+    return apply_string_backend(df, schema, config.string_backend)
+
+
+def generate_clean(schema: DatasetSchema, config: GenerationConfig) -> pd.DataFrame:
+    if config.column_cache and config.rows > 0:
+        schema.validate()
+        return _generate_cached(schema, config)
 
-    return pd.DataFrame(rows)
\ No newline at end of file
+    chunks = list(iter_clean_chunks(schema, config, chunk_size=max(config.rows, 1)))
+    if not chunks:
+        return pd.DataFrame(columns=[f.name for f in schema.fields])
+    return chunks[0]
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import GenerationConfig
+from .overlay import SourceOverlay
+from .schemas import DatasetSchema, FieldSchema
+
+# (newer values, field, full current column, rng) -> older values of the same rows
+Evolver = Callable[[np.ndarray, FieldSchema, pd.Series, np.random.Generator], np.ndarray]
+
+_EVOLVERS: Dict[str, Evolver] = {}
+
+# dtypes that never change over time (entity keys, foreign keys)
+_STABLE_DTYPES = {"id", "ref"}
+
+_MAIL_DOMAINS = np.array(["gmail.com", "web.de", "gmx.de", "yahoo.com", "outlook.com", "t-online.de", "orange.fr"], dtype=object)
+
+
+def register_evolver(dtype: str) -> Callable[[Evolver], Evolver]:
+    """
+    Registers how values of `dtype` looked in an earlier snapshot.
+    Unregistered dtypes take another value of the same column.
+    """
+
+    def deco(fn: Evolver) -> Evolver:
+        _EVOLVERS[dtype.lower()] = fn
+        return fn
+
+    return deco
+
+
+def _other_value(values: np.ndarray, field: FieldSchema, column: pd.Series, rng: np.random.Generator) -> np.ndarray:
+    # e.g. the city before a move, the previous employer
+    return column.take(rng.integers(0, len(column), size=len(values))).to_numpy(dtype=object)
+
+
+@register_evolver("email")
+def _older_email(values: np.ndarray, field: FieldSchema, column: pd.Series, rng: np.random.Generator) -> np.ndarray:
+    # old provider, or the same provider with a numbered local part
+    s = pd.Series(values, dtype=object).astype(str)
+    parts = s.str.rsplit("@", n=1)
+    local, domain = parts.str[0], parts.str[1].fillna("")
+    switch = rng.random(len(s)) < 0.5
+    new_domain = np.where(switch, _MAIL_DOMAINS[rng.integers(0, len(_MAIL_DOMAINS), size=len(s))], domain)
+    suffix = np.where(switch, "", rng.integers(1, 100, size=len(s)).astype(str))
+    return (local + suffix + "@" + new_domain).to_numpy(dtype=object)
+
+
+@register_evolver("phone")
+def _older_phone(values: np.ndarray, field: FieldSchema, column: pd.Series, rng: np.random.Generator) -> np.ndarray:
+    # same prefix, other line number
+    s = pd.Series(values, dtype=object).astype(str)
+    digits = np.char.zfill(rng.integers(0, 10_000, size=len(s)).astype(str), 4)
+    return (s.str[:-4] + digits).to_numpy(dtype=object)
+
+
+@register_evolver("enum")
+def _older_enum(values: np.ndarray, field: FieldSchema, column: pd.Series, rng: np.random.Generator) -> np.ndarray:
+    # another state of the same enum
+    states = pd.Index(field.values or pd.unique(column.dropna()))
+    if len(states) < 2:
+        return np.asarray(values, dtype=object)
+    idx = states.get_indexer(np.asarray(values, dtype=object))
+    idx = np.where(idx < 0, 0, (idx + rng.integers(1, len(states), size=len(values))) % len(states))
+    return states.to_numpy(dtype=object)[idx]
+
+
+@register_evolver("int")
+def _older_int(values: np.ndarray, field: FieldSchema, column: pd.Series, rng: np.random.Generator) -> np.ndarray:
+    step = rng.integers(1, 6, size=len(values)) * rng.choice([-1, 1], size=len(values))
+    lo = field.min_value if field.min_value is not None else -np.inf
+    hi = field.max_value if field.max_value is not None else np.inf
+    return np.clip(np.asarray(values, dtype=np.int64) + step, lo, hi).astype(np.int64)
+
+
+def _older_amount(decimals: int) -> Evolver:
+    # prices/amounts were 2-15 % lower
+    def fn(values: np.ndarray, field: FieldSchema, column: pd.Series, rng: np.random.Generator) -> np.ndarray:
+        return np.round(np.asarray(values, dtype=float) / (1 + rng.uniform(0.02, 0.15, size=len(values))), decimals)
+
+    return fn
+
+
+register_evolver("money")(_older_amount(2))
+register_evolver("float")(_older_amount(3))
+
+
+@register_evolver("date")
+def _older_date(values: np.ndarray, field: FieldSchema, column: pd.Series, rng: np.random.Generator) -> np.ndarray:
+    days = np.asarray(values, dtype=object).astype("datetime64[D]")
+    return (days - rng.integers(1, 91, size=len(values))).astype(str).astype(object)
+
+
+@dataclass(eq=False)
+class History:
+    """
+    Snapshots 0 (oldest) .. n_snapshots - 1 (= the clean base). Older snapshots are
+    sparse per-column deltas: for each change, the sorted key row * n_snapshots + s
+    and the value the row had before snapshot s. Memory grows with the number of
+    changes, not with snapshots x rows. The clean base itself is not part of it.
+    """
+
+    n_snapshots: int
+    changes: Dict[str, Tuple[np.ndarray, np.ndarray]]
+
+    @property
+    def latest(self) -> int:
+        return self.n_snapshots - 1
+
+    def n_changes(self) -> int:
+        return sum(len(keys) for keys, _ in self.changes.values())
+
+    def cells_as_of(self, versions: np.ndarray) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """
+        Per column the rows that had another value as of snapshot versions[r],
+        and those values (clean base rows r = 0 .. len(versions) - 1).
+        """
+        cells: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        old_rows = np.flatnonzero(versions < self.latest)
+        if not len(old_rows):
+            return cells
+
+        n = self.n_snapshots
+        query = old_rows * n + versions[old_rows]
+        for col, (keys, values) in self.changes.items():
+            # first change after the requested snapshot holds the value as of then
+            k = np.searchsorted(keys, query, side="right")
+            hit = k < len(keys)
+            hit[hit] = keys[k[hit]] // n == old_rows[hit]
+            if hit.any():
+                cells[col] = (old_rows[hit], values[k[hit]])
+        return cells
+
+    def as_of(self, current: pd.DataFrame, versions: np.ndarray) -> Tuple[pd.DataFrame, Dict[str, int]]:
+        """
+        Copy of the clean base where row r is as of snapshot versions[r];
+        also returns the number of outdated (differing) cells per column.
+        """
+        view = SourceOverlay.from_frame(current)
+        outdated = apply_outdated(view, self.cells_as_of(versions))
+        return view.materialize(), outdated
+
+
+def apply_outdated(view: SourceOverlay, cells: Dict[str, Tuple[np.ndarray, np.ndarray]]) -> Dict[str, int]:
+    # patches the outdated values that differ from the current ones; returns counts per column
+    outdated: Dict[str, int] = {}
+    for col, (rows, old) in cells.items():
+        differs = view.get(col, rows) != old.astype(object)
+        view.set(col, rows[differs], old[differs])
+        outdated[col] = int(differs.sum())
+    return outdated
+
+
+def build_history(clean: pd.DataFrame, schema: DatasetSchema, config: GenerationConfig, seed: int) -> History:
+    """
+    Walks back from the clean base: between two snapshots, each evolving column
+    changes in `history_change_rate` of the rows (entity ids never change).
+    """
+    rng = np.random.default_rng(seed)
+    n_snapshots = max(1, int(config.history_snapshots))
+    fields = {f.name: f for f in schema.fields}
+    n = len(clean)
+
+    changes: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+    for col in clean.columns:
+        field = fields.get(col)
+        if field is None or col == schema.primary_entity_id or field.dtype.lower() in _STABLE_DTYPES:
+            continue
+        evolve = _EVOLVERS.get(field.dtype.lower(), _other_value)
+        column = clean[col]
+
+        keys, vals = [], []
+        # oldest value seen so far per changed row (sorted by row)
+        seen_rows, seen_vals = np.empty(0, dtype=np.int64), np.empty(0, dtype=object)
+        for s in range(n_snapshots - 1, 0, -1):
+            rows = np.flatnonzero(rng.random(n) < config.history_change_rate)
+            if not len(rows):
+                continue
+            newer = column.take(rows).to_numpy(dtype=object, copy=True)
+            if len(seen_rows):
+                k = np.minimum(np.searchsorted(seen_rows, rows), len(seen_rows) - 1)
+                again = seen_rows[k] == rows
+                newer[again] = seen_vals[k[again]]
+            nonnull = pd.notna(newer)
+            rows, newer = rows[nonnull], newer[nonnull]
+            older = evolve(newer, field, column, rng)
+
+            keys.append(rows * n_snapshots + s)
+            vals.append(np.asarray(older))
+
+            merged_rows = np.concatenate([rows, seen_rows])
+            merged_vals = np.concatenate([np.asarray(older, dtype=object), seen_vals])
+            order = np.argsort(merged_rows, kind="stable")
+            merged_rows, merged_vals = merged_rows[order], merged_vals[order]
+            first = np.r_[True, merged_rows[1:] != merged_rows[:-1]]
+            seen_rows, seen_vals = merged_rows[first], merged_vals[first]
+
+        if keys:
+            all_keys = np.concatenate(keys)
+            order = np.argsort(all_keys, kind="stable")
+            changes[col] = (all_keys[order], np.concatenate(vals)[order])
+
+    return History(n_snapshots=n_snapshots, changes=changes)
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import cProfile
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+
+@dataclass
+class PhaseMetrics:
+    phase: str
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    peak_rss_mb: Optional[float] = None
+    rows: int = 0
+    calls: int = 0  # >1 in streaming mode (one call per chunk)
+
+
+PhaseHook = Callable[[PhaseMetrics], None]
+
+_HOOKS: List[PhaseHook] = []
+
+
+def add_phase_hook(hook: PhaseHook) -> None:
+    """Registers a callback that receives a PhaseMetrics after every phase run (e.g. telemetry export)."""
+    _HOOKS.append(hook)
+
+
+def remove_phase_hook(hook: PhaseHook) -> None:
+    if hook in _HOOKS:
+        _HOOKS.remove(hook)
+
+
+def reset_rss_peak() -> bool:
+    # Linux: reset the VmHWM high-water mark so it covers only what follows
+    try:
+        with open("/proc/self/clear_refs", "w") as fh:
+            fh.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def rss_peak_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource  # not available on Windows
+
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss / 1024**2 if sys.platform == "darwin" else maxrss / 1024
+    except ImportError:
+        return None
+
+
+class RunRecorder:
+    """
+    Records wall time, CPU time, peak RSS and rows per pipeline phase.
+    Repeated phases (streaming chunks) are accumulated into one entry.
+    With profile_dir set, every phase also dumps a cProfile file and a
+    tracemalloc snapshot (<phase>.prof / <phase>.tracemalloc).
+    """
+
+    def __init__(self, profile_dir: Optional[str] = None) -> None:
+        self.phases: Dict[str, PhaseMetrics] = {}
+        self.profile_dir = profile_dir
+        self._profiles: Dict[str, cProfile.Profile] = {}
+
+    @contextmanager
+    def phase(self, name: str, rows: int = 0) -> Iterator[PhaseMetrics]:
+        run = PhaseMetrics(phase=name, rows=rows, calls=1)
+        profiler = None
+        if self.profile_dir:
+            profiler = self._profiles.setdefault(name, cProfile.Profile())
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            profiler.enable()
+
+        rss_reset = reset_rss_peak()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield run
+        finally:
+            run.wall_s = time.perf_counter() - wall
+            run.cpu_s = time.process_time() - cpu
+            peak = rss_peak_mb()
+            run.peak_rss_mb = round(peak, 1) if peak is not None else None
+
+            if profiler is not None:
+                profiler.disable()
+                self._dump_profile(name, profiler)
+
+            self._accumulate(run)
+            for hook in list(_HOOKS):
+                hook(run)
+
+    def _accumulate(self, run: PhaseMetrics) -> None:
+        total = self.phases.get(run.phase)
+        if total is None:
+            self.phases[run.phase] = PhaseMetrics(**asdict(run))
+            return
+        total.wall_s += run.wall_s
+        total.cpu_s += run.cpu_s
+        total.rows += run.rows
+        total.calls += run.calls
+        if run.peak_rss_mb is not None:
+            total.peak_rss_mb = max(total.peak_rss_mb or 0.0, run.peak_rss_mb)
+
+    def _dump_profile(self, name: str, profiler: cProfile.Profile) -> None:
+        os.makedirs(self.profile_dir, exist_ok=True)
+        profiler.dump_stats(os.path.join(self.profile_dir, f"{name}.prof"))
+        tracemalloc.take_snapshot().dump(os.path.join(self.profile_dir, f"{name}.tracemalloc"))
+
+    def to_frame(self) -> pd.DataFrame:
+        rows = []
+        for m in self.phases.values():
+            rec = asdict(m)
+            rec["wall_s"] = round(m.wall_s, 4)
+            rec["cpu_s"] = round(m.cpu_s, 4)
+            rec["rows_per_s"] = round(m.rows / m.wall_s, 1) if m.wall_s > 0 else None
+            rows.append(rec)
+        return pd.DataFrame(rows)
+
+    def save(self, out_dir: str) -> None:
+        """Writes run_metrics.json and run_metrics.csv into the bundle folder."""
+        os.makedirs(out_dir, exist_ok=True)
+        df = self.to_frame()
+        df.to_csv(os.path.join(out_dir, "run_metrics.csv"), index=False)
+        with open(os.path.join(out_dir, "run_metrics.json"), "w", encoding="utf-8") as fh:
+            json.dump(df.to_dict(orient="records"), fh, indent=2)
+        if self.profile_dir and tracemalloc.is_tracing():
+            tracemalloc.stop()
@@ -6,13 +6,11 @@ from datetime import datetime
 import typer
 from rich import print
 
-from .schemas import DatasetSchema, FieldSchema
-from .config import GenerationConfig
-from .generator import generate_clean
-from .pollution import create_sources
-from .etl import integrate_sources, normalize_strings, fill_nulls
-from .quality import compute_quality_metrics
-from .storage import save_csv_bundle, save_postgres_bundle
+from .schemas import DatasetSchema, RelationalSchema, field_from_name, load_schema
+from .config import CSV_COMPRESSIONS, DUPLICATE_CLUSTERS, KEYBOARDS, STRING_BACKENDS, GenerationConfig
+
+# pandas, Faker, SQLAlchemy & co. are imported inside the commands, only when a
+# run needs them: --help and the prompts stay fast (see tests/test_startup.py)
 
 app = typer.Typer(help="DaPo+-like synthetic test data generator.")
 
@@ -30,112 +28,235 @@ def run(
     rows: int = typer.Option(1000, help="Number of base entities"),
     sources: int = typer.Option(3, help="Number of heterogeneous sources"),
     out_dir: str = typer.Option("outputs", help="Output root folder"),
-    store: str = typer.Option("csv", help="csv | postgres | both"),
+    store: str = typer.Option("csv", help="csv | parquet | postgres | both"),
     pg_dsn: str = typer.Option("", help="Postgres DSN if store=postgres"),
     seed: int = typer.Option(42, help="Seed"),
+    chunk_size: int = typer.Option(0, help="Streaming mode: rows per chunk (0 = everything in memory)"),
+    workers: int = typer.Option(1, help="Processes for clean base generation and source pollution"),
+    pool_size: int = typer.Option(0, help="Sample text/email/city/... from K cached Faker values (0 = off)"),
+    row_group_size: int = typer.Option(500_000, help="Parquet: rows per row group"),
+    partition_by_source: bool = typer.Option(False, help="Parquet: partition integrated/gold by source"),
+    csv_compression: str = typer.Option("none", help="CSV files: none | gzip | zstd (needs zstandard)"),
+    csv_threads: int = typer.Option(1, help="CSV: files written/compressed at the same time"),
+    write_queue: int = typer.Option(2, help="Writes queued for the background writers (0 = write in the main thread)"),
+    column_cache: bool = typer.Option(False, help="Reuse unchanged clean-base columns from the on-disk cache"),
+    cache_max_mb: int = typer.Option(2048, help="Size cap of the column cache (LRU eviction)"),
+    duplicate_cluster: str = typer.Option("fixed", help="Copies per duplicated record: fixed | geometric | zipf"),
+    cluster_size: float = typer.Option(1.0, help="fixed: copies per duplicated record, geometric: mean copies"),
+    typo_weights: str = typer.Option("", help="Typo mix, e.g. keyboard=3,delete=1,phonetic=1 (unlisted errors off; default: built-in mix)"),
+    typo_keyboard: str = typer.Option("qwertz", help="Layout behind neighbouring-key typos: qwertz | azerty | qwerty"),
+    history_snapshots: int = typer.Option(2, help="Snapshots behind outdated values (incl. the current one)"),
+    string_backend: str = typer.Option("default", help="Text columns: default | python (object) | arrow (needs pyarrow)"),
+    profile: bool = typer.Option(False, help="Dump cProfile + tracemalloc snapshots per phase into <run>/profile"),
+    schema_file: str = typer.Option("", help="JSON/YAML schema file instead of the interactive prompts (several entities: \"entities\" list)"),
 ):
     print("[bold]DaPo CLI[/bold]")
 
-    domain = _ask(
-        "In welcher Branche / welchem Kontext bist du aktiv?",
-        "E-Commerce / Banking / HR / Health / Logistik / Medien/ etc.",
-    )
-    entity = _ask(
-        "Welche Art Daten willst du generieren (Entität)?",
-        "orders / transactions / applications / shipments / videos/ etc.",
+    if schema_file:
+        try:
+            schema = load_schema(schema_file)
+        except (ValueError, TypeError) as e:
+            raise typer.BadParameter(str(e))
+    else:
+        domain = _ask(
+            "In welcher Branche / welchem Kontext bist du aktiv?",
+            "E-Commerce / Banking / HR / Health / Logistik / Medien/ etc.",
+        )
+        entity = _ask(
+            "Welche Art Daten willst du generieren (Entität)?",
+            "orders / transactions / applications / shipments / videos/ etc.",
+        )
+
+        print("Welche Felder brauchst du? (kommagetrennt)")
+        print("Beispiel: entity_id,email,city,amount,status,order_date")
+        fields_raw = input("> ").strip()
+
+        field_names = [f.strip() for f in fields_raw.split(",") if f.strip()]
+        if not field_names:
+            field_names = ["entity_id", "email", "city", "amount", "status", "date"]
+
+        schema_fields = [field_from_name(fn, entity, pool_size=pool_size or None) for fn in field_names]
+
+        schema = DatasetSchema(domain=domain, entity=entity, fields=schema_fields, primary_entity_id="entity_id")
+        schema.validate()
+
+    cfg = GenerationConfig(
+        rows=rows, n_sources=sources, seed=seed, chunk_size=chunk_size or None, workers=workers,
+        column_cache=column_cache, column_cache_max_mb=cache_max_mb, string_backend=string_backend,
+        history_snapshots=history_snapshots, duplicate_cluster=duplicate_cluster, duplicate_cluster_size=cluster_size,
+        typo_keyboard=typo_keyboard,
     )
+    if typo_weights:
+        from .typos import TypoModel, parse_typo_weights
 
-    print("Welche Felder brauchst du? (kommagetrennt)")
-    print("Beispiel: entity_id,email,city,amount,status,order_date")
-    fields_raw = input("> ").strip()
-
-    # Minimal “intelligence”: map common field names to types
-    # If unknown => string
-    def infer_dtype(name: str) -> str:
-        n = name.lower()
-        if "id" in n:
-            return "id"
-        if "email" in n:
-            return "email"
-        if "phone" in n or "tel" in n:
-            return "phone"
-        if "date" in n or "datum" in n or "time" in n:
-            return "date"
-        if "amount" in n or "price" in n or "betrag" in n or "kosten" in n:
-            return "money"
-        if "city" in n or "stadt" in n:
-            return "city"
-        if "status" in n:
-            return "enum"
-        if "company" in n or "firma" in n:
-            return "company"
-        if "title" in n or "titel" in n or "desc" in n:
-            return "sentence"
-        return "string"
-
-    field_names = [f.strip() for f in fields_raw.split(",") if f.strip()]
-    if not field_names:
-        field_names = ["entity_id", "email", "city", "amount", "status", "date"]
-
-    schema_fields = []
-    for fn in field_names:
-        dt = infer_dtype(fn)
-        if dt == "id":
-            schema_fields.append(FieldSchema(fn, "id", pattern=f"{entity.upper()}-{{seq:08d}}"))
-        elif dt == "enum":
-            schema_fields.append(FieldSchema(fn, "enum", values=["new", "ok", "error"]))
-        elif dt == "money":
-            schema_fields.append(FieldSchema(fn, "money", min_value=1, max_value=5000))
-        else:
-            schema_fields.append(FieldSchema(fn, dt))
-
-    schema = DatasetSchema(domain=domain, entity=entity, fields=schema_fields, primary_entity_id="entity_id")
-    schema.validate()
-
-    cfg = GenerationConfig(rows=rows, n_sources=sources, seed=seed)
-
-    # Phase 0: clean base
-    clean = generate_clean(schema, cfg)
-
-    # Phase 4-5: sources + gold standard
-    srcs, gold = create_sources(schema, clean, cfg)
-
-    # Phase 6: integrate + minimal ETL
-    integrated = integrate_sources(srcs)
-    integrated = normalize_strings(integrated)
-    integrated = fill_nulls(integrated)
-
-    # Quality metrics (Power BI-ready)
-    quality_df = compute_quality_metrics(srcs, schema.primary_entity_id)
+        try:
+            cfg.typo_weights = parse_typo_weights(typo_weights)
+            TypoModel.from_weights(cfg.typo_weights)
+        except ValueError as e:
+            raise typer.BadParameter(str(e))
 
     run_folder = os.path.join(out_dir, _run_id())
-    os.makedirs(run_folder, exist_ok=True)
 
-    if store == "csv":
-        save_csv_bundle(run_folder, srcs, integrated, gold, quality_df)
-        print(f"[bold green]Done[/bold green] -> {run_folder}")
-        return
+    if store not in ("csv", "parquet", "postgres", "both"):
+        raise typer.BadParameter("store must be csv, parquet, postgres or both")
+    if duplicate_cluster not in DUPLICATE_CLUSTERS:
+        raise typer.BadParameter(f"duplicate_cluster must be one of {', '.join(DUPLICATE_CLUSTERS)}")
+    if string_backend not in STRING_BACKENDS:
+        raise typer.BadParameter(f"string_backend must be one of {', '.join(STRING_BACKENDS)}")
+    if csv_compression not in CSV_COMPRESSIONS:
+        raise typer.BadParameter(f"csv_compression must be one of {', '.join(CSV_COMPRESSIONS)}")
+    if typo_keyboard not in KEYBOARDS:
+        raise typer.BadParameter(f"typo_keyboard must be one of {', '.join(KEYBOARDS)}")
+    if store in ("postgres", "both") and not pg_dsn:
+        raise typer.BadParameter(f"pg_dsn is required when store={store}")
 
-    if store == "postgres":
-        if not pg_dsn:
-            raise typer.BadParameter("pg_dsn is required when store=postgres")
-        save_postgres_bundle(pg_dsn, srcs, integrated, gold, quality_df)
-        print("[bold green]Done[/bold green] -> Postgres tables created")
-        return
-    
-    if store == "both":
-        # 1) always write CSV bundle
-        save_csv_bundle(run_folder, srcs, integrated, gold, quality_df)
-
-        # 2) also write to postgres
-        if not pg_dsn:
-            raise typer.BadParameter("pg_dsn is required when store=both")
-        save_postgres_bundle(pg_dsn, srcs, integrated, gold, quality_df)
+    from .instrumentation import RunRecorder
+    from .pipeline import run_entities, run_in_memory, run_streaming
+
+    rec = RunRecorder(profile_dir=os.path.join(run_folder, "profile") if profile else None)
 
+    if isinstance(schema, RelationalSchema):
+        run_fn = run_entities
+    else:
+        run_fn = run_streaming if cfg.chunk_size else run_in_memory
+    run_fn(
+        schema, cfg, run_folder, store, rec, pg_dsn, row_group_size, partition_by_source,
+        csv_compression=csv_compression, csv_threads=csv_threads, write_queue=write_queue,
+    )
+
+    # run metrics: always next to the bundle, additionally as table in Postgres
+    rec.save(run_folder)
+    if store in ("postgres", "both"):
+        from .storage import save_run_metrics_postgres
+
+        save_run_metrics_postgres(pg_dsn, rec.to_frame())
+
+    if store == "postgres":
+        print(f"[bold green]Done[/bold green] -> Postgres tables created (run metrics: {run_folder})")
+    elif store == "both":
         print(f"[bold green]Done[/bold green] -> CSV: {run_folder} | Postgres: tables created")
-        return
+    else:
+        print(f"[bold green]Done[/bold green] -> {run_folder}")
+
+
+@app.command()
+def evaluate(
+    run_folder: str = typer.Argument(..., help="Run folder with integrated + gold_standard (CSV or Parquet)"),
+    methods: str = typer.Option("sorted,token,minhash", help="Blocking methods: sorted,token,minhash"),
+    fields: str = typer.Option("", help="Fields to block/match on (comma-separated; default: all text fields except id/ref keys)"),
+    window: int = typer.Option(10, help="Sorted neighbourhood window"),
+    max_block: int = typer.Option(100, help="Skip token/LSH blocks with more rows than this"),
+    num_perm: int = typer.Option(64, help="MinHash signature length"),
+    bands: int = typer.Option(16, help="LSH bands"),
+    threshold: float = typer.Option(0.5, help="Baseline matcher: share of equal fields for a match"),
+    workers: int = typer.Option(1, help="Processes for candidate generation"),
+    schema_file: str = typer.Option("", help="Schema of the run: its id/ref columns are left out of the default fields"),
+):
+    """Scores blocking methods (+ a baseline matcher) of a run against its gold standard."""
+    from .evaluation import BlockingConfig, evaluate_blocking
+    from .storage import load_bundle
+
+    schema = None
+    if schema_file:
+        try:
+            schema = load_schema(schema_file)
+        except (ValueError, TypeError) as e:
+            raise typer.BadParameter(str(e))
+        if isinstance(schema, RelationalSchema):
+            # several entities: the run folder is <run>/<entity>
+            name = os.path.basename(os.path.normpath(run_folder))
+            schema = next((e for e in schema.entities if e.entity == name), None)
+            if schema is None:
+                raise typer.BadParameter(f"no entity '{name}' in {schema_file}; pass the entity's run folder")
+
+    integrated, gold = load_bundle(run_folder)
+    cfg = BlockingConfig(
+        window=window, max_block=max_block, num_perm=num_perm, bands=bands, threshold=threshold, workers=workers,
+    )
+    try:
+        result = evaluate_blocking(
+            integrated,
+            gold,
+            methods=[m.strip() for m in methods.split(",") if m.strip()],
+            fields=[f.strip() for f in fields.split(",") if f.strip()] or None,
+            config=cfg,
+            schema=schema,
+        )
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
+
+    result.to_csv(os.path.join(run_folder, "evaluation.csv"), index=False)
+    typer.echo(result.to_string(index=False))
+    print(f"[bold green]Done[/bold green] -> {os.path.join(run_folder, 'evaluation.csv')}")
+
+
+@app.command()
+def batch(
+    schema_file: str = typer.Argument(..., help="JSON/YAML schema file (domain, entity, fields, primary_entity_id)"),
+    sweep: str = typer.Option("", help='JSON/YAML sweep spec: {"base": {...}, "grid": {"typo_rate": [0.01, 0.05]}}'),
+    rows: int = typer.Option(1000, help="Number of base entities (unless set in the sweep)"),
+    sources: int = typer.Option(3, help="Number of heterogeneous sources (unless set in the sweep)"),
+    seed: int = typer.Option(42, help="Seed (unless set in the sweep)"),
+    out_dir: str = typer.Option("outputs", help="Output root folder"),
+    store: str = typer.Option("csv", help="csv | parquet"),
+    workers: int = typer.Option(1, help="Processes for the whole sweep"),
+    row_group_size: int = typer.Option(500_000, help="Parquet: rows per row group"),
+    partition_by_source: bool = typer.Option(False, help="Parquet: partition integrated/gold by source"),
+):
+    """Runs a grid of configs non-interactively: one bundle per config plus index.csv."""
+    if store not in ("csv", "parquet"):
+        raise typer.BadParameter("store must be csv or parquet for batch runs")
+    from .batch import expand_grid, load_sweep, run_batch
+
+    try:
+        schema = load_schema(schema_file)
+        if isinstance(schema, RelationalSchema):
+            raise ValueError("batch runs take single-entity schemas; use `run --schema-file` for several entities")
+        base, grid = load_sweep(sweep) if sweep else ({}, {})
+        configs = expand_grid({"rows": rows, "n_sources": sources, "seed": seed, **base}, grid)
+    except (ValueError, TypeError) as e:
+        raise typer.BadParameter(str(e))
+
+    batch_folder = os.path.join(out_dir, f"batch_{_run_id()}")
+    print(f"[bold]DaPo CLI[/bold] batch: {len(configs)} config(s), {workers} worker(s)")
+    index = run_batch(
+        schema, configs, batch_folder, store=store, workers=workers,
+        row_group_size=row_group_size, partition_by_source=partition_by_source, grid_keys=list(grid),
+    )
+    typer.echo(index.drop(columns=["path"]).to_string(index=False))
+    print(f"[bold green]Done[/bold green] -> {os.path.join(batch_folder, 'index.csv')}")
+
+
+@app.command()
+def serve(
+    schema_file: str = typer.Argument(..., help="JSON/YAML schema file (one entity or an \"entities\" list)"),
+    host: str = typer.Option("127.0.0.1", help="Interface to listen on"),
+    port: int = typer.Option(8765, help="Port"),
+    rows: int = typer.Option(1000, help="Default rows per request (multi-entity: rows of entities without own rows)"),
+    sources: int = typer.Option(3, help="Default number of sources"),
+    seed: int = typer.Option(42, help="Default seed"),
+    chunk_size: int = typer.Option(10_000, help="Default rows per generated (and streamed) chunk"),
+):
+    """Streams clean/polluted/integrated records and gold rows over HTTP (NDJSON/CSV) from a warm generator."""
+    import asyncio
+
+    from .server import RecordServer, serve as serve_records
+
+    try:
+        schema = load_schema(schema_file)
+    except (ValueError, TypeError) as e:
+        raise typer.BadParameter(str(e))
 
-    raise typer.BadParameter("store must be csv or postgres")
+    server = RecordServer(schema, GenerationConfig(rows=rows, n_sources=sources, seed=seed, chunk_size=chunk_size))
+    print("[bold]DaPo CLI[/bold] serve: warming up ...")
+    server.warm()
+    print(f"[bold green]Listening[/bold green] on http://{host}:{port}  (GET /stream/<clean|polluted|integrated|gold>, /metrics)")
+    try:
+        asyncio.run(serve_records(server, host, port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
 
 
 if __name__ == "__main__":
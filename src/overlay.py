@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass, field, replace
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_integer_dtype
+
+# polluted cells of one column: (sorted row positions in the source, values)
+Cells = Tuple[np.ndarray, np.ndarray]
+
+
+def _record_ids(source_name: str, ordinals: np.ndarray) -> np.ndarray:
+    # "<source>-<ordinal:09d>", built as one numpy string op
+    return np.char.add(f"{source_name}-", np.char.zfill(np.asarray(ordinals, dtype=np.int64).astype(str), 9))
+
+
+def _record_id_column(source_name: str, start: int, stop: int) -> pd.Series:
+    # same ids as a str column; with pyarrow about 4x faster than going through numpy strings
+    ordinals = np.arange(start, stop, dtype=np.int64)
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+    except ImportError:
+        return pd.Series(_record_ids(source_name, ordinals), dtype="str")
+    digits = pc.utf8_lpad(pc.cast(pa.array(ordinals), pa.string()), 9, "0")
+    return pd.Series(pc.binary_join_element_wise(f"{source_name}-", digits, ""), dtype="str")
+
+
+def _lookup(cells: Cells, pos: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # which of `pos` have a patched value, and the index of that value in the cells
+    cpos = cells[0]
+    if not len(cpos) or not len(pos):
+        return np.zeros(len(pos), dtype=bool), np.zeros(len(pos), dtype=np.int64)
+    k = np.minimum(np.searchsorted(cpos, pos), len(cpos) - 1)
+    return cpos[k] == pos, k
+
+
+def _patched_take(column: pd.Series, rows: np.ndarray, pos: np.ndarray, values: np.ndarray) -> pd.Series:
+    """
+    column.take(rows) with values at positions pos, as one take over the column
+    and the patch values appended to it (no per-cell assignment). The dtype is
+    widened where needed, like .loc assignment did.
+    """
+    column = column.reset_index(drop=True)
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        new = pd.Index(pd.unique(values[pd.notna(values)])).difference(column.cat.categories)
+        if len(new):
+            column = column.cat.add_categories(new)
+        patch = pd.Series(pd.Categorical(values, dtype=column.dtype))
+    elif isinstance(column.dtype, np.dtype) and column.dtype.kind in "iufb":
+        missing = pd.isna(values)
+        if missing.any():
+            if is_integer_dtype(column.dtype) or column.dtype.kind == "b":
+                column = column.astype(np.float64)
+            values = np.where(missing, np.nan, values)
+        patch = pd.Series(values.astype(column.dtype))
+    else:
+        patch = pd.Series(values, dtype=column.dtype)
+    idx = rows.copy()
+    idx[pos] = len(column) + np.arange(len(pos))
+    return pd.concat([column, patch], ignore_index=True).take(idx).reset_index(drop=True)
+
+
+@dataclass(eq=False)
+class SourceOverlay:
+    """
+    One source as a view on a shared base frame (canonical columns, index = entity
+    ordinal): the base row of every source row, the polluted cells as sparse
+    per-column patches and the source's own column names. Nothing is copied
+    until materialize() / to_frame().
+    """
+
+    base: Optional[pd.DataFrame]
+    rows: np.ndarray
+    names: Dict[str, str] = field(default_factory=dict)  # canonical -> local column name
+    cells: Dict[str, Cells] = field(default_factory=dict)
+    name: str = ""
+    record_offset: int = 0  # record_id of the first row
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, name: str = "") -> "SourceOverlay":
+        return cls(df, np.arange(len(df), dtype=np.int64), name=name)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def columns(self) -> List[str]:
+        return [self.names.get(c, c) for c in self.base.columns]
+
+    @property
+    def index(self) -> np.ndarray:
+        # entity ordinal per row
+        return self.base.index.to_numpy(dtype=np.int64)[self.rows]
+
+    def n_cells(self) -> int:
+        return sum(len(p) for p, _ in self.cells.values())
+
+    def get(self, col: str, pos: np.ndarray) -> np.ndarray:
+        """Current values (object array) of column `col` at row positions `pos`."""
+        out = self.base[col].take(self.rows[pos]).to_numpy(dtype=object, copy=True)
+        if col in self.cells:
+            hit, k = _lookup(self.cells[col], pos)
+            out[hit] = self.cells[col][1][k[hit]]
+        return out
+
+    def set(self, col: str, pos: np.ndarray, values) -> None:
+        """Patches column `col` at row positions `pos`; later writes win."""
+        pos = np.asarray(pos, dtype=np.int64)
+        if not len(pos):
+            return
+        values = np.asarray(values, dtype=object)
+        if values.ndim == 0:
+            values = np.full(len(pos), values.item(), dtype=object)
+        if col in self.cells:
+            old_pos, old_values = self.cells[col]
+            pos, values = np.concatenate([old_pos, pos]), np.concatenate([old_values, values])
+        order = np.argsort(pos, kind="stable")
+        pos, values = pos[order], values[order]
+        last = np.r_[pos[1:] != pos[:-1], True]
+        self.cells[col] = (pos[last], values[last])
+
+    def isna(self, col: str) -> np.ndarray:
+        out = self.base[col].isna().to_numpy()[self.rows]
+        if col in self.cells:
+            pos, values = self.cells[col]
+            out[pos] = pd.isna(values)
+        return out
+
+    def take(self, pos: np.ndarray) -> "SourceOverlay":
+        """Rows at `pos` (repeats allowed, e.g. duplicates), still on the same base."""
+        pos = np.asarray(pos, dtype=np.int64)
+        cells: Dict[str, Cells] = {}
+        for col, c in self.cells.items():
+            hit, k = _lookup(c, pos)
+            if hit.any():
+                cells[col] = (np.flatnonzero(hit), c[1][k[hit]])
+        return SourceOverlay(self.base, self.rows[pos], dict(self.names), cells, self.name, self.record_offset)
+
+    @staticmethod
+    def concat(overlays: Sequence["SourceOverlay"]) -> "SourceOverlay":
+        """Stacks overlays of the same base (names, source name and record offset of the first)."""
+        first = overlays[0]
+        if any(o.base is not first.base for o in overlays):
+            raise ValueError("Overlays must share the same base frame.")
+        offsets = np.cumsum([0, *map(len, overlays)])
+        cells: Dict[str, Cells] = {}
+        for col in first.base.columns:
+            parts = [(o.cells[col][0] + off, o.cells[col][1]) for o, off in zip(overlays, offsets) if col in o.cells]
+            if parts:
+                cells[col] = (np.concatenate([p for p, _ in parts]), np.concatenate([v for _, v in parts]))
+        return SourceOverlay(
+            first.base, np.concatenate([o.rows for o in overlays]), dict(first.names), cells, first.name, first.record_offset
+        )
+
+    def append(self, other: "SourceOverlay") -> "SourceOverlay":
+        return SourceOverlay.concat([self, other])
+
+    def detach(self) -> "SourceOverlay":
+        # without the base, e.g. to send it back from a worker process
+        return replace(self, base=None)
+
+    def _columns(self) -> Dict[str, pd.Series]:
+        # patched columns with a RangeIndex (dtypes as in the base, widened where needed)
+        columns = {}
+        for col in self.base.columns:
+            if col in self.cells:
+                columns[col] = _patched_take(self.base[col], self.rows, *self.cells[col])
+            else:
+                columns[col] = self.base[col].take(self.rows).reset_index(drop=True)
+        return columns
+
+    def materialize(self) -> pd.DataFrame:
+        """Canonical column names, index = entity ordinal."""
+        df = pd.DataFrame(self._columns(), copy=False)
+        df.index = self.base.index[self.rows]
+        return df
+
+    def record_ids(self) -> pd.Series:
+        return _record_id_column(self.name, self.record_offset, self.record_offset + len(self))
+
+    def to_frame(self) -> pd.DataFrame:
+        """Export form: local column names, RangeIndex, record_id as last column."""
+        df = pd.DataFrame({self.names.get(c, c): s for c, s in self._columns().items()}, copy=False)
+        df["record_id"] = self.record_ids()
+        return df
+
+
+class SourceSet(Mapping):
+    """
+    The sources of one run (or chunk) by name, as overlays on one shared base.
+    Behaves like Dict[str, DataFrame]; each frame is built when it is accessed
+    and not kept, so exports hold one materialized source at a time.
+    """
+
+    def __init__(self, overlays: Dict[str, SourceOverlay]) -> None:
+        self.overlays = overlays
+
+    def __getitem__(self, name: str) -> pd.DataFrame:
+        return self.overlays[name].to_frame()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.overlays)
+
+    def __len__(self) -> int:
+        return len(self.overlays)
+
+    def n_rows(self) -> int:
+        return sum(len(o) for o in self.overlays.values())
+
+    def stacked(self) -> pd.DataFrame:
+        """All sources stacked (canonical names, RangeIndex) with record_id, without per-source frames."""
+        overlays = list(self.overlays.values())
+        stacked = SourceOverlay.concat(overlays)
+        df = pd.DataFrame(stacked._columns(), copy=False)
+        df["record_id"] = pd.concat([o.record_ids() for o in overlays], ignore_index=True)
+        return df
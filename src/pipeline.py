@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import os
+from dataclasses import replace
+from typing import List, Optional
+
+import pandas as pd
+
+from .config import GenerationConfig
+from .etl import build_integrated
+from .generator import generate_clean, iter_clean_chunks
+from .instrumentation import RunRecorder
+from .pollution import SourceBuilder, create_sources
+from .quality import QualityTracker
+from .schemas import DatasetSchema, RelationalSchema
+from .storage import BackgroundWriter, CsvBundleWriter, ParquetBundleWriter, PostgresBundleWriter
+
+
+def open_writers(
+    schema: DatasetSchema,
+    run_folder: str,
+    store: str,
+    pg_dsn: str = "",
+    row_group_size: int = 500_000,
+    partition_by_source: bool = False,
+    csv_compression: str = "none",
+    csv_threads: int = 1,
+    write_queue: int = 2,
+    table_prefix: str = "",
+) -> List:
+    """
+    Bundle writers for `store` ("both": CSV and Postgres). With write_queue > 0
+    each one writes on its own thread (at most write_queue writes pending), so
+    CSV and Postgres are written at the same time and while generation goes on.
+    """
+    writers = []
+    if store in ("csv", "both"):
+        writers.append(CsvBundleWriter(run_folder, csv_compression, csv_threads))
+    if store == "parquet":
+        writers.append(ParquetBundleWriter(run_folder, schema, row_group_size, partition_by_source))
+    if store in ("postgres", "both"):
+        writers.append(PostgresBundleWriter(pg_dsn, schema, prefix=table_prefix))
+    if write_queue > 0:
+        writers = [BackgroundWriter(w, write_queue) for w in writers]
+    return writers
+
+
+def _stop(writers: List) -> None:
+    # ends the writer threads, e.g. after an error in generation
+    for w in writers:
+        if isinstance(w, BackgroundWriter):
+            w.stop()
+
+
+def run_in_memory(
+    schema: DatasetSchema,
+    cfg: GenerationConfig,
+    run_folder: str,
+    store: str,
+    rec: RunRecorder,
+    pg_dsn: str = "",
+    row_group_size: int = 500_000,
+    partition_by_source: bool = False,
+    clean: Optional[pd.DataFrame] = None,
+    csv_compression: str = "none",
+    csv_threads: int = 1,
+    write_queue: int = 2,
+    table_prefix: str = "",
+) -> pd.DataFrame:
+    """
+    One run with everything in memory; returns the quality summary.
+    A prepared clean base can be passed in (batch runs share it across configs).
+    The sources are written while integration runs (see open_writers).
+    """
+    writers = open_writers(
+        schema, run_folder, store, pg_dsn, row_group_size, partition_by_source,
+        csv_compression, csv_threads, write_queue, table_prefix,
+    )
+    try:
+        # Phase 0: clean base
+        if clean is None:
+            with rec.phase("clean_base") as ph:
+                clean = generate_clean(schema, cfg)
+                ph.rows = len(clean)
+
+        # Phase 4-5: sources + gold standard
+        quality = QualityTracker()
+        with rec.phase("sources_gold") as ph:
+            srcs, gold = create_sources(schema, clean, cfg, tracker=quality)
+            ph.rows = len(gold)
+
+        with rec.phase("storage", rows=srcs.n_rows()):
+            for w in writers:
+                w.write_sources(srcs)
+
+        # Phase 6: integrate + minimal ETL
+        with rec.phase("integrate_etl") as ph:
+            integrated = build_integrated(srcs, schema)
+            ph.rows = len(integrated)
+
+        with rec.phase("storage", rows=len(integrated) + len(gold)):
+            for w in writers:
+                w.write_results(integrated, gold)
+
+        # Quality metrics (Power BI-ready), counted while polluting
+        with rec.phase("quality", rows=len(integrated)):
+            quality_df, quality_columns_df = quality.to_frame(), quality.columns_frame()
+
+        # waits for the queued writes
+        with rec.phase("storage"):
+            for w in writers:
+                w.close(quality_df, quality_columns_df)
+    finally:
+        _stop(writers)
+
+    return quality_df
+
+
+def run_streaming(
+    schema: DatasetSchema,
+    cfg: GenerationConfig,
+    run_folder: str,
+    store: str,
+    rec: RunRecorder,
+    pg_dsn: str = "",
+    row_group_size: int = 500_000,
+    partition_by_source: bool = False,
+    csv_compression: str = "none",
+    csv_threads: int = 1,
+    write_queue: int = 2,
+    table_prefix: str = "",
+) -> pd.DataFrame:
+    # generate -> pollute -> integrate -> append, one chunk at a time;
+    # duplicates may reach back into earlier chunks via a bounded reservoir.
+    # Chunk k is written in the background while chunk k + 1 is generated.
+    writers = open_writers(
+        schema, run_folder, store, pg_dsn, row_group_size, partition_by_source,
+        csv_compression, csv_threads, write_queue, table_prefix,
+    )
+    try:
+        return _stream_chunks(schema, cfg, rec, writers)
+    finally:
+        _stop(writers)
+
+
+def _stream_chunks(schema: DatasetSchema, cfg: GenerationConfig, rec: RunRecorder, writers: List) -> pd.DataFrame:
+    quality = QualityTracker()
+    with SourceBuilder(schema, cfg, reservoir_size=cfg.chunk_size, tracker=quality) as builder:
+        chunks = iter_clean_chunks(schema, cfg, cfg.chunk_size)
+
+        while True:
+            with rec.phase("clean_base") as ph:
+                clean = next(chunks, None)
+                ph.rows = len(clean) if clean is not None else 0
+            if clean is None:
+                break
+
+            with rec.phase("sources_gold") as ph:
+                srcs, gold = builder.process(clean)
+                ph.rows = len(gold)
+
+            with rec.phase("storage", rows=srcs.n_rows()):
+                for w in writers:
+                    w.write_sources(srcs)
+
+            with rec.phase("integrate_etl") as ph:
+                integrated = build_integrated(srcs, schema)
+                ph.rows = len(integrated)
+
+            with rec.phase("storage", rows=len(integrated) + len(gold)):
+                for w in writers:
+                    w.write_results(integrated, gold)
+
+    with rec.phase("quality"):
+        quality_df, quality_columns_df = quality.to_frame(), quality.columns_frame()
+
+    with rec.phase("storage"):
+        for w in writers:
+            w.close(quality_df, quality_columns_df)
+
+    return quality_df
+
+
+def entity_config(cfg: GenerationConfig, index: int, entity: DatasetSchema) -> GenerationConfig:
+    # first entity with the run seed, so a one-entity schema matches a plain run
+    return replace(cfg, rows=entity.rows, seed=cfg.seed if index == 0 else cfg.derive_seed(index))
+
+
+def run_entities(
+    schema: RelationalSchema,
+    cfg: GenerationConfig,
+    run_folder: str,
+    store: str,
+    rec: RunRecorder,
+    pg_dsn: str = "",
+    row_group_size: int = 500_000,
+    partition_by_source: bool = False,
+    **io_options,
+) -> pd.DataFrame:
+    """
+    Multi-entity run: parents before children, each entity as its own run
+    (in memory or streaming) into <run>/<entity>/ and <entity>_* tables.
+    Foreign keys are generated from the parent's key pattern and row count,
+    so no entity waits on another's rows. Returns the quality summaries.
+    """
+    schema.bind(cfg.rows)
+    run_fn = run_streaming if cfg.chunk_size else run_in_memory
+    quality = []
+    for i, ent in enumerate(schema.entities):
+        q = run_fn(
+            ent, entity_config(cfg, i, ent), os.path.join(run_folder, ent.entity), store, rec, pg_dsn, row_group_size, partition_by_source,
+            table_prefix=f"{ent.entity.lower()}_", **io_options,
+        )
+        quality.append(q.assign(entity=ent.entity))
+    return pd.concat(quality, ignore_index=True)
@@ -1,171 +1,585 @@
 from __future__ import annotations
 
-import random
-from dataclasses import dataclass
-from typing import Dict, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
+import numpy as np
 import pandas as pd
+from pandas.api.types import union_categoricals
 
-from .config import GenerationConfig
-from .schemas import DatasetSchema
+from .config import DIVERGENCE_OPERATORS, DUPLICATE_CLUSTERS, GenerationConfig
+from .history import History, apply_outdated, build_history
+from .overlay import SourceOverlay, SourceSet, _record_ids
+from .quality import QualityTracker
+from .schemas import DatasetSchema, _norm_col
+from .typos import typo_model
 
+# per-column counters collected while polluting: {column: {counter: n}}
+Stats = Dict[str, Dict[str, int]]
 
-@dataclass
-class GoldStandard:
-    # maps each source record_id to the underlying entity_id
-    mapping: pd.DataFrame  # columns: source, record_id, entity_id
+
+def _bump(stats: Optional[Stats], col: str, counter: str, n: int) -> None:
+    if stats is not None and n:
+        per_col = stats.setdefault(col, {})
+        per_col[counter] = per_col.get(counter, 0) + int(n)
 
 
-def _typo(s: str, rnd: random.Random) -> str:
-    if not s:
-        return s
-    pos = rnd.randrange(0, len(s))
-    ch = chr(rnd.randrange(97, 123))
-    return s[:pos] + ch + s[pos + 1 :]
+def _pairs_within_groups(rows: np.ndarray, starts: np.ndarray, max_size: Optional[int] = None) -> np.ndarray:
+    # rows: grouped row numbers, starts: offset of each group -> all pairs inside a
+    # group (ascending rows give i < j), one vectorized step per distinct group size
+    sizes = np.diff(np.r_[starts, len(rows)]).astype(np.int64)
+    keep = sizes > 1 if max_size is None else (sizes > 1) & (sizes <= max_size)
+    parts = []
+    for m in np.unique(sizes[keep]):
+        block = rows[starts[sizes == m][:, None] + np.arange(m)]
+        a, b = np.triu_indices(m, 1)
+        parts.append(np.stack([block[:, a].ravel(), block[:, b].ravel()], axis=1))
+    if not parts:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.concatenate(parts)
 
 
-def build_history(clean: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
-    # Minimal history: t0 (old), t1 (new)
-    t0 = clean.copy()
-    t1 = clean.copy()
+@dataclass(eq=False)
+class GoldStandard:
+    """
+    Maps each source record to its true entity, stored as integer arrays
+    (one row per record, in source order = row order of the integrated table):
+    - source_codes: index into source_names
+    - record_ordinals: per-source record number (record_id = "S1-000000042")
+    - entity_ordinals: row number of the entity in the clean base
+    - entity_labels: entity_id per entity ordinal (index = ordinal)
+    The string table (`mapping`) is only built on export.
+    """
+
+    source_names: List[str]
+    source_codes: np.ndarray
+    record_ordinals: np.ndarray
+    entity_ordinals: np.ndarray
+    entity_labels: pd.Series
+
+    def __post_init__(self) -> None:
+        self._groups: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+
+    def __len__(self) -> int:
+        return len(self.entity_ordinals)
+
+    @classmethod
+    def from_mapping(cls, mapping: pd.DataFrame) -> "GoldStandard":
+        # inverse of `mapping`, e.g. for a gold_standard.csv of an earlier run
+        source_codes, source_names = pd.factorize(mapping["source"], sort=False)
+        record_ordinals = mapping["record_id"].astype(str).str.rsplit("-", n=1).str[1].astype(np.int64).to_numpy()
+        entity_ordinals, labels = pd.factorize(mapping["entity_id"], sort=False)
+        return cls(
+            source_names=[str(n) for n in source_names],
+            source_codes=source_codes.astype(np.int16),
+            record_ordinals=record_ordinals,
+            entity_ordinals=entity_ordinals.astype(np.int64),
+            entity_labels=pd.Series(labels),
+        )
+
+    @property
+    def mapping(self) -> pd.DataFrame:
+        # columns: source, record_id, entity_id (strings, built on demand)
+        return pd.DataFrame(
+            {
+                "source": pd.Categorical.from_codes(self.source_codes, categories=self.source_names),
+                "record_id": self.record_ids(),
+                "entity_id": self.entity_ids(),
+            }
+        )
 
-    # Slightly update first text-like column to enable outdated values
-    text_cols = [c for c in t1.columns if t1[c].dtype == "object" and c.lower() != "entity_id"]
-    if text_cols:
-        c0 = text_cols[0]
-        mask = (t1.index % 10 == 0)
-        t1.loc[mask, c0] = t1.loc[mask, c0].astype(str) + " (upd)"
-    return t0, t1
+    def record_ids(self, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        codes = self.source_codes if rows is None else self.source_codes[rows]
+        ordinals = self.record_ordinals if rows is None else self.record_ordinals[rows]
+        out = np.empty(len(codes), dtype=object)
+        for code, name in enumerate(self.source_names):
+            hit = codes == code
+            if hit.any():
+                out[hit] = _record_ids(name, ordinals[hit])
+        return out
+
+    def entity_ids(self, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        ordinals = self.entity_ordinals if rows is None else self.entity_ordinals[rows]
+        return self.entity_labels.to_numpy()[self.entity_labels.index.get_indexer(ordinals)]
+
+    def _entity_groups(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # rows sorted by entity (stable), plus start offset and ordinal of each entity
+        if self._groups is None:
+            order = np.argsort(self.entity_ordinals, kind="stable")
+            ordered = self.entity_ordinals[order]
+            starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]]) if len(order) else np.array([], dtype=np.int64)
+            self._groups = (order, starts, ordered[starts])
+        return self._groups
+
+    def records_for_entity(self, entity: Union[int, str]) -> np.ndarray:
+        """Rows (positions in this gold standard / the integrated table) of one entity (ordinal or entity_id)."""
+        if isinstance(entity, str):
+            hits = self.entity_labels.index[self.entity_labels.to_numpy() == entity]
+            if len(hits) == 0:
+                return np.array([], dtype=np.int64)
+            entity = int(hits[0])
+        order, starts, entities = self._entity_groups()
+        k = np.searchsorted(entities, entity)
+        if k == len(entities) or entities[k] != entity:
+            return np.array([], dtype=np.int64)
+        stop = starts[k + 1] if k + 1 < len(starts) else len(order)
+        return order[starts[k]:stop]
+
+    def true_match_pairs(self) -> np.ndarray:
+        """All (i, j) row pairs with i < j that belong to the same entity, shape (n_pairs, 2)."""
+        order, starts, _ = self._entity_groups()
+        return _pairs_within_groups(order, starts)
+
+    def n_true_matches(self) -> int:
+        _, starts, _ = self._entity_groups()
+        sizes = np.diff(np.r_[starts, len(self)])
+        return int((sizes * (sizes - 1) // 2).sum())
+
+
+def _is_text(s: pd.Series) -> bool:
+    # object (pandas < 3), the string dtype (pandas >= 3 / string_backend="arrow"),
+    # Arrow strings and categoricals of strings (arrow enums)
+    dtype = s.dtype
+    if dtype == object or isinstance(dtype, pd.StringDtype):
+        return True
+    if isinstance(dtype, pd.CategoricalDtype):
+        return _is_text(pd.Series(dtype.categories))
+    if isinstance(dtype, pd.ArrowDtype):
+        return dtype.kind in "OSU"
+    return False
+
+
+def _concat(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    # pd.concat, but categoricals with different categories stay categorical
+    out = pd.concat(frames)
+    for col in frames[0].columns:
+        parts = [f[col] for f in frames]
+        if all(isinstance(p.dtype, pd.CategoricalDtype) for p in parts) and not isinstance(out[col].dtype, pd.CategoricalDtype):
+            out[col] = union_categoricals(parts, ignore_order=True)
+    return out
 
 
-def _apply_schema_heterogeneity(df: pd.DataFrame, variant: str) -> pd.DataFrame:
-    out = df.copy()
+def _typo_cells(
+    src: SourceOverlay,
+    cells: List[Tuple[str, np.ndarray]],
+    rng: np.random.Generator,
+    cfg: GenerationConfig,
+    stats: Optional[Stats] = None,
+) -> None:
+    # One typo model call for the selected (column, positions) cells of all columns:
+    # the model has a fixed cost per call, so one call per source instead of per column.
+    cells = [(col, pos) for col, pos in cells if len(pos)]
+    if not cells:
+        return
+    model = typo_model(cfg)
+    out, kinds = model.apply(np.concatenate([src.get(col, pos) for col, pos in cells]), rng)
+    lo = 0
+    for col, pos in cells:
+        hi = lo + len(pos)
+        src.set(col, pos, out[lo:hi])
+        if stats is not None:
+            for error, n in model.counts(kinds[lo:hi]).items():
+                _bump(stats, col, "typos", n)
+                _bump(stats, col, f"typo_{error}", n)
+        lo = hi
+
+
+def _local_name(col: str, variant: str) -> str:
+    # schema heterogeneity: the column name as a source spells it
     if variant == "camel":
         # snake_case -> camelCase
-        def to_camel(c: str) -> str:
-            parts = c.split("_")
-            return parts[0] + "".join(p.title() for p in parts[1:])
-
-        out.columns = [to_camel(c) for c in out.columns]
-    elif variant == "upper":
-        out.columns = [c.upper() for c in out.columns]
+        parts = col.split("_")
+        return parts[0] + "".join(p.title() for p in parts[1:])
+    if variant == "upper":
+        return col.upper()
     # else: keep snake
-    return out
+    return col
 
 
-def _pollute_values(df: pd.DataFrame, cfg: GenerationConfig, rnd: random.Random) -> pd.DataFrame:
-    out = df.copy()
+def _pollute_values(
+    src: SourceOverlay,
+    cfg: GenerationConfig,
+    rng: np.random.Generator,
+    stats: Optional[Stats] = None,
+) -> None:
+    # missing values + typos, written into the overlay
+    n = len(src)
+    typo_cells = []
 
-    for col in out.columns:
+    for col in src.base.columns:
         # missing
-        m_mask = out.index.to_series().apply(lambda _: rnd.random() < cfg.missing_rate)
-        out.loc[m_mask, col] = None
-
-        # typos only on strings
-        if out[col].dtype == "object":
-            t_mask = out.index.to_series().apply(lambda _: rnd.random() < cfg.typo_rate)
-            out.loc[t_mask, col] = out.loc[t_mask, col].astype(str).apply(lambda x: _typo(x, rnd))
-
-    return out
-
-
-def _inject_duplicates(df: pd.DataFrame, cfg: GenerationConfig, rnd: random.Random) -> pd.DataFrame:
-    base = df.copy().reset_index(drop=True)
-    n_dup = int(len(base) * cfg.duplicate_rate)
+        m_mask = rng.random(n) < cfg.missing_rate
+        notna = ~src.isna(col)
+        _bump(stats, col, "missing_injected", (m_mask & notna).sum())
+        src.set(col, np.flatnonzero(m_mask), None)
+        notna &= ~m_mask
+
+        # typos only on (non-null) strings
+        if _is_text(src.base[col]):
+            typo_cells.append((col, np.flatnonzero((rng.random(n) < cfg.typo_rate) & notna)))
+
+        _bump(stats, col, "missing_total", n - notna.sum())
+
+    _typo_cells(src, typo_cells, rng, cfg, stats)
+
+
+def _cluster_sizes(n_dup: int, cfg: GenerationConfig, rng: np.random.Generator) -> np.ndarray:
+    # copies per duplicated record, drawn until they add up to exactly n_dup
+    kind = cfg.duplicate_cluster
+    if kind == "fixed":
+        sizes = np.full(n_dup, max(1, int(round(cfg.duplicate_cluster_size))), dtype=np.int64)
+    elif kind == "geometric":
+        sizes = rng.geometric(1 / max(cfg.duplicate_cluster_size, 1.0), size=n_dup)
+    elif kind == "zipf":
+        if cfg.duplicate_zipf_a <= 1:
+            raise ValueError("duplicate_zipf_a must be > 1")
+        sizes = rng.zipf(cfg.duplicate_zipf_a, size=n_dup)
+    else:
+        raise ValueError(f"duplicate_cluster must be one of {DUPLICATE_CLUSTERS}")
+    # n_dup draws of size >= 1 always reach n_dup
+    sizes = np.minimum(sizes, max(1, cfg.duplicate_cluster_max))
+    k = int(np.searchsorted(np.cumsum(sizes), n_dup)) + 1
+    sizes = sizes[:k]
+    sizes[-1] -= int(sizes.sum()) - n_dup
+    return sizes
+
+
+def _abbreviate(values: np.ndarray) -> np.ndarray:
+    # "Port Andrew" -> "Port A.", single words -> "Mül."
+    s = pd.Series(values, dtype=object).astype(str)
+    multi = s.str.contains(" ", regex=False).to_numpy()
+    return np.where(multi, s.str.replace(r"(\S)\S*$", r"\1.", regex=True), s.str[:3] + ".")
+
+
+# cell operators for text columns (values of the selected, non-null cells -> new values);
+# "typo" cells are collected and go through _typo_cells in one call
+_CELL_OPERATORS = {
+    "abbreviate": lambda values, rng: _abbreviate(values),
+    "space": lambda values, rng: pd.Series(values, dtype=object).astype(str).to_numpy(dtype=object) + " ",
+}
+
+
+def _diverge(
+    dup: SourceOverlay,
+    cfg: GenerationConfig,
+    rng: np.random.Generator,
+    keep: Sequence[str] = (),
+    stats: Optional[Stats] = None,
+) -> None:
+    # Applies the divergence operators column-wise to the duplicate rows (in place).
+    # Each operator gets an equal share of duplicate_divergence.
+    ops = list(cfg.duplicate_operators)
+    unknown = set(ops) - set(DIVERGENCE_OPERATORS)
+    if unknown:
+        raise ValueError(f"Unknown duplicate operators {sorted(unknown)}; allowed: {DIVERGENCE_OPERATORS}")
+    if not ops:
+        return
+    n = len(dup)
+    p = cfg.duplicate_divergence / len(ops)
+    columns = [c for c in dup.base.columns if c not in keep]
+    text_cols = [c for c in columns if _is_text(dup.base[c])]
+
+    # field swaps: two different text columns of the same row trade values
+    if "swap" in ops and len(text_cols) > 1:
+        rows = np.flatnonzero(rng.random(n) < p)
+        a = rng.integers(0, len(text_cols), size=len(rows))
+        b = (a + rng.integers(1, len(text_cols), size=len(rows))) % len(text_cols)
+        values = np.stack([dup.get(c, rows) for c in text_cols], axis=1)
+        for j, col in enumerate(text_cols):
+            sel = (a == j) | (b == j)
+            new = np.where(a[sel] == j, values[sel, b[sel]], values[sel, a[sel]])
+            changed = pd.notna(values[sel, j]) | pd.notna(new)
+            if changed.any():
+                dup.set(col, rows[sel][changed], new[changed])
+                _bump(stats, col, "dup_divergence", changed.sum())
+
+    cell_ops = [op for op in ops if op != "swap"]
+    typo_cells = []
+    for col in columns:
+        text = col in text_cols
+        notna = ~dup.isna(col)
+        # one uniform draw per cell picks at most one operator
+        draw = rng.random(n)
+        for k, op in enumerate(cell_ops):
+            if op != "null" and not text:
+                continue
+            pos = np.flatnonzero((draw >= k * p) & (draw < (k + 1) * p) & notna)
+            if not len(pos):
+                continue
+            if op == "typo":
+                typo_cells.append((col, pos))
+            else:
+                dup.set(col, pos, None if op == "null" else _CELL_OPERATORS[op](dup.get(col, pos), rng))
+            _bump(stats, col, "dup_divergence", len(pos))
+    _typo_cells(dup, typo_cells, rng, cfg)
+
+
+def _inject_duplicates(
+    src: SourceOverlay,
+    cfg: GenerationConfig,
+    rng: np.random.Generator,
+    pool: Optional[SourceOverlay] = None,
+    stats: Optional[Stats] = None,
+    keep: Sequence[str] = (),
+) -> SourceOverlay:
+    """
+    Adds duplicate_rate * len(src) extra rows in clusters (several copies of one record),
+    each copy diverged by the configured operators. `keep` columns stay as they are.
+    Copies are base rows + their cells, so they still point to their entity.
+    """
+    n_dup = int(len(src) * cfg.duplicate_rate)
     if n_dup <= 0:
-        return base
-
-    dup = base.sample(n_dup, random_state=rnd.randint(0, 10_000)).copy()
+        return src
+
+    # pool: rows kept from earlier chunks, so duplicates can cross chunk boundaries
+    candidates = src if pool is None or not len(pool) else src.append(pool)
+    sizes = _cluster_sizes(n_dup, cfg, rng)
+    heads = rng.choice(len(candidates), size=len(sizes), replace=len(sizes) > len(candidates))
+    dup = candidates.take(np.repeat(heads, sizes))
+
+    _diverge(dup, cfg, rng, keep, stats)
+    for col in dup.base.columns:
+        # nulls carried over into (or injected in) the duplicate rows
+        _bump(stats, col, "missing_total", dup.isna(col).sum())
+    return src.append(dup)
+
+
+def _update_reservoir(
+    reservoir: Optional[SourceOverlay],
+    seen: int,
+    chunk: SourceOverlay,
+    size: int,
+    rng: np.random.Generator,
+) -> pd.DataFrame:
+    # Uniform sample of `size` rows over everything seen so far (algorithm R, batched).
+    # Kept materialized (canonical names, index = entity ordinal) for the next chunk.
+    held = len(reservoir) if reservoir is not None else 0
+    fill = min(size - held, len(chunk))
+    combined = chunk if reservoir is None else reservoir.append(chunk)
+
+    sel = np.arange(held + fill)
+    rest = np.arange(fill, len(chunk))
+    if len(rest):
+        slots = rng.integers(0, seen + rest + 1)
+        hit = slots < size
+        # if a slot is hit twice within the chunk, the later row wins
+        _, last = np.unique(slots[hit][::-1], return_index=True)
+        sel[slots[hit][::-1][last]] = held + rest[hit][::-1][last]
+    return combined.take(sel).materialize()
+
+
+_VARIANTS = ["snake", "camel", "upper"]
 
-    # small divergence
-    for col in dup.columns:
-        if dup[col].dtype == "object":
-            mask = dup.index.to_series().apply(lambda _: rnd.random() < 0.4)
-            dup.loc[mask, col] = dup.loc[mask, col].astype(str) + " "
-    return pd.concat([base, dup], ignore_index=True)
 
+@dataclass
+class _SourceResult:
+    overlay: SourceOverlay  # polluted rows incl. duplicates, detached from the shared base
+    n_duplicates: int
+    reservoir: Optional[pd.DataFrame]
+    seen: int
+    stats: Stats  # keyed by canonical (clean base) column names
+
+
+def _build_source(
+    base: pd.DataFrame,
+    n_rows: int,
+    history: History,
+    config: GenerationConfig,
+    i: int,
+    seed: int,
+    pool_rows: Optional[np.ndarray],
+    seen: int,
+    reservoir_size: int,
+    entity: str = "",
+) -> _SourceResult:
+    # Everything a source needs except the copy from its donor; runs in a worker.
+    # The source starts as a view on the first n_rows rows of the shared base.
+    rng = np.random.default_rng(seed)
+    stats: Stats = {}
+
+    # heterogeneity (column names only)
+    variant = _VARIANTS[i % len(_VARIANTS)]
+    names = {c: _local_name(c, variant) for c in base.columns}
+    src = SourceOverlay(base, np.arange(n_rows, dtype=np.int64), names)
+
+    # latest snapshot; outdated rows are read as of an older one
+    versions = np.full(n_rows, history.latest, dtype=np.int64)
+    if config.outdated_rate > 0 and history.latest > 0:
+        o_mask = rng.random(n_rows) < config.outdated_rate
+        versions[o_mask] = rng.integers(0, history.latest, size=int(o_mask.sum()))
+    for col, n in apply_outdated(src, history.cells_as_of(versions)).items():
+        _bump(stats, col, "outdated", n)
+
+    # pollution + duplicates
+    _pollute_values(src, config, rng, stats)
+    pool = SourceOverlay(base, pool_rows, names) if pool_rows is not None else None
+    keep = [c for c in base.columns if _norm_col(c) == entity]
+    with_dups = _inject_duplicates(src, config, rng, pool=pool, stats=stats, keep=keep)
+    n_dup = len(with_dups) - len(src)
+
+    reservoir = None
+    if reservoir_size > 0:
+        reservoir = _update_reservoir(pool, seen, src, reservoir_size, rng)
+        seen += len(src)
+
+    return _SourceResult(with_dups.detach(), n_dup, reservoir, seen, stats)
+
+
+# stream tags for derive_seed, one per consumer of a chunk; non-zero because
+# SeedSequence ignores trailing zeros ((chunk,) and (chunk, 0, 0) are the same seed)
+_HISTORY_STREAM, _SOURCE_STREAM, _COPY_STREAM = 1, 2, 3
+
+# chunks below this size are polluted serially: shipping the chunk and its history
+# to the workers costs more than the parallel pollution saves
+_PARALLEL_MIN_ROWS = 10_000
+
+
+class SourceBuilder:
+    """
+    Builds polluted sources + gold standard from the clean base.
+    The clean base can be fed in one piece or chunk by chunk (streaming mode);
+    record ids and the duplicate reservoir carry over between chunks.
+
+    Each source has its own RNG stream (seed, chunk, source index), so sources
+    are polluted in parallel (config.workers) with identical results. Only the
+    copy step waits for the donor (the previous source). The worker pool lives
+    as long as the builder; close() (or a with block) shuts it down.
+    """
+
+    def __init__(
+        self,
+        schema: DatasetSchema,
+        config: GenerationConfig,
+        reservoir_size: int = 0,
+        tracker: Optional[QualityTracker] = None,
+    ):
+        self.schema = schema
+        self.config = config
+        self.reservoir_size = reservoir_size
+        self.target = _norm_col(schema.primary_entity_id)
+        self.tracker = tracker if tracker is not None else QualityTracker()
+        typo_model(config)  # rejects unknown typo errors / keyboard layouts up front
+
+        self.record_counts: Dict[str, int] = {}
+        self._reservoirs: Dict[str, pd.DataFrame] = {}
+        self._seen: Dict[str, int] = {}
+        self._labels: Optional[pd.Series] = None  # entity_id of entities still held in a reservoir
+        self._chunk = 0
+        self._pool: Optional[ProcessPoolExecutor] = None  # started with the first big chunk
+
+    def __enter__(self) -> "SourceBuilder":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def process(self, clean: pd.DataFrame) -> Tuple[SourceSet, GoldStandard]:
+        config = self.config
+        chunk = self._chunk
+        self._chunk += 1
+
+        history = build_history(clean, self.schema, config, config.derive_seed(chunk, _HISTORY_STREAM))
+        names = [f"S{i+1}" for i in range(config.n_sources)]
+
+        # shared base of all sources: the clean chunk, followed by the reservoirs
+        # (duplicate pools) of earlier chunks
+        held = [self._reservoirs[n] for n in names if n in self._reservoirs]
+        base = _concat([clean, *held]) if held else clean
+        pool_rows: Dict[str, np.ndarray] = {}
+        start = len(clean)
+        for name in names:
+            if name in self._reservoirs:
+                pool_rows[name] = np.arange(start, start + len(self._reservoirs[name]), dtype=np.int64)
+                start += len(self._reservoirs[name])
+
+        jobs = []
+        for i, name in enumerate(names):
+            jobs.append(
+                (base, len(clean), history, config, i, config.derive_seed(chunk, i, _SOURCE_STREAM),
+                 pool_rows.get(name), self._seen.get(name, 0), self.reservoir_size, self.target)
+            )
 
-def _norm_col(s: str) -> str:
-    # robust matching across snake_case / camelCase / UPPER
-    return s.strip().lower().replace("_", "")
+        if config.workers > 1 and config.n_sources > 1 and len(clean) >= _PARALLEL_MIN_ROWS:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=min(config.workers, config.n_sources))
+            futures = [self._pool.submit(_build_source, *job) for job in jobs]
+            results = [f.result() for f in futures]
+        else:
+            results = [_build_source(*job) for job in jobs]
+
+        # entity_id per entity ordinal (clean row number), incl. reservoir entities of earlier chunks
+        clean_entity = next((c for c in clean.columns if _norm_col(c) == self.target), None)
+        if clean_entity is None:
+            raise ValueError(f"entity_id column '{self.schema.primary_entity_id}' not found in the clean base.")
+        labels = clean[clean_entity]
+        if self._labels is not None and len(self._labels):
+            labels = pd.concat([self._labels, labels])
+
+        # back on the shared base (results from workers come without it)
+        own = [replace(res.overlay, base=base) for res in results]
+        overlays: Dict[str, SourceOverlay] = {}
+        gold_entities = []
+        gold_records = []
+
+        for i, (source_name, res) in enumerate(zip(names, results)):
+            frame = own[i]
+
+            self.tracker.add_duplicates(source_name, res.n_duplicates)
+            self.tracker.add_column_stats(source_name, res.stats)
+            if self.reservoir_size > 0:
+                self._reservoirs[source_name] = res.reservoir
+                self._seen[source_name] = res.seen
+
+            # copying (simplified): take over some of the donor's (already polluted) records;
+            # both are views on the same base, so the donor's column names don't matter
+            if i > 0 and config.copy_rate > 0:
+                donor = own[i - 1]
+                rng = np.random.default_rng(config.derive_seed(chunk, i, _COPY_STREAM))
+                n_copy = int(len(donor) * min(0.3, config.copy_rate))
+                copied = donor.take(np.sort(rng.choice(len(donor), size=n_copy, replace=False)))
+                frame = frame.append(copied)
+                self.tracker.add_copied(source_name, len(copied))
+                self.tracker.add_column_stats(
+                    source_name, {c: {"missing_total": int(copied.isna(c).sum())} for c in base.columns}
+                )
+
+            # record ids (numbering continues across chunks) are added on export
+            offset = self.record_counts.get(source_name, 0)
+            frame.name, frame.record_offset = source_name, offset
+            gold_entities.append(frame.index)
+            gold_records.append(np.arange(offset, offset + len(frame), dtype=np.int64))
+            self.record_counts[source_name] = offset + len(frame)
+            self.tracker.add_rows(source_name, len(frame), len(base.columns) + 1)
+
+            overlays[source_name] = frame
+
+        entity_ordinals = np.concatenate(gold_entities)
+        if self.reservoir_size > 0:
+            # only reservoir entities can show up again in later chunks
+            kept = np.unique(np.concatenate([r.index.to_numpy(dtype=np.int64) for r in self._reservoirs.values()]))
+            self._labels = labels.loc[kept]
+
+        gold = GoldStandard(
+            source_names=list(overlays),
+            source_codes=np.repeat(np.arange(len(overlays), dtype=np.int16), [len(o) for o in overlays.values()]),
+            record_ordinals=np.concatenate(gold_records),
+            entity_ordinals=entity_ordinals,
+            entity_labels=labels,
+        )
+        return SourceSet(overlays), gold
 
 
 def create_sources(
     schema: DatasetSchema,
     clean: pd.DataFrame,
     config: GenerationConfig,
-) -> Tuple[Dict[str, pd.DataFrame], GoldStandard]:
-    rnd = random.Random(config.seed)
-
-    t0, t1 = build_history(clean)
-
-    sources: Dict[str, pd.DataFrame] = {}
-    gold_rows = []
-
-    variants = ["snake", "camel", "upper"]
-    target = _norm_col(schema.primary_entity_id)
-
-    for i in range(config.n_sources):
-        source_name = f"S{i+1}"
-
-        # start from latest snapshot
-        base = t1.copy()
-
-        # outdated values: swap some rows back to t0
-        if config.outdated_rate > 0:
-            o_mask = base.index.to_series().apply(lambda _: rnd.random() < config.outdated_rate)
-            base.loc[o_mask, :] = t0.loc[o_mask, :].values
-
-        # copying (simplified)
-        if i > 0 and config.copy_rate > 0 and f"S{i}" in sources:
-            donor = sources[f"S{i}"].copy()
-            donor = donor.sample(frac=min(0.3, config.copy_rate), random_state=config.seed)
-
-            # if donor is already renamed, skip copying to keep it minimal and safe
-            # (we keep copying only in safe scenarios)
-            if set(map(_norm_col, donor.columns)) == set(map(_norm_col, base.columns)):
-                # try to align by normalized names
-                donor.columns = base.columns
-                base = pd.concat([base, donor], ignore_index=True)
-
-        # heterogeneity (rename)
-        variant = variants[i % len(variants)]
-        if variant == "snake":
-            represented = base.copy()
-        else:
-            represented = _apply_schema_heterogeneity(base, variant)
-
-        # pollution + duplicates
-        polluted = _pollute_values(represented, config, rnd)
-        with_dups = _inject_duplicates(polluted, config, rnd)
-
-        # add record_id
-        with_dups = with_dups.reset_index(drop=True)
-        with_dups["record_id"] = [f"{source_name}-{k:09d}" for k in range(len(with_dups))]
-
-        # Find entity-id column robustly (snake/camel/upper)
-        entity_col = None
-        for c in with_dups.columns:
-            if _norm_col(c) == target:
-                entity_col = c
-                break
-        if entity_col is None:
-            raise ValueError(
-                f"entity_id column not found after heterogeneity transformation. "
-                f"Expected something like '{schema.primary_entity_id}'. "
-                f"Available columns: {list(with_dups.columns)}"
-            )
-
-        gold = pd.DataFrame(
-            {
-                "source": source_name,
-                "record_id": with_dups["record_id"],
-                "entity_id": with_dups[entity_col],
-            }
-        )
-        gold_rows.append(gold)
-
-        sources[source_name] = with_dups
-
-    gold_df = pd.concat(gold_rows, ignore_index=True)
-    return sources, GoldStandard(mapping=gold_df)
\ No newline at end of file
+    tracker: Optional[QualityTracker] = None,
+) -> Tuple[SourceSet, GoldStandard]:
+    with SourceBuilder(schema, config, tracker=tracker) as builder:
+        return builder.process(clean)
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+from .cache import cache_dir
+
+# Faker-backed dtypes that can be sampled from a precomputed value pool
+POOL_DTYPES = ("string", "text", "sentence", "email", "phone", "city", "company")
+
+_MEMO: Dict[str, np.ndarray] = {}
+
+
+def _pool_key(dtype: str, locales: Sequence[str], seed: int, size: int) -> str:
+    return f"{dtype}_{'-'.join(locales)}_{seed}_{size}"
+
+
+def get_pool(
+    dtype: str,
+    locales: Sequence[str],
+    seed: int,
+    size: int,
+    build: Callable[[int], List[str]],
+) -> np.ndarray:
+    """
+    Returns a pool of up to `size` distinct values for `dtype`.
+    Pools are memoized per process and cached on disk (one .npy per
+    dtype/locales/seed/size), so Faker only runs once per key.
+    `build(n)` must return n freshly generated (seeded) values.
+    """
+    key = _pool_key(dtype, locales, seed, size)
+    if key in _MEMO:
+        return _MEMO[key]
+
+    path = os.path.join(cache_dir(), "pools", hashlib.sha1(key.encode()).hexdigest()[:16] + ".npy")
+    if os.path.exists(path):
+        pool = np.load(path)
+    else:
+        pool = _build_distinct(size, build)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fh:
+            np.save(fh, pool)
+        os.replace(tmp, path)
+
+    _MEMO[key] = pool
+    return pool
+
+
+def _build_distinct(size: int, build: Callable[[int], List[str]]) -> np.ndarray:
+    # some providers have small vocabularies (e.g. words) -> stop once a
+    # round yields hardly any new values; the pool is then simply smaller
+    seen: Dict[str, None] = {}
+    while len(seen) < size:
+        before = len(seen)
+        wanted = size - before
+        for v in build(wanted):
+            seen.setdefault(v, None)
+        if len(seen) - before < max(1, wanted // 20):
+            break
+    return np.array(list(seen), dtype=str)
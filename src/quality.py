@@ -3,6 +3,9 @@ from __future__ import annotations
 from typing import Dict
 import pandas as pd
 
+from .config import TYPO_ERRORS
+from .schemas import _norm_col
+
 
 def compute_quality_metrics(
     sources: Dict[str, pd.DataFrame],
@@ -19,7 +22,7 @@ def compute_quality_metrics(
         missing_rate = missing_cells / total_cells if total_cells > 0 else 0
 
         # Duplicate rate (based on entity_id)
-        entity_cols = [c for c in df.columns if c.lower() == primary_entity_id.lower()]
+        entity_cols = [c for c in df.columns if _norm_col(c) == _norm_col(primary_entity_id)]
         if entity_cols:
             col = entity_cols[0]
             duplicate_rate = 1 - df[col].nunique() / len(df)
@@ -36,4 +39,96 @@ def compute_quality_metrics(
             }
         )
 
-    return pd.DataFrame(rows)
\ No newline at end of file
+    return pd.DataFrame(rows)
+
+
+class QualityTracker:
+    """
+    Quality counters gathered while the sources are polluted (no second pass
+    over the data, works across streaming chunks):
+    - per source: rows, columns, injected duplicate rows, copied rows
+    - per source + column: injected missing values, typos (also per error type),
+      outdated values, divergence edits in duplicates and the resulting number of null cells
+    """
+
+    COUNTERS = (
+        "missing_injected", "missing_total", "typos", "outdated", "dup_divergence",
+        *(f"typo_{e}" for e in TYPO_ERRORS),
+    )
+
+    def __init__(self) -> None:
+        self._sources: Dict[str, Dict[str, int]] = {}
+        self._columns: Dict[str, Dict[str, Dict[str, int]]] = {}
+
+    def _source(self, source: str) -> Dict[str, int]:
+        return self._sources.setdefault(source, {"rows": 0, "columns": 0, "duplicates": 0, "copied": 0})
+
+    def add_rows(self, source: str, rows: int, columns: int) -> None:
+        st = self._source(source)
+        st["rows"] += rows
+        st["columns"] = columns
+
+    def add_duplicates(self, source: str, n: int) -> None:
+        self._source(source)["duplicates"] += int(n)
+
+    def add_copied(self, source: str, n: int) -> None:
+        self._source(source)["copied"] += int(n)
+
+    def add_column_stats(self, source: str, stats: Dict[str, Dict[str, int]]) -> None:
+        cols = self._columns.setdefault(source, {})
+        for col, counters in stats.items():
+            per_col = cols.setdefault(col, dict.fromkeys(self.COUNTERS, 0))
+            for counter, n in counters.items():
+                # typo_<name> of registered error types come on top of COUNTERS
+                per_col[counter] = per_col.get(counter, 0) + int(n)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Per-source summary (same layout as compute_quality_metrics, plus counts)."""
+        rows = []
+        for source_name, st in self._sources.items():
+            cols = self._columns.get(source_name, {})
+            total_cells = st["rows"] * st["columns"]
+            missing = sum(c["missing_total"] for c in cols.values())
+            typos = sum(c["typos"] for c in cols.values())
+            outdated = sum(c["outdated"] for c in cols.values())
+
+            def rate(n: int, total: int) -> float:
+                return round(n / total, 4) if total > 0 else 0
+
+            rows.append(
+                {
+                    "source": source_name,
+                    "rows": st["rows"],
+                    "columns": st["columns"],
+                    "missing_rate": rate(missing, total_cells),
+                    "duplicate_rate": rate(st["duplicates"] + st["copied"], st["rows"]),
+                    "typo_rate": rate(typos, total_cells),
+                    "outdated_rate": rate(outdated, total_cells),
+                    "duplicate_rows": st["duplicates"],
+                    "copied_rows": st["copied"],
+                }
+            )
+        return pd.DataFrame(rows)
+
+    def columns_frame(self) -> pd.DataFrame:
+        """Per-source, per-column counts (canonical column names)."""
+        rows = []
+        counters = list(self.COUNTERS)
+        for cols in self._columns.values():
+            for c in cols.values():
+                counters += [k for k in c if k not in counters]
+        for source_name, cols in self._columns.items():
+            n_rows = self._sources.get(source_name, {}).get("rows", 0)
+            for col, c in cols.items():
+                rows.append(
+                    {
+                        "source": source_name,
+                        "column": col,
+                        "rows": n_rows,
+                        **dict.fromkeys(counters, 0),
+                        **c,
+                        "missing_rate": round(c["missing_total"] / n_rows, 4) if n_rows else 0,
+                        "typo_rate": round(c["typos"] / n_rows, 4) if n_rows else 0,
+                    }
+                )
+        return pd.DataFrame(rows, columns=["source", "column", "rows", *counters, "missing_rate", "typo_rate"])
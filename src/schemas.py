@@ -1,13 +1,17 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import List, Optional
+import json
+import os
+from dataclasses import dataclass, field, fields as dc_fields
+from typing import Any, Dict, List, Optional, Union
+
+from .config import FANOUTS
 
 
 @dataclass
 class FieldSchema:
     name: str
-    dtype: str  # string, int, float, money, date, email, phone, city, enum, id, text, sentence, company
+    dtype: str  # string, int, float, money, date, email, phone, city, enum, id, ref, text, sentence, company
     nullable: bool = False
 
     # optional constraints / params
@@ -15,6 +19,9 @@ class FieldSchema:
     max_value: Optional[float] = None
     values: Optional[List[str]] = None      # for enum
     pattern: Optional[str] = None           # for id patterns like "ORD-{seq:08d}"
+    pool_size: Optional[int] = None         # faker dtypes: sample from K precomputed distinct values
+    ref: Optional[str] = None               # for ref: parent entity (its key pattern -> pattern, its rows -> max_value)
+    fanout: Optional[str] = None            # for ref: children per parent, uniform | fixed | zipf
 
 
 @dataclass
@@ -23,6 +30,7 @@ class DatasetSchema:
     entity: str
     fields: List[FieldSchema] = field(default_factory=list)
     primary_entity_id: str = "entity_id"
+    rows: Optional[int] = None  # multi-entity schemas: rows of this entity (default: config rows)
 
     def validate(self) -> None:
         if not self.fields:
@@ -42,4 +50,156 @@ class DatasetSchema:
                     pattern=f"{self.entity.upper()}-{{seq:08d}}",
                     nullable=False,
                 ),
-            )
\ No newline at end of file
+            )
+
+    def key_field(self) -> FieldSchema:
+        return next(f for f in self.fields if f.name == self.primary_entity_id)
+
+
+@dataclass
+class RelationalSchema:
+    """
+    Several entities (e.g. customers -> orders -> shipments). `ref` fields point
+    to the primary key of an earlier entity; each entity is generated, polluted
+    and integrated on its own, the keys are the only link between them.
+    """
+
+    domain: str
+    entities: List[DatasetSchema] = field(default_factory=list)
+
+    def validate(self) -> None:
+        if not self.entities:
+            raise ValueError("Schema must contain at least one entity.")
+        seen: Dict[str, DatasetSchema] = {}
+        for ent in self.entities:
+            if ent.entity in seen:
+                raise ValueError(f"Duplicate entity '{ent.entity}'.")
+            ent.validate()
+            for f in ent.fields:
+                if f.dtype.lower() != "ref":
+                    continue
+                parent = seen.get(f.ref or "")
+                if parent is None:
+                    raise ValueError(f"{ent.entity}.{f.name}: ref must name an earlier entity, got {f.ref!r}")
+                if parent.key_field().dtype.lower() != "id":
+                    raise ValueError(f"{ent.entity}.{f.name}: the key of '{parent.entity}' must be an id field")
+                if f.fanout is not None and f.fanout.lower() not in FANOUTS:
+                    raise ValueError(f"{ent.entity}.{f.name}: fanout must be one of {', '.join(FANOUTS)}")
+            seen[ent.entity] = ent
+
+    def bind(self, default_rows: int) -> None:
+        """Fixes the rows of every entity and points each ref field at its parent's keys."""
+        by_name = {ent.entity: ent for ent in self.entities}
+        for ent in self.entities:
+            ent.rows = default_rows if ent.rows is None else int(ent.rows)
+            for f in ent.fields:
+                if f.dtype.lower() == "ref":
+                    parent = by_name[f.ref]
+                    f.pattern = parent.key_field().pattern
+                    f.max_value = parent.rows
+
+
+def infer_dtype(name: str) -> str:
+    # Minimal “intelligence”: map common field names to types
+    # If unknown => string
+    n = name.lower()
+    if "id" in n:
+        return "id"
+    if "email" in n:
+        return "email"
+    if "phone" in n or "tel" in n:
+        return "phone"
+    if "date" in n or "datum" in n or "time" in n:
+        return "date"
+    if "amount" in n or "price" in n or "betrag" in n or "kosten" in n:
+        return "money"
+    if "city" in n or "stadt" in n:
+        return "city"
+    if "status" in n:
+        return "enum"
+    if "company" in n or "firma" in n:
+        return "company"
+    if "title" in n or "titel" in n or "desc" in n:
+        return "sentence"
+    return "string"
+
+
+def field_from_name(name: str, entity: str, pool_size: Optional[int] = None) -> FieldSchema:
+    # field with inferred dtype and the CLI's default parameters
+    dt = infer_dtype(name)
+    if dt == "id":
+        return FieldSchema(name, "id", pattern=f"{entity.upper()}-{{seq:08d}}")
+    if dt == "enum":
+        return FieldSchema(name, "enum", values=["new", "ok", "error"])
+    if dt == "money":
+        return FieldSchema(name, "money", min_value=1, max_value=5000)
+    return FieldSchema(name, dt, pool_size=pool_size)
+
+
+def read_mapping_file(path: str) -> Dict[str, Any]:
+    """Reads a JSON or YAML (.yaml/.yml, needs pyyaml) file into a dict."""
+    with open(path, encoding="utf-8") as fh:
+        if os.path.splitext(path)[1].lower() in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError as e:
+                raise ImportError("YAML files need pyyaml (pip install pyyaml); JSON works without it.") from e
+            data = yaml.safe_load(fh)
+        else:
+            data = json.load(fh)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: expected a mapping at the top level")
+    return data
+
+
+def schema_from_dict(data: Dict[str, Any]) -> DatasetSchema:
+    """
+    Builds a DatasetSchema from a mapping (e.g. a schema file):
+    fields are either names (dtype inferred like in the interactive CLI)
+    or mappings with FieldSchema keys (dtype optional).
+    """
+    entity = data.get("entity", "entity")
+    known = {f.name for f in dc_fields(FieldSchema)}
+    schema_fields = []
+    for item in data.get("fields", []):
+        if isinstance(item, str):
+            schema_fields.append(field_from_name(item, entity))
+            continue
+        unknown = set(item) - known
+        if unknown:
+            raise ValueError(f"Unknown field keys {sorted(unknown)}; allowed: {sorted(known)}")
+        if "dtype" not in item and "ref" in item:
+            item = {**item, "dtype": "ref"}
+        if "dtype" not in item:
+            base = field_from_name(item["name"], entity)
+            item = {**{k: v for k, v in vars(base).items() if v is not None}, **item}
+        schema_fields.append(FieldSchema(**item))
+
+    schema = DatasetSchema(
+        domain=data.get("domain", ""),
+        entity=entity,
+        fields=schema_fields,
+        primary_entity_id=data.get("primary_entity_id", "entity_id"),
+        rows=data.get("rows"),
+    )
+    schema.validate()
+    return schema
+
+
+def relational_from_dict(data: Dict[str, Any]) -> RelationalSchema:
+    """{"domain": ..., "entities": [<schema mapping>, ...]}, parents before children."""
+    domain = data.get("domain", "")
+    schema = RelationalSchema(domain, [schema_from_dict({"domain": domain, **e}) for e in data["entities"]])
+    schema.validate()
+    return schema
+
+
+def load_schema(source: Union[str, Dict[str, Any]]) -> Union[DatasetSchema, RelationalSchema]:
+    # files with an "entities" list describe several related entities
+    data = read_mapping_file(source) if isinstance(source, str) else source
+    return relational_from_dict(data) if "entities" in data else schema_from_dict(data)
+
+
+def _norm_col(s: str) -> str:
+    # robust matching across snake_case / camelCase / UPPER
+    return s.strip().lower().replace("_", "")
@@ -0,0 +1,357 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields, replace
+from typing import Deque, Dict, Iterator, List, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from .config import DUPLICATE_CLUSTERS, STRING_BACKENDS, GenerationConfig
+from .etl import build_integrated
+from .generator import iter_clean_chunks
+from .pipeline import entity_config
+from .pollution import SourceBuilder
+from .schemas import DatasetSchema, RelationalSchema
+from .typos import parse_typo_weights, typo_model
+
+KINDS = ("clean", "polluted", "integrated", "gold")
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+# config fields a request may not change (process layout / caches of the server)
+_FIXED = {"workers", "column_cache", "column_cache_max_mb", "chunk_size", "duplicate_operators"}
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class RequestStats:
+    path: str
+    status: int
+    rows: int = 0
+    bytes: int = 0
+    ttfb_s: float = 0.0  # until the first body chunk is written
+    total_s: float = 0.0
+
+
+@dataclass
+class StreamRequest:
+    kind: str
+    schema: DatasetSchema
+    config: GenerationConfig
+    source: Optional[str] = None
+    fmt: str = "ndjson"
+
+
+def _encode(df: pd.DataFrame, fmt: str, first: bool) -> bytes:
+    if not len(df):
+        return b"" if fmt == "ndjson" or not first else df.to_csv(index=False).encode("utf-8")
+    if fmt == "csv":
+        return df.to_csv(index=False, header=first).encode("utf-8")
+    text = df.to_json(orient="records", lines=True, date_format="iso")
+    return (text if text.endswith("\n") else text + "\n").encode("utf-8")
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    q = np.percentile(values, [50, 95, 99])
+    return {"p50_ms": round(q[0] * 1000, 2), "p95_ms": round(q[1] * 1000, 2), "p99_ms": round(q[2] * 1000, 2)}
+
+
+class RecordServer:
+    """
+    Serves generated records over HTTP (asyncio, stdlib only). Schemas are
+    compiled and Faker is initialized once at startup (warm()), so a request
+    only pays for generating its rows:
+
+    GET /health
+    GET /metrics                 latency + throughput of the requests so far
+    GET /stream/<kind>?...       kind: clean | polluted | integrated | gold
+        source=S1                polluted (required), integrated/gold (filter)
+        entity=orders            multi-entity schemas (default: the first entity)
+        format=ndjson | csv
+        rows, seed, chunk and any GenerationConfig rate, e.g. typo_rate=0.1
+        typo_weights=keyboard=3,delete=1 (URL-encoded), typo_keyboard=azerty
+
+    Records are generated chunk by chunk, like the streaming mode (same
+    params -> same records and gold rows as `run --chunk-size <chunk>`). The
+    next chunk is only generated once the previous one was written to the
+    socket (backpressure). Generation runs on one worker thread, so requests
+    interleave per chunk and the output does not depend on concurrency.
+    """
+
+    def __init__(
+        self, schema: Union[DatasetSchema, RelationalSchema], config: GenerationConfig, history: int = 10_000
+    ) -> None:
+        if isinstance(schema, RelationalSchema):
+            schema.bind(config.rows)
+            self.entities = list(schema.entities)
+            self.relational = True
+        else:
+            schema.validate()
+            self.entities = [schema]
+            self.relational = False
+        self.config = replace(config, chunk_size=config.chunk_size or 10_000, workers=1)
+        self.stats: Deque[RequestStats] = deque(maxlen=history)
+        self.started = time.time()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dapo-gen")
+
+    def warm(self) -> None:
+        """Compiles the schemas, initializes Faker and loads the lazy imports with a tiny run."""
+        for i, ent in enumerate(self.entities):
+            cfg = replace(entity_config(self.config, i, ent), rows=2)
+            for frame in self._frames(StreamRequest("integrated", ent, cfg)):
+                _encode(frame, "ndjson", True)
+
+    def _config_for(self, index: int, params: Dict[str, str]) -> GenerationConfig:
+        cfg = self.config
+        overrides = {}
+        defaults = {f.name: getattr(cfg, f.name) for f in fields(GenerationConfig) if f.name not in _FIXED}
+        for key, raw in params.items():
+            name = {"chunk": "chunk_size"}.get(key, key)
+            if name == "chunk_size":
+                overrides[name] = int(raw)
+                continue
+            if name not in defaults:
+                raise HttpError(400, f"unknown parameter '{key}'")
+            default = defaults[name]
+            if isinstance(default, bool):
+                overrides[name] = raw.lower() in ("1", "true", "yes")
+            elif isinstance(default, (int, float, str)):
+                overrides[name] = type(default)(raw)
+            elif name == "typo_weights":
+                overrides[name] = parse_typo_weights(raw)
+        if self.relational and "rows" in overrides:
+            raise HttpError(400, "rows are fixed per entity in a multi-entity schema")
+        if overrides.get("chunk_size", 1) < 1 or overrides.get("rows", 0) < 0:
+            raise HttpError(400, "rows must be >= 0 and chunk >= 1")
+        if overrides.get("duplicate_cluster", DUPLICATE_CLUSTERS[0]) not in DUPLICATE_CLUSTERS:
+            raise HttpError(400, f"duplicate_cluster must be one of {', '.join(DUPLICATE_CLUSTERS)}")
+        if overrides.get("string_backend", STRING_BACKENDS[0]) not in STRING_BACKENDS:
+            raise HttpError(400, f"string_backend must be one of {', '.join(STRING_BACKENDS)}")
+        cfg = replace(cfg, **overrides)
+        typo_model(cfg)  # ValueError -> 400
+        if self.relational:
+            cfg = entity_config(cfg, index, self.entities[index])
+        return cfg
+
+    def parse(self, target: str) -> StreamRequest:
+        url = urlsplit(target)
+        parts = url.path.strip("/").split("/")
+        if len(parts) != 2 or parts[0] != "stream":
+            raise HttpError(404, f"no such path: {url.path}")
+        kind = parts[1]
+        if kind not in KINDS:
+            raise HttpError(404, f"kind must be one of {', '.join(KINDS)}")
+
+        params = dict(parse_qsl(url.query))
+        fmt = params.pop("format", "ndjson")
+        if fmt not in FORMATS:
+            raise HttpError(400, f"format must be one of {', '.join(FORMATS)}")
+        source = params.pop("source", None)
+        entity = params.pop("entity", self.entities[0].entity)
+        names = [e.entity for e in self.entities]
+        if entity not in names:
+            raise HttpError(400, f"entity must be one of {', '.join(names)}")
+        index = names.index(entity)
+
+        try:
+            cfg = self._config_for(index, params)
+        except ValueError as e:
+            raise HttpError(400, str(e))
+        if kind == "polluted" and source is None:
+            raise HttpError(400, "polluted records need source=S1..S<n>")
+        if source is not None and source not in {f"S{i + 1}" for i in range(cfg.n_sources)}:
+            raise HttpError(400, f"source must be one of S1..S{cfg.n_sources}")
+        return StreamRequest(kind, self.entities[index], cfg, source, fmt)
+
+    def _frames(self, req: StreamRequest) -> Iterator[pd.DataFrame]:
+        cfg = req.config
+        if cfg.rows == 0:
+            return
+        chunks = iter_clean_chunks(req.schema, cfg, cfg.chunk_size)
+        if req.kind == "clean":
+            yield from chunks
+            return
+
+        builder = SourceBuilder(req.schema, cfg, reservoir_size=cfg.chunk_size)
+        for clean in chunks:
+            srcs, gold = builder.process(clean)
+            if req.kind == "polluted":
+                yield srcs[req.source]
+            elif req.kind == "gold":
+                mapping = gold.mapping
+                yield mapping[mapping["source"] == req.source] if req.source else mapping
+            else:
+                integrated = build_integrated(srcs, req.schema)
+                yield integrated[integrated["source"] == req.source] if req.source else integrated
+
+    @staticmethod
+    def _next_chunk(frames: Iterator[pd.DataFrame], fmt: str, first: bool) -> Optional[Tuple[int, bytes]]:
+        frame = next(frames, None)
+        if frame is None:
+            return None
+        return len(frame), _encode(frame, fmt, first)
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, body: dict) -> int:
+        data = json.dumps(body).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode("latin-1") + data
+        )
+        await writer.drain()
+        return len(data)
+
+    async def _stream(self, writer: asyncio.StreamWriter, req: StreamRequest, stat: RequestStats, t0: float) -> None:
+        loop = asyncio.get_running_loop()
+        frames = self._frames(req)
+        try:
+            # the first chunk is built before the status line, so config errors still give a 400
+            try:
+                nxt = await loop.run_in_executor(self._executor, self._next_chunk, frames, req.fmt, True)
+            except ValueError as e:
+                raise HttpError(400, str(e))
+            writer.write(
+                f"HTTP/1.1 200 OK\r\nContent-Type: {FORMATS[req.fmt]}\r\nTransfer-Encoding: chunked\r\n"
+                f"Connection: close\r\n\r\n".encode("latin-1")
+            )
+            stat.status = 200
+            while nxt is not None:
+                rows, data = nxt
+                if data:
+                    writer.write(b"%x\r\n%b\r\n" % (len(data), data))
+                    await writer.drain()  # backpressure: wait for the client before generating more
+                    if not stat.ttfb_s:
+                        stat.ttfb_s = time.perf_counter() - t0
+                stat.rows += rows
+                stat.bytes += len(data)
+                nxt = await loop.run_in_executor(self._executor, self._next_chunk, frames, req.fmt, False)
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+        finally:
+            await loop.run_in_executor(self._executor, frames.close)
+
+    def metrics(self) -> dict:
+        done = [s for s in self.stats if s.status == 200 and s.rows]
+        elapsed = max(time.time() - self.started, 1e-9)
+        busy = sum(s.total_s for s in done)
+        return {
+            "requests": len(self.stats),
+            "errors": sum(s.status != 200 for s in self.stats),
+            "rows": sum(s.rows for s in done),
+            "bytes": sum(s.bytes for s in done),
+            "uptime_s": round(elapsed, 1),
+            "ttfb": _percentiles([s.ttfb_s for s in done]),
+            "latency": _percentiles([s.total_s for s in done]),
+            "rows_per_s_per_request": round(sum(s.rows for s in done) / busy, 1) if busy else 0.0,
+        }
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        t0 = time.perf_counter()
+        stat = RequestStats(path="", status=500)
+        try:
+            line = (await reader.readline()).decode("latin-1").split()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass  # headers are not needed
+            if len(line) < 2:
+                return
+            method, stat.path = line[0], line[1]
+            if method != "GET":
+                raise HttpError(405, "only GET is supported")
+            path = urlsplit(stat.path).path
+            if path == "/health":
+                stat.status = 200
+                await self._respond(writer, 200, {"status": "ok", "entities": [e.entity for e in self.entities]})
+            elif path == "/metrics":
+                stat.status = 200
+                await self._respond(writer, 200, self.metrics())
+            else:
+                await self._stream(writer, self.parse(stat.path), stat, t0)
+        except HttpError as e:
+            stat.status = e.status
+            await self._respond(writer, e.status, {"error": str(e)})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # client went away; the generator is closed in _stream
+        except Exception as e:
+            if stat.status != 200:  # nothing sent yet
+                await self._respond(writer, 500, {"error": f"{type(e).__name__}: {e}"})
+            raise
+        finally:
+            stat.total_s = time.perf_counter() - t0
+            if stat.path:
+                self.stats.append(stat)
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle, host, port, limit=2**16)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def serve(server: RecordServer, host: str = "127.0.0.1", port: int = 8765) -> None:
+    srv = await server.start(host, port)
+    async with srv:
+        await srv.serve_forever()
+
+
+@dataclass
+class Response:
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    ttfb_s: float
+    total_s: float
+
+    def json(self):
+        return json.loads(self.body)
+
+    def records(self) -> List[dict]:
+        return [json.loads(line) for line in self.body.splitlines() if line]
+
+
+async def fetch(host: str, port: int, target: str) -> Response:
+    """Minimal HTTP/1.1 GET client (de-chunks the body), e.g. for load tests."""
+    t0 = time.perf_counter()
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(f"GET {target} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode("latin-1"))
+        await writer.drain()
+        status = int((await reader.readline()).split()[1])
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            k, _, v = line.partition(":")
+            headers[k.strip().lower()] = v.strip()
+
+        ttfb, parts = 0.0, []
+        if headers.get("transfer-encoding") == "chunked":
+            while True:
+                size = int((await reader.readline()).strip(), 16)
+                if not ttfb:
+                    ttfb = time.perf_counter() - t0
+                if size == 0:
+                    await reader.readline()
+                    break
+                parts.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+        else:
+            parts.append(await reader.read())
+            ttfb = time.perf_counter() - t0
+        return Response(status, headers, b"".join(parts), ttfb, time.perf_counter() - t0)
+    finally:
+        writer.close()
@@ -1,21 +1,45 @@
 from __future__ import annotations
 
+import io
 import os
-from typing import Dict, Union
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, List, Mapping, Optional, Sequence, Tuple, Union
 
 import pandas as pd
-from sqlalchemy import create_engine
-from sqlalchemy.engine import URL, make_url
+from pandas.api.types import is_float_dtype, is_integer_dtype, is_numeric_dtype
 
 from .pollution import GoldStandard
+from .schemas import DatasetSchema, _norm_col
+
+if TYPE_CHECKING:
+    from sqlalchemy.engine import URL, Engine
+
+
+# file suffix per CSV compression
+_CSV_SUFFIXES = {"none": ".csv", "gzip": ".csv.gz", "zstd": ".csv.zst"}
+
+
+def _require_compression(compression: str) -> None:
+    if compression not in _CSV_SUFFIXES:
+        raise ValueError(f"csv compression must be one of {', '.join(_CSV_SUFFIXES)}")
+    if compression == "zstd":
+        try:
+            import zstandard  # noqa: F401
+        except ImportError as exc:  # optional dependency
+            raise ImportError("csv compression 'zstd' requires zstandard (pip install zstandard)") from exc
 
 
 def save_csv_bundle(
     out_dir: str,
-    sources: Dict[str, pd.DataFrame],
+    sources: Mapping[str, pd.DataFrame],
     integrated: pd.DataFrame,
     gold: GoldStandard,
     quality_df: pd.DataFrame,
+    quality_columns_df: Optional[pd.DataFrame] = None,
+    compression: str = "none",
+    threads: int = 1,
 ) -> None:
     """
     Saves one run as a CSV bundle:
@@ -23,15 +47,121 @@ def save_csv_bundle(
     - integrated.csv
     - gold_standard.csv
     - quality_metrics.csv
+    - quality_columns.csv (per-column counts, if given)
+    (.csv.gz / .csv.zst with compression)
     """
-    os.makedirs(out_dir, exist_ok=True)
+    writer = CsvBundleWriter(out_dir, compression, threads)
+    writer.write_chunk(sources, integrated, gold)
+    writer.close(quality_df, quality_columns_df)
 
-    for name, df in sources.items():
-        df.to_csv(os.path.join(out_dir, f"{name}.csv"), index=False)
 
-    integrated.to_csv(os.path.join(out_dir, "integrated.csv"), index=False)
-    gold.mapping.to_csv(os.path.join(out_dir, "gold_standard.csv"), index=False)
-    quality_df.to_csv(os.path.join(out_dir, "quality_metrics.csv"), index=False)
+class CsvBundleWriter:
+    """
+    Streaming variant of save_csv_bundle: appends chunk after chunk to the
+    same files (header only on the first write). With threads > 1 several
+    files are rendered/compressed at once.
+    """
+
+    def __init__(self, out_dir: str, compression: str = "none", threads: int = 1) -> None:
+        _require_compression(compression)
+        self.out_dir = out_dir
+        self.compression = compression
+        self.threads = max(1, threads)
+        self._started: set = set()
+        os.makedirs(out_dir, exist_ok=True)
+
+    def _append(self, name: str, df: pd.DataFrame) -> None:
+        first = name not in self._started
+        df.to_csv(
+            os.path.join(self.out_dir, name + _CSV_SUFFIXES[self.compression]),
+            mode="w" if first else "a",
+            header=first,
+            index=False,
+            compression=None if self.compression == "none" else self.compression,
+        )
+        self._started.add(name)
+
+    def _append_all(self, frames: Mapping[str, pd.DataFrame]) -> None:
+        # one file per task; a SourceSet builds each frame on the thread that writes it
+        if self.threads == 1 or len(frames) < 2:
+            for name in frames:
+                self._append(name, frames[name])
+            return
+        with ThreadPoolExecutor(max_workers=self.threads) as pool:
+            for f in [pool.submit(lambda n: self._append(n, frames[n]), name) for name in frames]:
+                f.result()
+
+    def write_sources(self, sources: Mapping[str, pd.DataFrame]) -> None:
+        self._append_all(sources)
+
+    def write_results(self, integrated: pd.DataFrame, gold: GoldStandard) -> None:
+        self._append_all({"integrated": integrated, "gold_standard": gold.mapping})
+
+    def write_chunk(self, sources: Mapping[str, pd.DataFrame], integrated: pd.DataFrame, gold: GoldStandard) -> None:
+        self.write_sources(sources)
+        self.write_results(integrated, gold)
+
+    def close(self, quality_df: pd.DataFrame, quality_columns_df: Optional[pd.DataFrame] = None) -> None:
+        self._append("quality_metrics", quality_df)
+        if quality_columns_df is not None:
+            self._append("quality_columns", quality_columns_df)
+
+
+class BackgroundWriter:
+    """
+    Runs a bundle writer on its own thread behind a bounded queue: writes return
+    as soon as they are queued (and block while `max_pending` wait), so the next
+    sources/chunk are generated while the previous ones are written. An error of
+    the writer thread is raised by the next call or by close().
+    """
+
+    def __init__(self, writer, max_pending: int = 2) -> None:
+        self.writer = writer
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, max_pending))
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._work, name=f"{type(writer).__name__}-bg", daemon=True)
+        self._thread.start()
+
+    def _work(self) -> None:
+        while True:
+            task = self._queue.get()
+            if task is None:
+                return
+            if self._error is None:  # after an error the queue is only drained
+                fn, args = task
+                try:
+                    fn(*args)
+                except BaseException as exc:
+                    self._error = exc
+
+    def _submit(self, fn, *args) -> None:
+        if self._error is not None:
+            raise self._error
+        if not self._thread.is_alive():
+            raise RuntimeError("writer is closed")
+        self._queue.put((fn, args))
+
+    def write_sources(self, sources: Mapping[str, pd.DataFrame]) -> None:
+        self._submit(self.writer.write_sources, sources)
+
+    def write_results(self, integrated: pd.DataFrame, gold: GoldStandard) -> None:
+        self._submit(self.writer.write_results, integrated, gold)
+
+    def write_chunk(self, sources: Mapping[str, pd.DataFrame], integrated: pd.DataFrame, gold: GoldStandard) -> None:
+        self._submit(self.writer.write_chunk, sources, integrated, gold)
+
+    def close(self, quality_df: pd.DataFrame, quality_columns_df: Optional[pd.DataFrame] = None) -> None:
+        """Writes the quality tables, waits for all queued writes and closes the writer."""
+        self._submit(self.writer.close, quality_df, quality_columns_df)
+        self.stop()
+        if self._error is not None:
+            raise self._error
+
+    def stop(self) -> None:
+        # lets the thread finish what is queued and end (no-op once stopped)
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
 
 
 def _normalize_postgres_dsn(dsn: Union[str, bytes, bytearray]) -> Union[str, URL]:
@@ -54,6 +184,8 @@ def _normalize_postgres_dsn(dsn: Union[str, bytes, bytearray]) -> Union[str, URL
     # 2) If it's a URL-style DSN, let SQLAlchemy parse it
     #    (helps with special characters in username/password)
     if "://" in dsn:
+        from sqlalchemy.engine import make_url
+
         url = make_url(dsn)
         # normalize scheme if someone used "postgres://"
         if url.drivername == "postgres":
@@ -64,26 +196,403 @@ def _normalize_postgres_dsn(dsn: Union[str, bytes, bytearray]) -> Union[str, URL
     return dsn
 
 
+def _create_engine(dsn: str, **kwargs) -> Engine:
+    # SQLAlchemy (+ psycopg2) is only imported by Postgres runs
+    from sqlalchemy import create_engine
+
+    return create_engine(_normalize_postgres_dsn(dsn), **kwargs)
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:  # optional dependency
+        raise ImportError("store=parquet requires pyarrow (pip install pyarrow)") from exc
+    return pa, pq
+
+
+def _arrow_table(df: pd.DataFrame, schema: Optional[DatasetSchema] = None, dict_cols: Sequence[str] = ("source",)):
+    """
+    Converts a frame to an Arrow table with schema-derived types:
+    int/float/money typed (money as decimal), enum + `source` dictionary-encoded,
+    everything else (incl. polluted dates) as string.
+    """
+    pa, _ = _require_pyarrow()
+    arrow_types = {
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "money": pa.decimal128(14, 2),
+    }
+    fields = {_norm_col(f.name): f for f in schema.fields} if schema is not None else {}
+
+    arrays = []
+    for c in df.columns:
+        s = df[c]
+        field = fields.get(_norm_col(c))
+        dtype = field.dtype.lower() if field is not None else None
+
+        if dtype in arrow_types and is_numeric_dtype(s):
+            arr = pa.array(s, from_pandas=True).cast(arrow_types[dtype])
+        elif dtype is None and is_numeric_dtype(s):
+            arr = pa.array(s, from_pandas=True)
+        elif isinstance(s.dtype, pd.CategoricalDtype):
+            # already dictionary-encoded; keep the index type stable across chunks
+            arrays.append(pa.array(s, from_pandas=True).cast(pa.dictionary(pa.int32(), pa.string())))
+            continue
+        else:
+            arr = pa.array(s.astype("string"), type=pa.string(), from_pandas=True)
+
+        if dtype == "enum" or c in dict_cols:
+            arr = arr.dictionary_encode()
+        arrays.append(arr)
+
+    return pa.Table.from_arrays(arrays, names=[str(c) for c in df.columns])
+
+
+class ParquetBundleWriter:
+    """
+    Writes a run bundle as Parquet (one file per table, appended row group by
+    row group, so it also serves the streaming mode):
+    - S1.parquet, S2.parquet, ...
+    - integrated.parquet / gold_standard.parquet
+      (or integrated/source=S1/part-0.parquet, ... with partition_by_source)
+    - quality_metrics.parquet
+    """
+
+    def __init__(
+        self,
+        out_dir: str,
+        schema: Optional[DatasetSchema] = None,
+        row_group_size: int = 500_000,
+        partition_by_source: bool = False,
+    ) -> None:
+        _require_pyarrow()
+        self.out_dir = out_dir
+        self.schema = schema
+        self.row_group_size = row_group_size
+        self.partition_by_source = partition_by_source
+        self._writers: dict = {}
+        os.makedirs(out_dir, exist_ok=True)
+
+    def _append(self, path: str, table) -> None:
+        _, pq = _require_pyarrow()
+        writer = self._writers.get(path)
+        if writer is None:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            writer = pq.ParquetWriter(path, table.schema)
+            self._writers[path] = writer
+        else:
+            table = table.cast(writer.schema)
+        writer.write_table(table, row_group_size=self.row_group_size)
+
+    def _write(self, name: str, df: pd.DataFrame, schema: Optional[DatasetSchema], partition: bool = False) -> None:
+        if partition and self.partition_by_source:
+            for source_name, part in df.groupby("source", sort=False, observed=True):
+                path = os.path.join(self.out_dir, name, f"source={source_name}", "part-0.parquet")
+                self._append(path, _arrow_table(part.drop(columns="source"), schema))
+        else:
+            self._append(os.path.join(self.out_dir, f"{name}.parquet"), _arrow_table(df, schema))
+
+    def write_sources(self, sources: Mapping[str, pd.DataFrame]) -> None:
+        for name, df in sources.items():
+            self._write(name, df, self.schema)
+
+    def write_results(self, integrated: pd.DataFrame, gold: GoldStandard) -> None:
+        self._write("integrated", integrated, self.schema, partition=True)
+        self._write("gold_standard", gold.mapping, None, partition=True)
+
+    def write_chunk(self, sources: Mapping[str, pd.DataFrame], integrated: pd.DataFrame, gold: GoldStandard) -> None:
+        self.write_sources(sources)
+        self.write_results(integrated, gold)
+
+    def close(self, quality_df: pd.DataFrame, quality_columns_df: Optional[pd.DataFrame] = None) -> None:
+        self._write("quality_metrics", quality_df, None)
+        if quality_columns_df is not None:
+            self._write("quality_columns", quality_columns_df, None)
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+
+
+def save_parquet_bundle(
+    out_dir: str,
+    sources: Mapping[str, pd.DataFrame],
+    integrated: pd.DataFrame,
+    gold: GoldStandard,
+    quality_df: pd.DataFrame,
+    schema: Optional[DatasetSchema] = None,
+    row_group_size: int = 500_000,
+    partition_by_source: bool = False,
+    quality_columns_df: Optional[pd.DataFrame] = None,
+) -> None:
+    writer = ParquetBundleWriter(out_dir, schema, row_group_size, partition_by_source)
+    writer.write_chunk(sources, integrated, gold)
+    writer.close(quality_df, quality_columns_df)
+
+
+def _read_table(run_folder: str, name: str) -> pd.DataFrame:
+    # <name>.csv(.gz/.zst), <name>.parquet or a partitioned <name>/ directory
+    for suffix in _CSV_SUFFIXES.values():
+        csv_path = os.path.join(run_folder, name + suffix)
+        if os.path.exists(csv_path):
+            return pd.read_csv(csv_path, keep_default_na=False, na_values=[""])
+    for path in (os.path.join(run_folder, f"{name}.parquet"), os.path.join(run_folder, name)):
+        if os.path.exists(path):
+            _require_pyarrow()
+            return pd.read_parquet(path)
+    raise FileNotFoundError(f"No {name}.csv(.gz/.zst) / {name}.parquet in {run_folder}")
+
+
+def load_bundle(run_folder: str) -> Tuple[pd.DataFrame, GoldStandard]:
+    """Reads integrated + gold standard of a CSV or Parquet bundle (e.g. for evaluation)."""
+    integrated = _read_table(run_folder, "integrated")
+    gold = GoldStandard.from_mapping(_read_table(run_folder, "gold_standard"))
+    return integrated, gold
+
+
+# Postgres column types per schema dtype. Text-like dtypes (incl. date, which
+# may carry typos after pollution) stay text.
+_PG_TYPES = {
+    "int": "bigint",
+    "float": "double precision",
+    "money": "numeric(14, 2)",
+}
+
+# rows per CSV batch streamed into COPY
+_COPY_BATCH_ROWS = 50_000
+
+
+def _quote_ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _pg_columns(df: pd.DataFrame, schema: Optional[DatasetSchema] = None) -> List[Tuple[str, str]]:
+    # schema types where the frame still holds matching values, text otherwise
+    fields = {_norm_col(f.name): f for f in schema.fields} if schema is not None else {}
+    cols = []
+    for c in df.columns:
+        s = df[c]
+        field = fields.get(_norm_col(c))
+        if field is not None and field.dtype.lower() in _PG_TYPES and is_numeric_dtype(s):
+            pg_type = _PG_TYPES[field.dtype.lower()]
+        elif is_integer_dtype(s):
+            pg_type = "bigint"
+        elif is_float_dtype(s):
+            pg_type = "double precision"
+        else:
+            pg_type = "text"
+        cols.append((c, pg_type))
+    return cols
+
+
+def _copy_frame(df: pd.DataFrame, columns: List[Tuple[str, str]]) -> pd.DataFrame:
+    # bigint columns may hold NaN (float) after pollution -> write them as integers
+    out = df
+    for c, pg_type in columns:
+        if pg_type == "bigint" and not is_integer_dtype(df[c]):
+            if out is df:
+                out = df.copy()
+            out[c] = df[c].astype("Int64")
+    return out
+
+
+class _CsvStream(io.RawIOBase):
+    """File-like CSV view on a DataFrame, rendered batch by batch for COPY."""
+
+    def __init__(self, df: pd.DataFrame, batch_rows: int = _COPY_BATCH_ROWS) -> None:
+        self._batches = (
+            df.iloc[i : i + batch_rows].to_csv(index=False, header=False).encode("utf-8")
+            for i in range(0, len(df), batch_rows)
+        )
+        self._buf = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buf) < size:
+            nxt = next(self._batches, None)
+            if nxt is None:
+                break
+            self._buf += nxt
+        if size < 0:
+            size = len(self._buf)
+        out, self._buf = self._buf[:size], self._buf[size:]
+        return out
+
+
+def _copy_into(
+    engine: Engine,
+    table: str,
+    df: pd.DataFrame,
+    schema: Optional[DatasetSchema] = None,
+    create: bool = True,
+    index_cols: Sequence[str] = (),
+) -> None:
+    """
+    (Re)creates `table` with explicit column types and loads `df` via
+    COPY ... FROM STDIN (CSV streamed in batches). Indexes are created after
+    the load. create=False appends to an existing table.
+    """
+    columns = _pg_columns(df, schema)
+    col_list = ", ".join(_quote_ident(c) for c, _ in columns)
+
+    conn = engine.raw_connection()
+    try:
+        cur = conn.cursor()
+        if create:
+            cur.execute(f"DROP TABLE IF EXISTS {_quote_ident(table)}")
+            ddl = ", ".join(f"{_quote_ident(c)} {t}" for c, t in columns)
+            cur.execute(f"CREATE TABLE {_quote_ident(table)} ({ddl})")
+        if len(df):
+            cur.copy_expert(
+                f"COPY {_quote_ident(table)} ({col_list}) FROM STDIN WITH (FORMAT csv)",
+                _CsvStream(_copy_frame(df, columns)),
+            )
+        for c in index_cols:
+            _create_index(cur, table, c)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _create_index(cur, table: str, column: str) -> None:
+    cur.execute(
+        f"CREATE INDEX IF NOT EXISTS {_quote_ident(f'ix_{table}_{column}'.lower())} "
+        f"ON {_quote_ident(table)} ({_quote_ident(column)})"
+    )
+
+
+def _entity_col(df: pd.DataFrame, primary_entity_id: str) -> List[str]:
+    return [c for c in df.columns if _norm_col(c) == _norm_col(primary_entity_id)]
+
+
 def save_postgres_bundle(
     dsn: str,
     sources: Dict[str, pd.DataFrame],
     integrated: pd.DataFrame,
     gold: GoldStandard,
     quality_df: pd.DataFrame,
+    schema: Optional[DatasetSchema] = None,
+    workers: int = 4,
+    quality_columns_df: Optional[pd.DataFrame] = None,
 ) -> None:
     """
     Saves one run into Postgres tables:
     - source_s1, source_s2, ...
     - integrated
     - gold_standard
-    - quality_metrics
+    - quality_metrics (+ quality_columns, if given)
+
+    Tables are bulk-loaded with COPY (typed columns from `schema`), several
+    tables at once over a small connection pool; indexes on record_id and
+    entity_id are built after the load.
     """
-    dsn_norm = _normalize_postgres_dsn(dsn)
-    engine = create_engine(dsn_norm)
+    engine = _create_engine(dsn, pool_size=workers, max_overflow=0)
+    entity = schema.primary_entity_id if schema is not None else "entity_id"
+
+    jobs = [
+        (f"source_{name.lower()}", df, schema, ["record_id", *_entity_col(df, entity)])
+        for name, df in sources.items()
+    ]
+    jobs.append(("integrated", integrated, schema, ["record_id"]))
+    jobs.append(("gold_standard", gold.mapping, None, ["record_id", "entity_id"]))
+    jobs.append(("quality_metrics", quality_df, None, []))
+    if quality_columns_df is not None:
+        jobs.append(("quality_columns", quality_columns_df, None, []))
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_copy_into, engine, table, df, sch, True, [c for c in idx if c in df.columns])
+                for table, df, sch, idx in jobs
+            ]
+            for f in futures:
+                f.result()
+    finally:
+        engine.dispose()
+
+
+def save_run_metrics_postgres(dsn: str, metrics_df: pd.DataFrame) -> None:
+    """Writes per-phase run metrics (see instrumentation.RunRecorder) into the run_metrics table."""
+    engine = _create_engine(dsn)
+    try:
+        _copy_into(engine, "run_metrics", metrics_df)
+    finally:
+        engine.dispose()
+
+
+def save_postgres_bundle_to_sql(
+    dsn: str,
+    sources: Dict[str, pd.DataFrame],
+    integrated: pd.DataFrame,
+    gold: GoldStandard,
+    quality_df: pd.DataFrame,
+) -> None:
+    """INSERT-based loader via DataFrame.to_sql (previous path; kept as benchmark reference)."""
+    engine = _create_engine(dsn)
 
     for name, df in sources.items():
         df.to_sql(f"source_{name.lower()}", engine, if_exists="replace", index=False)
 
     integrated.to_sql("integrated", engine, if_exists="replace", index=False)
     gold.mapping.to_sql("gold_standard", engine, if_exists="replace", index=False)
-    quality_df.to_sql("quality_metrics", engine, if_exists="replace", index=False)
\ No newline at end of file
+    quality_df.to_sql("quality_metrics", engine, if_exists="replace", index=False)
+
+
+class PostgresBundleWriter:
+    """
+    Streaming variant of save_postgres_bundle: the first chunk (re)creates the
+    tables, all further chunks are appended via COPY (the sources of a chunk
+    over `workers` connections); indexes are built in close(). `prefix` is put
+    in front of every table name (e.g. "orders_" for one entity of several).
+    """
+
+    def __init__(self, dsn: str, schema: Optional[DatasetSchema] = None, workers: int = 4, prefix: str = "") -> None:
+        self.workers = max(1, workers)
+        self.engine = _create_engine(dsn, pool_size=self.workers, max_overflow=0)
+        self.schema = schema
+        self.prefix = prefix
+        self._started: Dict[str, List[str]] = {}
+
+    def _append(self, table: str, df: pd.DataFrame, schema: Optional[DatasetSchema], index_cols: List[str]) -> None:
+        table = self.prefix + table
+        _copy_into(self.engine, table, df, schema, create=table not in self._started)
+        self._started.setdefault(table, [c for c in index_cols if c in df.columns])
+
+    def _append_source(self, name: str, df: pd.DataFrame) -> None:
+        entity = self.schema.primary_entity_id if self.schema is not None else "entity_id"
+        self._append(f"source_{name.lower()}", df, self.schema, ["record_id", *_entity_col(df, entity)])
+
+    def write_sources(self, sources: Mapping[str, pd.DataFrame]) -> None:
+        if self.workers == 1:
+            for name in sources:
+                self._append_source(name, sources[name])
+            return
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for f in [pool.submit(lambda n: self._append_source(n, sources[n]), name) for name in sources]:
+                f.result()
+
+    def write_results(self, integrated: pd.DataFrame, gold: GoldStandard) -> None:
+        self._append("integrated", integrated, self.schema, ["record_id"])
+        self._append("gold_standard", gold.mapping, None, ["record_id", "entity_id"])
+
+    def write_chunk(self, sources: Mapping[str, pd.DataFrame], integrated: pd.DataFrame, gold: GoldStandard) -> None:
+        self.write_sources(sources)
+        self.write_results(integrated, gold)
+
+    def close(self, quality_df: pd.DataFrame, quality_columns_df: Optional[pd.DataFrame] = None) -> None:
+        _copy_into(self.engine, self.prefix + "quality_metrics", quality_df)
+        if quality_columns_df is not None:
+            _copy_into(self.engine, self.prefix + "quality_columns", quality_columns_df)
+        conn = self.engine.raw_connection()
+        try:
+            cur = conn.cursor()
+            for table, cols in self._started.items():
+                for c in cols:
+                    _create_index(cur, table, c)
+            conn.commit()
+        finally:
+            conn.close()
+        self.engine.dispose()
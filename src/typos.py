@@ -0,0 +1,441 @@
+"""
+Typo model: one realistic error per string, applied to a whole column at once.
+
+Built-in error types (config.TYPO_ERRORS):
+- insert: a key pressed twice or a neighbouring key typed along ("Müllller", "Berlinm")
+- delete: a character left out
+- transpose: two neighbouring characters swapped
+- keyboard: a character replaced by an adjacent key (QWERTZ, AZERTY or QWERTY)
+- phonetic: written as spoken ("ph" -> "f", "ü" -> "ue", "eau" -> "o", "é" -> "e")
+- ocr: glyphs confused by text recognition ("rn" -> "m", "0" -> "O", "l" -> "1")
+
+The strings are one fixed-width matrix of code points (umlauts and accents are single
+code points), so picking positions and splicing in the replacement are array ops.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from .config import KEYBOARDS, GenerationConfig
+
+# longest replacement an error may write
+MAX_NEW = 3
+# strings handled per block
+_BLOCK = 1 << 15
+
+# code points covered by the case and keyboard tables (Latin-1 + Latin Extended-A/B)
+_TABLE = 0x250
+_LOWER = np.array([ord(c.lower()) if len(c.lower()) == 1 else i for i, c in enumerate(map(chr, range(_TABLE)))], dtype=np.uint32)
+_FOLD = _LOWER.astype(np.int32)
+_SAME = np.arange(_TABLE, dtype=np.int32)
+_UPPER = np.array([ord(c.upper()) if len(c.upper()) == 1 else i for i, c in enumerate(map(chr, range(_TABLE)))], dtype=np.uint32)
+
+# unshifted rows, top to bottom
+_LAYOUTS = {
+    "qwertz": ("1234567890ß", "qwertzuiopü", "asdfghjklöä", "yxcvbnm"),
+    "azerty": ("&é\"'(-è_çà", "azertyuiop", "qsdfghjklmù", "wxcvbn"),
+    "qwerty": ("1234567890", "qwertyuiop", "asdfghjkl", "zxcvbnm"),
+}
+
+# (written, heard as) on lowercased text, case is carried over
+_PHONETIC = [
+    ("ä", "ae"), ("ö", "oe"), ("ü", "ue"), ("ß", "ss"), ("ae", "ä"), ("oe", "ö"), ("ue", "ü"), ("ss", "ß"),
+    ("ph", "f"), ("f", "ph"), ("v", "f"), ("th", "t"), ("dt", "t"), ("tz", "z"), ("ck", "k"), ("ie", "i"),
+    ("ei", "ai"), ("ai", "ei"), ("ey", "ei"), ("y", "i"), ("c", "k"), ("x", "ks"), ("qu", "kw"),
+    ("mm", "m"), ("nn", "n"), ("ll", "l"), ("tt", "t"),
+    ("é", "e"), ("è", "e"), ("ê", "e"), ("à", "a"), ("ç", "c"), ("eau", "o"), ("au", "o"), ("ou", "u"), ("gn", "ni"),
+]
+
+# (printed, recognized as), case-sensitive
+_OCR = [
+    ("rn", "m"), ("m", "rn"), ("cl", "d"), ("d", "cl"), ("vv", "w"), ("w", "vv"), ("li", "h"), ("h", "li"),
+    ("0", "O"), ("O", "0"), ("o", "0"), ("1", "l"), ("l", "1"), ("I", "l"), ("l", "I"), ("5", "S"), ("S", "5"),
+    ("8", "B"), ("B", "8"), ("2", "Z"), ("6", "b"), ("9", "g"), ("g", "9"), ("e", "c"), ("c", "e"),
+    ("u", "v"), ("n", "h"), ("ü", "u"), ("ö", "o"), ("ä", "a"), ("é", "e"), (".", ","), (",", "."),
+]
+
+
+@dataclass
+class CodeBatch:
+    """Strings as code points: `codes` (n, width) padded with 0, and their lengths."""
+
+    codes: np.ndarray
+    lengths: np.ndarray
+    keyboard: str
+
+    def take(self, rows: np.ndarray) -> "CodeBatch":
+        return CodeBatch(self.codes[rows], self.lengths[rows], self.keyboard)
+
+
+@dataclass
+class Edit:
+    """Per row: replace `old_len` characters at `pos` by the first `new_len` of `new` (where `ok`)."""
+
+    ok: np.ndarray
+    pos: np.ndarray
+    old_len: np.ndarray
+    new: np.ndarray
+    new_len: np.ndarray
+
+
+# (batch, rng) -> one edit per row of the batch
+TypoFn = Callable[[CodeBatch, np.random.Generator], Edit]
+
+_TYPOS: Dict[str, TypoFn] = {}
+
+
+def register_typo(name: str) -> Callable[[TypoFn], TypoFn]:
+    """
+    Registers an error type; its share of the typos comes from `typo_weights[name]`.
+    Rows where the error finds no place to apply (ok=False) get an `insert` instead.
+    """
+
+    def deco(fn: TypoFn) -> TypoFn:
+        _TYPOS[name] = fn
+        return fn
+
+    return deco
+
+
+def _lookup(table: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    # table[code] below _TABLE, code itself above
+    return np.where(codes < _TABLE, table[np.minimum(codes, _TABLE - 1)], codes)
+
+
+def _pick(
+    lengths: np.ndarray,
+    eligible: Callable[[np.ndarray, np.ndarray], np.ndarray],
+    rng: np.random.Generator,
+    tries: int = 4,
+) -> Tuple[np.ndarray, np.ndarray]:
+    # a random position p < lengths per row with eligible(rows, p); ok=False for rows without one.
+    # A few random draws settle almost every row, the rest is searched over all positions.
+    n = len(lengths)
+    ok = np.zeros(n, dtype=bool)
+    pos = np.zeros(n, dtype=np.int64)
+    todo = np.flatnonzero(lengths > 0)
+    for _ in range(tries):
+        if not len(todo):
+            return ok, pos
+        p = (rng.random(len(todo)) * lengths[todo]).astype(np.int64)
+        hit = eligible(todo, p)
+        ok[todo[hit]], pos[todo[hit]] = True, p[hit]
+        todo = todo[~hit]
+    if len(todo):
+        grid = np.arange(int(lengths[todo].max()))
+        mask = (grid < lengths[todo, None]) & eligible(todo[:, None], np.minimum(grid, lengths[todo, None] - 1))
+        score = np.where(mask, rng.random(mask.shape), -1.0)
+        ok[todo], pos[todo] = mask.any(axis=1), score.argmax(axis=1)
+    return ok, pos
+
+
+def _edit(ok: np.ndarray, pos: np.ndarray, old_len: int, new: np.ndarray) -> Edit:
+    n = len(ok)
+    padded = np.zeros((n, MAX_NEW), dtype=np.uint32)
+    padded[:, : new.shape[1]] = new
+    return Edit(ok, pos, np.full(n, old_len), padded, np.full(n, new.shape[1]))
+
+
+def _cased(batch: CodeBatch, pos: np.ndarray, old_len: np.ndarray, new: np.ndarray) -> np.ndarray:
+    # replacement char k takes the case of the replaced char k (the last one if longer)
+    rows = np.arange(len(pos))[:, None]
+    ref = pos[:, None] + np.minimum(np.arange(new.shape[1]), np.maximum(old_len - 1, 0)[:, None])
+    ref = np.minimum(ref, np.maximum(batch.lengths - 1, 0)[:, None])
+    orig = batch.codes[rows, ref]
+    upper = orig != _lookup(_LOWER, orig)
+    return np.where(upper, _lookup(_UPPER, new), new)
+
+
+@lru_cache(maxsize=None)
+def _neighbour_table(keyboard: str) -> Tuple[np.ndarray, np.ndarray]:
+    # (_TABLE, k) adjacent keys per code point and their number
+    if keyboard not in _LAYOUTS:
+        raise ValueError(f"typo_keyboard must be one of {', '.join(KEYBOARDS)}")
+    rows = _LAYOUTS[keyboard]
+    near: Dict[str, List[str]] = {}
+    for r, keys in enumerate(rows):
+        for c, key in enumerate(keys):
+            # staggered rows: the row above is shifted left, the row below right
+            cells = [(r, c - 1), (r, c + 1), (r - 1, c), (r - 1, c + 1), (r + 1, c - 1), (r + 1, c)]
+            near[key] = [rows[i][j] for i, j in cells if 0 <= i < len(rows) and 0 <= j < len(rows[i])]
+    table = np.zeros((_TABLE, max(map(len, near.values()))), dtype=np.uint32)
+    count = np.zeros(_TABLE, dtype=np.int64)
+    for key, keys in near.items():
+        table[ord(key), : len(keys)] = [ord(k) for k in keys]
+        count[ord(key)] = len(keys)
+    return table, count
+
+
+def _on_layout(keys: np.ndarray, keyboard: str) -> np.ndarray:
+    _, count = _neighbour_table(keyboard)
+    return np.take(count, keys, mode="clip") > 0  # the last table entry is 0
+
+
+def _neighbours(keys: np.ndarray, keyboard: str, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    # a random adjacent key per (lowercase) key; has=False for keys not on the layout
+    table, count = _neighbour_table(keyboard)
+    idx = np.minimum(keys, _TABLE - 1)
+    n = np.where(keys < _TABLE, count[idx], 0)
+    return n > 0, table[idx, (rng.random(len(keys)) * n).astype(np.int64)]
+
+
+@dataclass(frozen=True)
+class _Rules:
+    # substitution rules sorted by (length, chars). For 1-, 2- and 3-char rules, dense
+    # `start`/`count` tables find them by the key of their first one or two chars.
+    old: np.ndarray
+    old_len: np.ndarray
+    new: np.ndarray
+    new_len: np.ndarray
+    start: Tuple[np.ndarray, np.ndarray, np.ndarray]
+    count: Tuple[np.ndarray, np.ndarray, np.ndarray]
+    # per pair of chars: rules that may start there (3-char ones still need their last char)
+    candidates: np.ndarray
+
+
+@lru_cache(maxsize=None)
+def _compile_rules(rules: Tuple[Tuple[str, str], ...]) -> _Rules:
+    rules = tuple(sorted(rules, key=lambda r: (len(r[0]), r[0])))
+    old = np.zeros((len(rules), MAX_NEW), dtype=np.int64)
+    new = np.zeros((len(rules), MAX_NEW), dtype=np.uint32)
+    for r, (a, b) in enumerate(rules):
+        old[r, : len(a)] = [ord(c) for c in a]
+        new[r, : len(b)] = [ord(c) for c in b]
+    old_len = np.array([len(a) for a, _ in rules], dtype=np.int64)
+    new_len = np.array([len(b) for _, b in rules], dtype=np.int64)
+    start, count = [], []
+    for size in (1, 2, 3):
+        key = old[:, 0] if size == 1 else old[:, 0] * _TABLE + old[:, 1]
+        n_keys = _TABLE if size == 1 else _TABLE * _TABLE
+        cnt = np.bincount(key[old_len == size], minlength=n_keys)
+        count.append(cnt.astype(np.int32))
+        start.append((np.cumsum(cnt) - cnt + int((old_len < size).sum())).astype(np.int32))
+    candidates = (np.repeat(count[0], _TABLE) + count[1] + count[2]).astype(np.uint8)
+    return _Rules(old, old_len, new, new_len, tuple(start), tuple(count), candidates)
+
+
+def _rule_edit(text: np.ndarray, rules: Sequence[Tuple[str, str]], fold: bool, rng: np.random.Generator) -> Edit:
+    # one (position, rule) match per row, uniform over all matches of the row
+    # (fold: match the lowercased text)
+    rs = _compile_rules(tuple(rules))
+    n, width = text.shape
+    # codes past the tables end up on the last entry, which no rule uses
+    c = np.take(_FOLD if fold else _SAME, text, mode="clip")
+    pair = c * _TABLE
+    pair[:, :-1] += c[:, 1:]
+    rows, pos = np.nonzero(np.take(rs.candidates, pair))
+
+    # exact matches at the candidate positions: 1-char rules, then 2-char, then 3-char
+    key = pair[rows, pos]
+    n1, n2 = rs.count[0][c[rows, pos]], rs.count[1][key]
+    third = np.where(pos + 2 < width, c[rows, np.minimum(pos + 2, width - 1)], 0)
+    base3 = rs.start[2][key]
+    slots = base3[:, None] + np.arange(max(int(rs.count[2].max()), 1))
+    tri = (slots < (base3 + rs.count[2][key])[:, None]) & (rs.old[np.minimum(slots, len(rs.old) - 1), 2] == third[:, None])
+    k = (n1 + n2 + tri.sum(axis=1)).astype(np.int64)
+
+    # candidates come sorted by row; draw the t-th match of each row
+    hits = np.bincount(rows, weights=k, minlength=n).astype(np.int64)
+    ok = hits > 0
+    upto = np.cumsum(k)
+    target = (np.cumsum(hits) - hits)[ok] + (rng.random(int(ok.sum())) * hits[ok]).astype(np.int64)
+    e = np.searchsorted(upto, target, side="right")
+    j = target - (upto[e] - k[e])
+    nth3 = (tri[e].cumsum(axis=1) > (j - n1[e] - n2[e])[:, None]).argmax(axis=1)
+    rule = np.where(
+        j < n1[e],
+        rs.start[0][c[rows[e], pos[e]]] + j,
+        np.where(j < n1[e] + n2[e], rs.start[1][key[e]] + j - n1[e], base3[e] + nth3),
+    )
+
+    out_pos = np.zeros(n, dtype=np.int64)
+    out_rule = np.zeros(n, dtype=np.int64)
+    out_pos[ok], out_rule[ok] = pos[e], rule
+    return Edit(ok, out_pos, rs.old_len[out_rule], rs.new[out_rule], rs.new_len[out_rule])
+
+
+@register_typo("insert")
+def _insert(batch: CodeBatch, rng: np.random.Generator) -> Edit:
+    # after the char at pos-1 (before the first one at pos 0): the same key again or a neighbour
+    n = len(batch.lengths)
+    pos = (rng.random(n) * (batch.lengths + 1)).astype(np.int64)
+    ref = np.clip(pos - 1, 0, np.maximum(batch.lengths - 1, 0))
+    orig = batch.codes[np.arange(n), ref]
+    key = _lookup(_LOWER, orig)
+    has, near = _neighbours(key, batch.keyboard, rng)
+    char = np.where(has & (rng.random(n) < 0.5), near, key)
+    char = np.where(orig != key, _lookup(_UPPER, char), char)
+    return _edit(batch.lengths > 0, pos, 0, char[:, None])
+
+
+@register_typo("delete")
+def _delete(batch: CodeBatch, rng: np.random.Generator) -> Edit:
+    pos = (rng.random(len(batch.lengths)) * batch.lengths).astype(np.int64)
+    return _edit(batch.lengths > 1, pos, 1, np.zeros((len(pos), 0), dtype=np.uint32))
+
+
+@register_typo("transpose")
+def _transpose(batch: CodeBatch, rng: np.random.Generator) -> Edit:
+    # p and p + 1 differ (p < length - 1)
+    codes = batch.codes
+    ok, pos = _pick(np.maximum(batch.lengths - 1, 0), lambda r, p: codes[r, p] != codes[r, p + 1], rng)
+    rows = np.arange(len(pos))
+    return _edit(ok, pos, 2, np.stack([codes[rows, np.minimum(pos + 1, codes.shape[1] - 1)], codes[rows, pos]], axis=1))
+
+
+@register_typo("keyboard")
+def _keyboard(batch: CodeBatch, rng: np.random.Generator) -> Edit:
+    codes = batch.codes
+    ok, pos = _pick(batch.lengths, lambda r, p: _on_layout(_lookup(_LOWER, codes[r, p]), batch.keyboard), rng)
+    _, near = _neighbours(_lookup(_LOWER, codes[np.arange(len(pos)), pos]), batch.keyboard, rng)
+    return _edit(ok, pos, 1, _cased(batch, pos, np.ones(len(pos), dtype=np.int64), near[:, None]))
+
+
+@register_typo("phonetic")
+def _phonetic(batch: CodeBatch, rng: np.random.Generator) -> Edit:
+    edit = _rule_edit(batch.codes, _PHONETIC, True, rng)
+    edit.new = _cased(batch, edit.pos, edit.old_len, edit.new)
+    return edit
+
+
+@register_typo("ocr")
+def _ocr(batch: CodeBatch, rng: np.random.Generator) -> Edit:
+    return _rule_edit(batch.codes, _OCR, False, rng)
+
+
+def _splice(codes: np.ndarray, edit: Edit) -> np.ndarray:
+    # codes[:pos] + new[:new_len] + codes[pos + old_len:] for all rows, on the flat buffer:
+    # overlapping chars are overwritten, the rest is one np.insert + one np.delete, and
+    # each row gives back / takes up trailing padding so all rows keep the same width
+    n, width = codes.shape
+    shift = edit.new_len - edit.old_len
+    out_width = width + max(int(shift.max(initial=0)), 0)
+    out = np.zeros((n, out_width), dtype=np.uint32)
+    out[:, :width] = codes
+    flat = out.reshape(-1)
+    row = np.arange(n) * out_width
+    same = np.minimum(edit.old_len, edit.new_len)
+    # pads first: a row's new end is the next row's start, it goes before an insertion there
+    pad_at, ins_at, ins_val, del_at = [], [], [], []
+    for i in range(MAX_NEW):
+        r = np.flatnonzero(same > i)
+        flat[row[r] + edit.pos[r] + i] = edit.new[r, i]
+        # one more char to insert, one trailing pad less
+        r = np.flatnonzero(shift > i)
+        ins_at += [row[r] + edit.pos[r] + same[r]]
+        ins_val += [edit.new[r, same[r] + i]]
+        del_at += [row[r] + out_width - 1 - i]
+        # one more char to delete, one trailing pad more
+        r = np.flatnonzero(-shift > i)
+        pad_at += [row[r] + out_width]
+        del_at += [row[r] + edit.pos[r] + same[r] + i]
+    pad_at = np.concatenate(pad_at)
+    ins_at, del_at = np.concatenate([pad_at, *ins_at]), np.concatenate(del_at)
+    if not len(ins_at):
+        return out
+    flat = np.insert(flat, ins_at, np.concatenate([np.zeros(len(pad_at), dtype=np.uint32), *ins_val]))
+    # positions after the insertions (an insertion at x goes before the old x)
+    del_at = del_at + np.searchsorted(np.sort(ins_at), del_at, side="right")
+    return np.delete(flat, del_at).reshape(n, out_width)
+
+
+@dataclass(frozen=True)
+class TypoModel:
+    """Error types with their probabilities and the keyboard layout."""
+
+    errors: Tuple[str, ...]
+    p: Tuple[float, ...]
+    keyboard: str = "qwertz"
+
+    @classmethod
+    def from_weights(cls, weights: Mapping[str, float], keyboard: str = "qwertz") -> "TypoModel":
+        unknown = set(weights) - set(_TYPOS)
+        if unknown:
+            raise ValueError(f"Unknown typo errors {sorted(unknown)}; allowed: {sorted(_TYPOS)}")
+        if any(w < 0 for w in weights.values()) or sum(weights.values()) <= 0:
+            raise ValueError("typo_weights must be >= 0 with a positive sum")
+        _neighbour_table(keyboard)  # validates the layout
+        total = float(sum(weights.values()))
+        errors = tuple(e for e in weights if weights[e] > 0)
+        return cls(errors, tuple(weights[e] / total for e in errors), keyboard)
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        # error types an edit can end up as: the configured ones plus the insert fallback
+        return self.errors if "insert" in self.errors else self.errors + ("insert",)
+
+    def apply(self, values: np.ndarray, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+        """One error per non-empty string -> (new values, per-row index into names, -1 = unchanged)."""
+        arr = np.asarray(values, dtype=str)
+        kinds = np.full(len(arr), -1, dtype=np.int16)
+        # blocks keep the per-position work arrays small
+        blocks = [self._apply_block(arr[lo : lo + _BLOCK], rng, kinds[lo : lo + _BLOCK]) for lo in range(0, len(arr), _BLOCK)]
+        if len(blocks) == 1:
+            return blocks[0], kinds
+        return (np.concatenate(blocks) if blocks else arr), kinds
+
+    def counts(self, kinds: np.ndarray) -> Dict[str, int]:
+        """{error type: rows} for (a slice of) the kinds returned by apply."""
+        n = np.bincount(kinds[kinds >= 0], minlength=len(self.names))
+        return {name: int(c) for name, c in zip(self.names, n) if c}
+
+    def _apply_block(self, arr: np.ndarray, rng: np.random.Generator, kinds: np.ndarray) -> np.ndarray:
+        n = len(arr)
+        width = max(arr.dtype.itemsize // 4, 1)
+        codes = np.ascontiguousarray(arr).view(np.uint32).reshape(n, width)
+        lengths = np.char.str_len(arr).astype(np.int64)
+        batch = CodeBatch(codes, lengths, self.keyboard)
+
+        kind = rng.choice(len(self.errors), size=n, p=self.p)
+        kind[lengths == 0] = -1  # nothing to mistype
+        edit = Edit(
+            np.zeros(n, dtype=bool), np.zeros(n, dtype=np.int64), np.zeros(n, dtype=np.int64),
+            np.zeros((n, MAX_NEW), dtype=np.uint32), np.zeros(n, dtype=np.int64),
+        )
+
+        def put(name: str, rows: np.ndarray) -> np.ndarray:
+            # runs one error type on `rows`, returns the rows it could not apply to
+            if not len(rows):
+                return rows
+            e = _TYPOS[name](batch.take(rows), rng)
+            done = rows[e.ok]
+            edit.ok[done] = True
+            edit.pos[done], edit.old_len[done], edit.new_len[done] = e.pos[e.ok], e.old_len[e.ok], e.new_len[e.ok]
+            edit.new[done] = e.new[e.ok]
+            kinds[done] = self.names.index(name)
+            return rows[~e.ok]
+
+        failed = [put(name, np.flatnonzero(kind == k)) for k, name in enumerate(self.errors)]
+        put("insert", np.concatenate(failed))
+
+        rows = np.flatnonzero(edit.ok)
+        if not len(rows):
+            return arr
+        changed = _splice(codes[rows], Edit(*(getattr(edit, f)[rows] for f in ("ok", "pos", "old_len", "new", "new_len"))))
+        out = arr.astype(f"<U{max(width, changed.shape[1])}")
+        out[rows] = changed.reshape(-1).view(f"<U{changed.shape[1]}")
+        return out
+
+
+@lru_cache(maxsize=64)
+def _cached_model(weights: Tuple[Tuple[str, float], ...], keyboard: str) -> TypoModel:
+    return TypoModel.from_weights(dict(weights), keyboard)
+
+
+def typo_model(cfg: GenerationConfig) -> TypoModel:
+    return _cached_model(tuple(cfg.typo_weights.items()), cfg.typo_keyboard)
+
+
+def parse_typo_weights(text: str) -> Dict[str, float]:
+    """'keyboard=3,delete=1' -> {"keyboard": 3.0, "delete": 1.0} (errors left out get 0)."""
+    weights = {}
+    for item in filter(None, (s.strip() for s in text.split(","))):
+        name, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"typo weight '{item}' must look like name=weight")
+        weights[name.strip()] = float(value)
+    return weights
@@ -0,0 +1,65 @@
+import json
+
+import pandas as pd
+import pytest
+
+import src.batch as batch
+from src.batch import expand_grid, load_sweep, run_batch
+from src.schemas import load_schema
+
+
+def _schema_dict():
+    return {
+        "domain": "test",
+        "entity": "orders",
+        "fields": ["entity_id", "email", {"name": "amount", "dtype": "money", "min_value": 1, "max_value": 10}, "status"],
+    }
+
+
+def test_load_schema_infers_dtypes(tmp_path):
+    path = tmp_path / "schema.json"
+    path.write_text(json.dumps(_schema_dict()))
+
+    schema = load_schema(str(path))
+    dtypes = {f.name: f.dtype for f in schema.fields}
+    assert dtypes == {"entity_id": "id", "email": "email", "amount": "money", "status": "enum"}
+    assert schema.fields[0].pattern == "ORDERS-{seq:08d}"
+
+
+def test_expand_grid_and_unknown_params():
+    base, grid = load_sweep({"base": {"rows": 10}, "grid": {"typo_rate": [0.1, 0.2], "seed": [1, 2, 3]}})
+    configs = expand_grid(base, grid)
+    assert len(configs) == 6
+    assert {(c.typo_rate, c.seed) for c in configs} == {(t, s) for t in (0.1, 0.2) for s in (1, 2, 3)}
+
+    with pytest.raises(ValueError):
+        expand_grid({"rows": 10}, {"typo_rat": [0.1]})
+
+
+def test_run_batch_shares_clean_base(tmp_path, monkeypatch):
+    calls = []
+    real = batch.generate_clean
+    monkeypatch.setattr(batch, "generate_clean", lambda schema, cfg: calls.append(cfg.seed) or real(schema, cfg))
+
+    configs = expand_grid({"rows": 60}, {"duplicate_rate": [0.0, 0.3], "seed": [1, 2]})
+    index = run_batch(load_schema(_schema_dict()), configs, str(tmp_path), grid_keys=["duplicate_rate", "seed"])
+
+    assert sorted(calls) == [1, 2]
+    assert len(index) == 4
+    assert pd.read_csv(tmp_path / "index.csv")["run"].tolist() == ["run_000", "run_001", "run_002", "run_003"]
+    assert (tmp_path / "run_003" / "integrated.csv").exists()
+    # more duplicates -> more source rows
+    by_rate = index.groupby("duplicate_rate")["source_rows"].mean()
+    assert by_rate[0.3] > by_rate[0.0]
+
+
+def test_run_batch_keeps_one_clean_base_per_string_backend(tmp_path, monkeypatch):
+    used = []
+    real = batch.run_in_memory
+    monkeypatch.setattr(batch, "run_in_memory", lambda *a, clean, **kw: used.append(clean["email"].dtype) or real(*a, clean=clean, **kw))
+
+    configs = expand_grid({"rows": 40}, {"string_backend": ["python", "arrow"]})
+    index = run_batch(load_schema(_schema_dict()), configs, str(tmp_path), grid_keys=["string_backend"])
+
+    assert used[0] == object and isinstance(used[1], pd.StringDtype)
+    assert index["clean_base"].nunique() == 2
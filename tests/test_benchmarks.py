@@ -0,0 +1,27 @@
+from benchmarks.suite import compare
+
+
+def _row(case, phase, rows_per_s, peak_mb):
+    return {"case": case, "phase": phase, "rows_per_s": rows_per_s, "peak_mb": peak_mb}
+
+
+def test_compare_flags_slowdowns_and_memory_growth_beyond_threshold():
+    baseline = [
+        _row("a", "generate_clean", 1000.0, 50.0),
+        _row("a", "create_sources", 1000.0, 50.0),
+        _row("a", "quality", 1000.0, 0.5),
+    ]
+    current = [
+        _row("a", "generate_clean", 850.0, 50.0),  # -15 %: slower than allowed
+        _row("a", "create_sources", 950.0, 60.0),  # -5 % is fine, +20 % memory is not
+        _row("a", "quality", 1000.0, 5.0),  # baseline peak <= 1 MB: too small to compare
+        _row("b", "generate_clean", 1.0, 999.0),  # case not in the baseline
+    ]
+
+    problems = compare(current, baseline, threshold=0.10)
+    assert len(problems) == 2
+    assert problems[0].startswith("generate_clean [a]") and "rows/s" in problems[0]
+    assert problems[1].startswith("create_sources [a]") and "peak" in problems[1]
+
+    assert compare(current, baseline, threshold=0.25) == []
+    assert compare(baseline, baseline, threshold=0.0) == []
@@ -0,0 +1,26 @@
+import pandas as pd
+
+from src.etl import build_integrated
+from src.schemas import DatasetSchema, FieldSchema
+
+
+def test_build_integrated_maps_variants_and_keeps_types():
+    schema = DatasetSchema(
+        domain="test",
+        entity="orders",
+        fields=[FieldSchema("entity_id", "id"), FieldSchema("unit_price", "money"), FieldSchema("qty", "int")],
+    )
+    sources = {
+        "S1": pd.DataFrame({"entity_id": [" A ", "B"], "unit_price": [1.5, None], "qty": [1, 2], "record_id": ["S1-1", "S1-2"]}),
+        "S2": pd.DataFrame({"entityId": ["A", None], "unitPrice": [2.0, 3.0], "qty": [None, 4], "record_id": ["S2-1", "S2-2"]}),
+        "S3": pd.DataFrame({"ENTITY_ID": ["C"], "UNIT_PRICE": [4.0], "QTY": [5], "RECORD_ID": ["S3-1"]}),
+    }
+
+    out = build_integrated(sources, schema)
+
+    assert list(out.columns) == ["entity_id", "unit_price", "qty", "record_id", "source"]
+    assert isinstance(out["source"].dtype, pd.CategoricalDtype)
+    assert out["entity_id"].tolist() == ["A", "B", "A", "UNKNOWN", "C"]
+    assert str(out["qty"].dtype) == "Int64"
+    assert out["unit_price"].isna().sum() == 1
+    assert out["record_id"].tolist()[-1] == "S3-1"
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from src.config import GenerationConfig
+from src.etl import build_integrated
+from src.evaluation import BlockingConfig, _blocking_fields, evaluate_blocking, sorted_neighbourhood, normalize_field
+from src.generator import generate_clean
+from src.pollution import create_sources
+from src.schemas import DatasetSchema, FieldSchema
+
+
+def _run(rows=400):
+    schema = DatasetSchema(
+        domain="test",
+        entity="customers",
+        fields=[
+            FieldSchema("entity_id", "id", pattern="CUST-{seq:05d}"),
+            FieldSchema("email", "email"),
+            FieldSchema("city", "city"),
+            FieldSchema("company", "company"),
+        ],
+    )
+    cfg = GenerationConfig(rows=rows, seed=11)
+    sources, gold = create_sources(schema, generate_clean(schema, cfg), cfg)
+    return build_integrated(sources, schema), gold
+
+
+def test_evaluate_blocking_scores_all_methods():
+    integrated, gold = _run()
+    result = evaluate_blocking(integrated, gold, fields=["email", "city", "company"]).set_index("method")
+
+    assert list(result.index) == ["sorted", "token", "minhash"]
+    assert (result["true_matches"] == gold.n_true_matches()).all()
+    assert (result["found_matches"] <= result["candidates"]).all()
+    assert (result["pair_completeness"] > 0.8).all()
+    n = len(integrated)
+    assert (result["reduction_ratio"] > 1 - 0.2).all()
+    assert (result["candidates"] < n * (n - 1) // 2).all()
+    assert ((result["f1"] > 0) & (result["f1"] <= 1)).all()
+
+
+def test_default_fields_leave_out_the_entity_key():
+    integrated, gold = _run(200)
+    fields = ["email", "city", "company"]
+    assert _blocking_fields(integrated, None, gold) == fields
+
+    # renamed key column: found through the gold labels, with or without the schema
+    renamed = integrated.rename(columns={"entity_id": "customer_key"})
+    assert _blocking_fields(renamed, None, gold) == fields
+    schema = DatasetSchema("test", "customers", [FieldSchema("city", "city"), FieldSchema("ref_no", "id")])
+    assert _blocking_fields(renamed.assign(ref_no=renamed["email"]), None, gold, schema) == fields
+
+    default = evaluate_blocking(integrated, gold, methods=["sorted"])
+    explicit = evaluate_blocking(integrated, gold, methods=["sorted"], fields=fields)
+    assert default.drop(columns=["seconds", "rows_per_s", "pairs_per_s"]).equals(
+        explicit.drop(columns=["seconds", "rows_per_s", "pairs_per_s"])
+    )
+
+
+def test_blocking_independent_of_worker_count():
+    integrated, _ = _run(200)
+    norm = {c: normalize_field(integrated[c]) for c in ["email", "city"]}
+
+    serial = sorted_neighbourhood(norm, BlockingConfig(window=4))
+    parallel = sorted_neighbourhood(norm, BlockingConfig(window=4, workers=3))
+    assert np.array_equal(serial, parallel)
+
+
+def test_evaluate_blocking_rejects_unknown_method():
+    integrated, gold = _run(50)
+    with pytest.raises(ValueError):
+        evaluate_blocking(integrated, gold, methods=["bogus"])
@@ -1,6 +1,15 @@
-from src.schemas import DatasetSchema, FieldSchema
+import os
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.schemas import DatasetSchema, FieldSchema, load_schema
 from src.config import GenerationConfig
-from src.generator import generate_clean
+from src import cache, generator
+from src.cache import ColumnCache
+from src.generator import generate_clean, iter_clean_chunks
 
 
 def test_generate_clean_smoke():
@@ -18,4 +27,155 @@ def test_generate_clean_smoke():
     df = generate_clean(schema, cfg)
     assert len(df) == 50
     assert "entity_id" in df.columns
-    assert "email" in df.columns
\ No newline at end of file
+    assert "email" in df.columns
+
+
+def test_clean_chunks_match_full_frame():
+    schema = DatasetSchema(
+        domain="test",
+        entity="customers",
+        fields=[FieldSchema("entity_id", "id"), FieldSchema("city", "city"), FieldSchema("n", "int")],
+    )
+    cfg = GenerationConfig(rows=45, seed=5)
+
+    full = generate_clean(schema, cfg)
+    chunks = list(iter_clean_chunks(schema, cfg, chunk_size=10))
+
+    assert [len(c) for c in chunks] == [10, 10, 10, 10, 5]
+    assert pd.concat(chunks).equals(full)
+
+
+def test_clean_output_independent_of_worker_count(monkeypatch):
+    monkeypatch.setattr(generator, "BLOCK_ROWS", 40)
+    schema = DatasetSchema(
+        domain="test",
+        entity="customers",
+        fields=[
+            FieldSchema("entity_id", "id"),
+            FieldSchema("email", "email"),
+            FieldSchema("amount", "money", min_value=1, max_value=100),
+        ],
+    )
+
+    outputs = []
+    for workers in (1, 2, 3):
+        cfg = GenerationConfig(rows=150, seed=11, workers=workers)
+        outputs.append(generate_clean(schema, cfg).to_csv(index=False).encode())
+
+    assert outputs[0] == outputs[1] == outputs[2]
+
+
+def test_pooled_fields_sample_from_cached_pool(tmp_path, monkeypatch):
+    monkeypatch.setenv("DAPO_CACHE_DIR", str(tmp_path))
+    schema = DatasetSchema(
+        domain="test",
+        entity="customers",
+        fields=[FieldSchema("entity_id", "id"), FieldSchema("city", "city", pool_size=20)],
+    )
+    cfg = GenerationConfig(rows=300, seed=4)
+
+    df = generate_clean(schema, cfg)
+
+    assert df["city"].nunique() <= 20
+    assert list((tmp_path / "pools").glob("*.npy"))
+    assert generate_clean(schema, cfg).equals(df)
+
+
+def test_registered_generator_produces_whole_column():
+    @generator.register_generator("iban_test")
+    def _iban(field):
+        return lambda ctx: [f"DE{i:020d}" for i in range(ctx.start, ctx.stop)]
+
+    schema = DatasetSchema(
+        domain="test",
+        entity="accounts",
+        fields=[FieldSchema("entity_id", "id"), FieldSchema("iban", "iban_test"), FieldSchema("n", "int", max_value=5)],
+    )
+    df = generate_clean(schema, GenerationConfig(rows=30, seed=2))
+
+    assert df["iban"].iloc[29] == f"DE{29:020d}"
+    assert df["n"].between(0, 5).all()
+
+
+def test_column_cache_reuses_unchanged_columns(tmp_path, monkeypatch):
+    monkeypatch.setenv("DAPO_CACHE_DIR", str(tmp_path))
+    fields = [FieldSchema("entity_id", "id"), FieldSchema("email", "email"), FieldSchema("n", "int")]
+    cfg = GenerationConfig(rows=80, seed=6, column_cache=True)
+
+    first = generate_clean(DatasetSchema("test", "customers", list(fields)), cfg)
+    uncached = generate_clean(DatasetSchema("test", "customers", list(fields)), GenerationConfig(rows=80, seed=6))
+    assert first.equals(uncached)
+
+    # one more field: only that column is generated, the others come from disk
+    generated = []
+    iter_blocks = generator._iter_blocks
+
+    def spy(schema, config):
+        generated.extend(f.name for f in schema.fields)
+        return iter_blocks(schema, config)
+
+    monkeypatch.setattr(generator, "_iter_blocks", spy)
+    second = generate_clean(DatasetSchema("test", "customers", fields + [FieldSchema("city", "city")]), cfg)
+
+    assert generated == ["city"]
+    assert second[["entity_id", "email", "n"]].equals(first)
+
+    # a replaced generator does not read the columns of the built-in one
+    def sevens(field):
+        return lambda ctx: np.full(ctx.n, 7)
+
+    monkeypatch.setitem(generator._REGISTRY, "int", sevens)
+    generated.clear()
+    third = generate_clean(DatasetSchema("test", "customers", list(fields)), cfg)
+    assert generated == ["n"] and (third["n"] == 7).all()
+
+
+def test_column_cache_tolerates_files_evicted_by_another_run(tmp_path, monkeypatch):
+    store = ColumnCache(max_bytes=10**9, root=str(tmp_path))
+    store.put("a", np.arange(3))
+    store.put("b", np.arange(3))
+
+    # another run removes files between our listdir/load and the stat/utime calls
+    def gone(path, *args, **kwargs):
+        raise FileNotFoundError(path)
+
+    fake_os = types.SimpleNamespace(**{**vars(os), "stat": gone, "utime": gone})
+    monkeypatch.setattr(cache, "os", fake_os)
+    assert list(store.get("a")) == [0, 1, 2]
+    store.put("c", np.arange(3))  # evicts, stat fails for every file
+
+
+def test_ref_fields_draw_parent_keys_per_fanout():
+    schema = load_schema(
+        {
+            "domain": "shop",
+            "entities": [
+                {"entity": "customers", "rows": 40, "fields": ["entity_id", "email"]},
+                {
+                    "entity": "orders",
+                    "fields": [
+                        "entity_id",
+                        {"name": "customer_id", "ref": "customers", "fanout": "fixed"},
+                        {"name": "payer_id", "ref": "customers"},
+                        {"name": "agent_id", "ref": "customers", "fanout": "zipf"},
+                    ],
+                },
+            ],
+        }
+    )
+    schema.bind(default_rows=1000)
+    customers, orders = schema.entities
+    parents = set(generate_clean(customers, GenerationConfig(rows=customers.rows))["entity_id"])
+
+    df = generate_clean(orders, GenerationConfig(rows=orders.rows, seed=3))
+    assert len(df) == 1000
+    for col in ("customer_id", "payer_id", "agent_id"):
+        assert set(df[col]) <= parents
+    assert set(df["customer_id"].value_counts()) == {25}
+    # zipf: the most popular parent has far more children than the mean (25)
+    assert df["agent_id"].value_counts().iloc[0] > 100
+    # same blocks, same keys: chunked generation gives the same foreign keys
+    assert pd.concat(iter_clean_chunks(orders, GenerationConfig(rows=1000, seed=3), 300)).equals(df)
+
+    with pytest.raises(ValueError, match="earlier entity"):
+        load_schema({"entities": [{"entity": "orders", "fields": [{"name": "c", "ref": "customers"}]}]})
@@ -0,0 +1,59 @@
+import numpy as np
+
+from src.config import GenerationConfig
+from src.generator import generate_clean
+from src.history import build_history
+from src.schemas import DatasetSchema, FieldSchema
+
+
+def _schema():
+    return DatasetSchema(
+        domain="test",
+        entity="customers",
+        fields=[
+            FieldSchema("entity_id", "id", pattern="CUST-{seq:05d}"),
+            FieldSchema("email", "email", pool_size=50),
+            FieldSchema("city", "city", pool_size=20),
+            FieldSchema("qty", "int", min_value=1, max_value=9),
+            FieldSchema("status", "enum", values=["new", "ok"]),
+        ],
+    )
+
+
+def test_history_is_sparse_and_latest_is_clean():
+    schema = _schema()
+    cfg = GenerationConfig(rows=500, seed=2, history_snapshots=4, history_change_rate=0.1)
+    clean = generate_clean(schema, cfg)
+    history = build_history(clean, schema, cfg, seed=1)
+
+    # only changed cells are stored; ids never change
+    assert "entity_id" not in history.changes
+    assert 0 < history.n_changes() < 0.2 * 3 * len(clean) * 4
+
+    latest, outdated = history.as_of(clean, np.full(len(clean), history.latest))
+    assert latest.equals(clean) and outdated == {}
+
+
+def test_history_as_of_per_row_snapshot():
+    schema = _schema()
+    cfg = GenerationConfig(rows=400, seed=5, history_snapshots=3, history_change_rate=0.3)
+    clean = generate_clean(schema, cfg)
+    history = build_history(clean, schema, cfg, seed=1)
+
+    oldest, outdated = history.as_of(clean, np.zeros(len(clean), dtype=np.int64))
+    middle, _ = history.as_of(clean, np.ones(len(clean), dtype=np.int64))
+
+    assert oldest.dtypes.equals(clean.dtypes)
+    assert (oldest["entity_id"] == clean["entity_id"]).all()
+    for col in ("email", "city", "qty", "status"):
+        assert outdated[col] == (oldest[col] != clean[col]).sum() > 0
+    # each step back only adds changes
+    assert ((middle != clean).sum().sum()) < ((oldest != clean).sum().sum())
+    assert oldest["qty"].between(1, 9).all()
+    assert set(oldest["status"]) <= {"new", "ok"}
+
+    # mixed versions: row r is read as of versions[r]
+    versions = np.arange(len(clean)) % 3
+    mixed, _ = history.as_of(clean, versions)
+    for v, frame in enumerate([oldest, middle, clean]):
+        assert mixed[versions == v].equals(frame[versions == v])
@@ -0,0 +1,46 @@
+import json
+import sys
+import types
+
+import pytest
+
+from src import instrumentation
+from src.instrumentation import RunRecorder, add_phase_hook, remove_phase_hook, rss_peak_mb
+
+
+def test_recorder_accumulates_phases_and_calls_hooks(tmp_path):
+    seen = []
+    hook = seen.append
+    add_phase_hook(hook)
+    try:
+        rec = RunRecorder()
+        for _ in range(3):
+            with rec.phase("clean_base") as ph:
+                ph.rows = 10
+        with rec.phase("storage", rows=5):
+            pass
+    finally:
+        remove_phase_hook(hook)
+
+    assert [m.phase for m in seen] == ["clean_base"] * 3 + ["storage"]
+    assert rec.phases["clean_base"].rows == 30
+    assert rec.phases["clean_base"].calls == 3
+
+    rec.save(str(tmp_path))
+    data = json.loads((tmp_path / "run_metrics.json").read_text())
+    assert {d["phase"] for d in data} == {"clean_base", "storage"}
+    assert (tmp_path / "run_metrics.csv").exists()
+
+
+@pytest.mark.parametrize("platform,maxrss", [("linux", 2048 * 1024), ("darwin", 2048 * 1024**2)])
+def test_rss_peak_from_getrusage_is_mb_on_every_platform(monkeypatch, platform, maxrss):
+    # no /proc: falls back to getrusage, whose unit differs per platform
+    resource = pytest.importorskip("resource")
+
+    def no_proc(*args, **kwargs):
+        raise OSError("no /proc")
+
+    monkeypatch.setattr(instrumentation, "open", no_proc, raising=False)
+    monkeypatch.setattr(sys, "platform", platform)
+    monkeypatch.setattr(resource, "getrusage", lambda who: types.SimpleNamespace(ru_maxrss=maxrss))
+    assert rss_peak_mb() == 2048
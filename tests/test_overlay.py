@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.overlay import SourceOverlay, SourceSet
+
+
+def _base():
+    return pd.DataFrame(
+        {"name": ["a", "b", "c", "d"], "age": np.array([30, 40, 50, 60], dtype=np.int64)},
+        index=pd.Index([10, 11, 12, 13]),
+    )
+
+
+def test_overlay_patches_without_touching_base():
+    base = _base()
+    view = SourceOverlay.from_frame(base, name="S1")
+    view.set("name", np.array([1]), ["x"])
+    view.set("name", np.array([1, 2]), ["y", None])
+    view.set("age", np.array([0]), None)
+
+    assert view.n_cells() == 3
+    assert list(view.get("name", np.array([0, 1, 2]))) == ["a", "y", None]
+    assert list(view.isna("age")) == [True, False, False, False]
+
+    df = view.materialize()
+    assert list(df.index) == [10, 11, 12, 13]
+    assert df["age"].dtype == np.float64 and np.isnan(df["age"].iloc[0])
+    assert list(base["name"]) == ["a", "b", "c", "d"] and base["age"].dtype == np.int64
+
+
+def test_take_concat_and_source_set():
+    base = _base()
+    a = SourceOverlay.from_frame(base, name="S1")
+    a.set("name", np.array([3]), ["z"])
+    dups = a.take(np.array([3, 3, 0]))
+    assert list(dups.index) == [13, 13, 10] and dups.n_cells() == 2
+
+    a = a.append(dups)
+    b = SourceOverlay(base, np.array([2, 0]), names={"name": "Name"}, name="S2", record_offset=5)
+    sources = SourceSet({"S1": a, "S2": b})
+
+    s2 = sources["S2"]
+    assert list(s2.columns) == ["Name", "age", "record_id"]
+    assert list(s2["record_id"]) == ["S2-000000005", "S2-000000006"]
+    stacked = sources.stacked()
+    assert sources.n_rows() == len(stacked) == 9
+    assert list(stacked["name"].iloc[:7]) == ["a", "b", "c", "z", "z", "z", "a"]
+    assert stacked["record_id"].iloc[-1] == "S2-000000006"
+
+    with pytest.raises(ValueError):
+        SourceOverlay.concat([a, SourceOverlay.from_frame(_base())])
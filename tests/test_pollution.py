@@ -0,0 +1,210 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.schemas import DatasetSchema, FieldSchema, _norm_col
+from src.config import GenerationConfig
+from src.generator import generate_clean
+from src import pollution
+from src.pollution import SourceBuilder, create_sources
+
+
+def _schema():
+    return DatasetSchema(
+        domain="test",
+        entity="customers",
+        fields=[
+            FieldSchema("entity_id", "id", pattern="CUST-{seq:05d}"),
+            FieldSchema("email", "email"),
+            FieldSchema("city", "city"),
+            FieldSchema("amount", "money", min_value=1, max_value=100),
+        ],
+    )
+
+
+def test_create_sources_reproducible_for_seed():
+    schema = _schema()
+    cfg = GenerationConfig(rows=200, seed=7, typo_rate=0.2, missing_rate=0.1)
+    clean = generate_clean(schema, cfg)
+
+    srcs_a, gold_a = create_sources(schema, clean, cfg)
+    srcs_b, gold_b = create_sources(schema, clean, cfg)
+
+    for name in srcs_a:
+        assert srcs_a[name].equals(srcs_b[name])
+    assert gold_a.mapping.equals(gold_b.mapping)
+
+
+def test_source_builder_chunks_continue_record_ids():
+    schema = _schema()
+    cfg = GenerationConfig(rows=300, seed=3, duplicate_rate=0.3)
+    clean = generate_clean(schema, cfg)
+
+    builder = SourceBuilder(schema, cfg, reservoir_size=100)
+    first, _ = builder.process(clean.iloc[:150])
+    second, gold = builder.process(clean.iloc[150:])
+
+    ids = list(first["S1"]["record_id"]) + list(second["S1"]["record_id"])
+    assert ids == [f"S1-{k:09d}" for k in range(len(ids))]
+    assert set(gold.mapping["record_id"]) >= set(second["S1"]["record_id"])
+
+    # duplicates in the second chunk may point back into the first one
+    early = set(clean["entity_id"].iloc[:150])
+    assert second["S1"]["entity_id"].isin(early).any()
+
+
+def test_history_sources_and_copies_use_separate_streams(monkeypatch):
+    schema = _schema()
+    cfg = GenerationConfig(rows=200, seed=0, n_sources=3, copy_rate=0.1)
+    clean = generate_clean(schema, cfg)
+
+    seeds = []
+    derive = GenerationConfig.derive_seed
+    monkeypatch.setattr(GenerationConfig, "derive_seed", lambda self, *key: seeds.append(derive(self, *key)) or seeds[-1])
+    builder = SourceBuilder(schema, cfg)
+    for chunk in (clean.iloc[:100], clean.iloc[100:]):
+        builder.process(chunk)
+
+    # per chunk: history, 3 sources, 2 copies -- no two of them may share a stream
+    assert len(seeds) == 12 and len(set(seeds)) == 12
+
+
+def test_sources_independent_of_worker_count(monkeypatch):
+    monkeypatch.setattr(pollution, "_PARALLEL_MIN_ROWS", 0)  # small test chunks still go to the pool
+    schema = _schema()
+    clean = generate_clean(schema, GenerationConfig(rows=120, seed=9))
+
+    serial, gold_serial = create_sources(schema, clean, GenerationConfig(rows=120, seed=9, n_sources=4))
+    parallel, gold_parallel = create_sources(schema, clean, GenerationConfig(rows=120, seed=9, n_sources=4, workers=3))
+
+    for name in serial:
+        assert serial[name].equals(parallel[name])
+    assert gold_serial.mapping.equals(gold_parallel.mapping)
+
+
+def test_streaming_with_workers_matches_serial(monkeypatch):
+    monkeypatch.setattr(pollution, "_PARALLEL_MIN_ROWS", 0)
+    schema = _schema()
+    clean = generate_clean(schema, GenerationConfig(rows=240, seed=4))
+
+    def stream(workers):
+        cfg = GenerationConfig(rows=240, seed=4, n_sources=3, duplicate_rate=0.3, workers=workers)
+        chunks, pools = [], set()
+        with SourceBuilder(schema, cfg, reservoir_size=40) as builder:
+            for lo in range(0, 240, 60):
+                chunks.append(builder.process(clean.iloc[lo : lo + 60]))
+                pools.add(builder._pool)
+        assert builder._pool is None  # shut down on exit
+        return chunks, pools
+
+    serial, no_pool = stream(1)
+    parallel, pools = stream(3)
+
+    assert no_pool == {None} and len(pools) == 1 and None not in pools  # one pool for all chunks
+    for (s_srcs, s_gold), (p_srcs, p_gold) in zip(serial, parallel):
+        for name in s_srcs:
+            assert s_srcs[name].equals(p_srcs[name])
+        assert s_gold.mapping.equals(p_gold.mapping)
+
+
+def test_gold_standard_lookups_and_export():
+    from src.pollution import GoldStandard
+
+    schema = _schema()
+    cfg = GenerationConfig(rows=150, seed=5, missing_rate=0.2, typo_rate=0.2)
+    clean = generate_clean(schema, cfg)
+    srcs, gold = create_sources(schema, clean, cfg)
+
+    mapping = gold.mapping
+    assert len(gold) == sum(len(df) for df in srcs.values())
+    assert list(mapping["record_id"]) == [r for df in srcs.values() for r in df["record_id"]]
+    # gold points to the clean entity, even where the source value got polluted
+    assert mapping["entity_id"].isin(clean["entity_id"]).all()
+
+    rows = gold.records_for_entity("CUST-00007")
+    assert set(mapping["entity_id"].iloc[rows]) == {"CUST-00007"}
+    assert list(rows) == list(gold.records_for_entity(7))
+
+    pairs = gold.true_match_pairs()
+    assert len(pairs) == gold.n_true_matches()
+    assert (gold.entity_ordinals[pairs[:, 0]] == gold.entity_ordinals[pairs[:, 1]]).all()
+    assert (pairs[:, 0] < pairs[:, 1]).all()
+
+    assert GoldStandard.from_mapping(mapping).mapping.equals(mapping)
+
+
+@pytest.mark.parametrize("backend", ["python", "arrow"])
+def test_string_backend_survives_pollution_and_integration(backend):
+    if backend == "arrow":
+        pytest.importorskip("pyarrow")
+    from src.etl import build_integrated
+    from src.quality import QualityTracker
+
+    schema = _schema()
+    schema.fields.append(FieldSchema("status", "enum", values=["new", "ok"]))
+    cfg = GenerationConfig(rows=200, seed=4, missing_rate=0.1, typo_rate=0.2, outdated_rate=0.2, string_backend=backend)
+    clean = generate_clean(schema, cfg)
+    tracker = QualityTracker()
+    srcs, gold = create_sources(schema, clean, cfg, tracker=tracker)
+    integrated = build_integrated(srcs, schema)
+
+    def col(df, name):
+        return df[next(c for c in df.columns if _norm_col(c) == name)]
+
+    def is_text(s):
+        if backend == "python":
+            return s.dtype == object
+        return isinstance(s.dtype, pd.StringDtype) and s.dtype.storage == "pyarrow"
+
+    for df in [clean, *srcs.values()]:
+        assert is_text(col(df, "email"))
+        assert isinstance(col(df, "status").dtype, pd.CategoricalDtype) == (backend == "arrow")
+    assert is_text(integrated["city"])
+    assert integrated["email"].isna().sum() == 0
+    assert isinstance(integrated["status"].dtype, pd.CategoricalDtype) == (backend == "arrow")
+    assert {"new", "ok", "UNKNOWN"} <= set(integrated["status"])
+
+    # missing counts follow the nulls, whatever the storage
+    per_column = tracker.columns_frame()
+    for name, df in srcs.items():
+        assert per_column.loc[per_column["source"] == name, "missing_total"].sum() == df.isna().sum().sum()
+    assert len(gold) == len(integrated)
+
+
+@pytest.mark.parametrize("kind", ["fixed", "geometric", "zipf"])
+def test_duplicate_clusters_keep_rate_and_entity(kind):
+    schema = _schema()
+    cfg = GenerationConfig(
+        rows=400, seed=8, n_sources=1, duplicate_rate=0.5, copy_rate=0.0,
+        duplicate_cluster=kind, duplicate_cluster_size=3, duplicate_cluster_max=20,
+    )
+    clean = generate_clean(schema, cfg)
+    _, gold = create_sources(schema, clean, cfg)
+
+    # duplicate_rate is still the share of extra rows, now spread over clusters
+    assert len(gold) == 600
+    copies = np.bincount(gold.entity_ordinals, minlength=400) - 1
+    assert copies.sum() == 200 and copies.max() <= 20
+    if kind == "fixed":
+        assert set(copies) == {0, 2, 3}  # 66 clusters of 3, the last one trimmed to 2
+    else:
+        assert copies.max() > 1
+
+
+def test_divergence_operators():
+    from src.overlay import SourceOverlay
+    from src.pollution import _inject_duplicates
+
+    df = pd.DataFrame(
+        {"entity_id": [f"E{k}" for k in range(300)], "name": ["Port Andrew"] * 300, "city": ["Berlin"] * 300},
+        dtype=object,
+    )
+    cfg = GenerationConfig(rows=300, duplicate_rate=1.0, duplicate_divergence=1.0, duplicate_operators=("abbreviate", "swap"))
+    out = _inject_duplicates(SourceOverlay.from_frame(df), cfg, np.random.default_rng(0), keep=["entity_id"])
+    out = out.materialize().iloc[300:]
+
+    assert (out["entity_id"] == df["entity_id"].loc[out.index]).all()
+    assert set(out["name"]) <= {"Port Andrew", "Port A.", "Berlin", "Ber."}
+    assert {"Port A.", "Berlin"} <= set(out["name"])
+    with pytest.raises(ValueError):
+        _inject_duplicates(SourceOverlay.from_frame(df), GenerationConfig(rows=3, duplicate_cluster="poisson"), np.random.default_rng(0))
@@ -35,4 +35,46 @@ def test_compute_quality_metrics_basic():
 
     # Basic sanity: S1 has duplicates
     s1_dup = float(q.loc[q["source"] == "S1", "duplicate_rate"].iloc[0])
-    assert s1_dup > 0
\ No newline at end of file
+    assert s1_dup > 0
+
+
+def test_compute_quality_metrics_matches_camel_case_entity_column():
+    import pandas as pd
+
+    sources = {"S2": pd.DataFrame({"entityId": ["A", "A", "B"], "email": ["a", "b", "c"]})}
+    q = compute_quality_metrics(sources, primary_entity_id="entity_id")
+    assert float(q["duplicate_rate"].iloc[0]) > 0
+
+
+def test_quality_tracker_counts_match_sources():
+    from src.config import GenerationConfig
+    from src.generator import generate_clean
+    from src.pollution import create_sources
+    from src.quality import QualityTracker
+    from src.schemas import DatasetSchema, FieldSchema
+
+    schema = DatasetSchema(
+        domain="test",
+        entity="orders",
+        fields=[
+            FieldSchema("entity_id", "id", pattern="ORD-{seq:06d}"),
+            FieldSchema("email", "email"),
+            FieldSchema("amount", "money"),
+        ],
+        primary_entity_id="entity_id",
+    )
+    cfg = GenerationConfig(rows=500, n_sources=3, seed=1)
+    tracker = QualityTracker()
+    sources, _ = create_sources(schema, generate_clean(schema, cfg), cfg, tracker=tracker)
+
+    summary = tracker.to_frame().set_index("source")
+    per_column = tracker.columns_frame()
+    reference = compute_quality_metrics(sources, "entity_id").set_index("source")
+
+    for name, df in sources.items():
+        assert summary.loc[name, "rows"] == len(df)
+        assert per_column.loc[per_column["source"] == name, "missing_total"].sum() == df.isna().sum().sum()
+        assert summary.loc[name, "missing_rate"] == reference.loc[name, "missing_rate"]
+    # every source has duplicates, including the camelCase/UPPER ones
+    assert (summary["duplicate_rate"] > 0).all()
+    assert set(per_column["column"]) == {"entity_id", "email", "amount"}
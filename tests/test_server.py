@@ -0,0 +1,69 @@
+import asyncio
+
+from src.config import GenerationConfig
+from src.schemas import DatasetSchema, FieldSchema
+from src.server import RecordServer, fetch
+
+
+def _server():
+    schema = DatasetSchema(
+        domain="test",
+        entity="customers",
+        fields=[
+            FieldSchema("entity_id", "id", pattern="CUST-{seq:05d}"),
+            FieldSchema("city", "enum", values=["Berlin", "Paris", "Lyon"]),
+            FieldSchema("amount", "money", min_value=1, max_value=100),
+        ],
+    )
+    return RecordServer(schema, GenerationConfig(rows=40, n_sources=2, chunk_size=15))
+
+
+async def _session(server, *targets):
+    srv = await server.start("127.0.0.1", 0)
+    port = srv.sockets[0].getsockname()[1]
+    try:
+        return await asyncio.gather(*(fetch("127.0.0.1", port, t) for t in targets))
+    finally:
+        srv.close()
+        await srv.wait_closed()
+        server.close()
+
+
+def test_stream_polluted_records_with_matching_gold_rows():
+    server = _server()
+    server.warm()
+    polluted, gold, again, csv = asyncio.run(
+        _session(
+            server,
+            "/stream/polluted?source=S2&seed=3",
+            "/stream/gold?source=S2&seed=3",
+            "/stream/polluted?source=S2&seed=3",
+            "/stream/clean?format=csv&chunk=7",
+        )
+    )
+
+    assert polluted.status == gold.status == 200
+    assert polluted.headers["content-type"] == "application/x-ndjson"
+    records = polluted.records()
+    assert len(records) >= 40
+    assert [r["record_id"] for r in records] == [g["record_id"] for g in gold.records()]
+    # concurrent requests with the same params get the same records
+    assert again.body == polluted.body
+
+    lines = csv.body.decode().splitlines()
+    assert lines[0] == "entity_id,city,amount" and len(lines) == 41
+
+
+def test_bad_requests_and_metrics():
+    server = _server()
+    missing, bad_param, bad_kind, ok = asyncio.run(
+        _session(server, "/stream/polluted", "/stream/clean?nope=1", "/stream/raw", "/stream/integrated?source=S1")
+    )
+
+    assert (missing.status, bad_param.status, bad_kind.status, ok.status) == (400, 400, 404, 200)
+    assert "source" in missing.json()["error"]
+    assert {r["source"] for r in ok.records()} == {"S1"}
+
+    metrics = server.metrics()
+    assert metrics["requests"] == 4 and metrics["errors"] == 3
+    assert metrics["rows"] == len(ok.records()) and metrics["latency"]["p50_ms"] > 0
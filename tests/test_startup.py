@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# cumulative import time of src.main in ms; override for slow CI machines
+IMPORT_BUDGET_MS = float(os.environ.get("DAPO_IMPORT_BUDGET_MS", "400"))
+HEAVY = ("pandas", "numpy", "faker", "sqlalchemy", "psycopg2", "pyarrow")
+
+
+def _python(code: str, *flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+
+
+def _loaded(code: str) -> set:
+    out = _python(code + "\nimport sys\nprint(' '.join(sys.modules))").stdout.split()
+    return {m.split(".")[0] for m in out} & set(HEAVY)
+
+
+def test_cli_import_stays_light():
+    proc = _python("import src.main", "-X", "importtime")
+    # "import time: self [us] | cumulative | imported package"
+    timings = {}
+    for line in proc.stderr.splitlines():
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[1].isdigit():
+            timings[parts[2]] = int(parts[1])
+
+    assert not [m for m in timings if m.split(".")[0] in HEAVY]
+    assert timings["src.main"] / 1000 < IMPORT_BUDGET_MS
+
+
+def test_csv_run_does_not_load_postgres_stack(tmp_path):
+    code = (
+        "from src.config import GenerationConfig\n"
+        "from src.instrumentation import RunRecorder\n"
+        "from src.pipeline import run_in_memory\n"
+        "from src.schemas import load_schema\n"
+        "schema = load_schema({'domain': 'x', 'entity': 'orders', 'fields': ['entity_id', 'email']})\n"
+        f"run_in_memory(schema, GenerationConfig(rows=20), {str(tmp_path)!r}, 'csv', RunRecorder())\n"
+    )
+    loaded = _loaded(code)
+    assert "sqlalchemy" not in loaded and "psycopg2" not in loaded
+    assert (tmp_path / "integrated.csv").exists()
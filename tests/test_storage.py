@@ -0,0 +1,111 @@
+import pandas as pd
+import pytest
+
+from src.schemas import DatasetSchema, FieldSchema
+from src.storage import _CsvStream, _pg_columns
+
+
+def test_pg_columns_follow_schema_across_name_variants():
+    schema = DatasetSchema(
+        domain="test",
+        entity="orders",
+        fields=[
+            FieldSchema("entity_id", "id"),
+            FieldSchema("unit_price", "money"),
+            FieldSchema("qty", "int"),
+            FieldSchema("order_date", "date"),
+        ],
+    )
+    df = pd.DataFrame(
+        {
+            "ENTITY_ID": ["A", "B"],
+            "unitPrice": [1.5, None],
+            "QTY": [1.0, None],  # int column with missing values -> float in pandas
+            "orderDate": ["2024-01-01", "2024-0x-02"],
+            "record_id": ["S1-1", "S1-2"],
+        }
+    )
+
+    assert _pg_columns(df, schema) == [
+        ("ENTITY_ID", "text"),
+        ("unitPrice", "numeric(14, 2)"),
+        ("QTY", "bigint"),
+        ("orderDate", "text"),
+        ("record_id", "text"),
+    ]
+
+
+def test_csv_stream_renders_all_batches():
+    df = pd.DataFrame({"a": range(7), "b": list("abcdefg")})
+    stream = _CsvStream(df, batch_rows=3)
+
+    data = b""
+    while True:
+        part = stream.read(5)
+        if not part:
+            break
+        data += part
+
+    assert data == df.to_csv(index=False, header=False).encode()
+
+
+def test_parquet_bundle_uses_schema_types(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    from src.pollution import GoldStandard
+    from src.storage import save_parquet_bundle
+
+    schema = DatasetSchema(
+        domain="test",
+        entity="orders",
+        fields=[FieldSchema("entity_id", "id"), FieldSchema("amount", "money"), FieldSchema("status", "enum")],
+    )
+    s1 = pd.DataFrame({"entity_id": ["A", "B"], "amount": [1.25, None], "status": ["ok", "new"], "record_id": ["S1-1", "S1-2"]})
+    integrated = s1.assign(source="S1")
+    gold = GoldStandard.from_mapping(pd.DataFrame({"source": ["S1", "S1"], "record_id": ["S1-1", "S1-2"], "entity_id": ["A", "B"]}))
+    quality = pd.DataFrame({"source": ["S1"], "rows": [2]})
+
+    save_parquet_bundle(str(tmp_path), {"S1": s1}, integrated, gold, quality, schema=schema, partition_by_source=True)
+
+    types = {f.name: str(f.type) for f in pq.read_schema(tmp_path / "S1.parquet")}
+    assert types["amount"] == "decimal128(14, 2)"
+    assert types["status"].startswith("dictionary")
+    assert (tmp_path / "integrated" / "source=S1" / "part-0.parquet").exists()
+
+
+def _bundle():
+    from src.pollution import GoldStandard
+
+    s1 = pd.DataFrame({"entity_id": ["A", "B"], "amount": [1.25, None], "record_id": ["S1-1", "S1-2"]})
+    gold = GoldStandard.from_mapping(pd.DataFrame({"source": ["S1", "S1"], "record_id": ["S1-1", "S1-2"], "entity_id": ["A", "B"]}))
+    return {"S1": s1, "S2": s1.assign(record_id=["S2-1", "S2-2"])}, s1.assign(source="S1"), gold
+
+
+def test_background_writer_writes_compressed_csv_chunks(tmp_path):
+    from src.storage import BackgroundWriter, CsvBundleWriter, load_bundle
+
+    sources, integrated, gold = _bundle()
+    writer = BackgroundWriter(CsvBundleWriter(str(tmp_path), compression="gzip", threads=2), max_pending=1)
+    for _ in range(3):
+        writer.write_sources(sources)
+        writer.write_results(integrated, gold)
+    writer.close(pd.DataFrame({"rows": [6]}))
+
+    assert len(pd.read_csv(tmp_path / "S2.csv.gz")) == 6
+    loaded, loaded_gold = load_bundle(str(tmp_path))
+    assert len(loaded) == len(loaded_gold.mapping) == 6
+
+
+def test_background_writer_raises_writer_errors(tmp_path):
+    from src.storage import BackgroundWriter, CsvBundleWriter
+
+    class Failing(CsvBundleWriter):
+        def write_results(self, integrated, gold):
+            raise OSError("disk full")
+
+    sources, integrated, gold = _bundle()
+    writer = BackgroundWriter(Failing(str(tmp_path)))
+    writer.write_sources(sources)
+    writer.write_results(integrated, gold)
+    with pytest.raises(OSError, match="disk full"):
+        writer.close(pd.DataFrame({"rows": [2]}))
+    assert not (tmp_path / "quality_metrics.csv").exists()
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from src.config import GenerationConfig, TYPO_ERRORS
+from src.generator import generate_clean
+from src.pollution import create_sources
+from src.quality import QualityTracker
+from src.schemas import DatasetSchema, FieldSchema
+from src.typos import TypoModel, parse_typo_weights
+
+NAMES = np.array(["Müller", "Philipp", "Straße", "Beaulieu", "", "Noël Dupont", "x"], dtype=object)
+
+
+def _apply(error, values=NAMES, keyboard="qwertz", seed=0):
+    model = TypoModel.from_weights({error: 1}, keyboard)
+    out, kinds = model.apply(values, np.random.default_rng(seed))
+    return out, model.counts(kinds)
+
+
+def test_error_types_edit_one_place():
+    inserted, counts = _apply("insert")
+    assert [len(v) for v in inserted] == [len(v) + (len(v) > 0) for v in NAMES]
+    assert counts == {"insert": 6} and inserted[4] == ""
+
+    deleted, counts = _apply("delete")
+    # single chars cannot lose their only char: they get an insertion instead
+    assert counts == {"delete": 5, "insert": 1}
+    assert [len(v) for v in deleted[:4]] == [len(v) - 1 for v in NAMES[:4]]
+
+    swapped, _ = _apply("transpose")
+    assert all(sorted(a) == sorted(b) and a != b for a, b in zip(swapped[:4], NAMES[:4]))
+
+    # "ph" and "ß" are the only phonetic spots of these names; case carries over
+    assert list(_apply("phonetic", np.array(["Philipp", "Straße", "PHILIPP"]))[0]) == ["Filipp", "Strasse", "FILIPP"]
+    assert list(_apply("ocr", np.array(["vv", "0", "8"]))[0]) == ["w", "O", "B"]
+
+    # same seed, same typos
+    assert (_apply("keyboard", seed=3)[0] == _apply("keyboard", seed=3)[0]).all()
+
+
+@pytest.mark.parametrize("keyboard,neighbours", [("qwertz", "qwsy"), ("azerty", "zqé&"), ("qwerty", "qwsz")])
+def test_keyboard_errors_follow_the_layout(keyboard, neighbours):
+    out, _ = _apply("keyboard", np.array(["a"] * 200 + ["A"] * 200), keyboard)
+    assert set(out[:200]) == set(neighbours)
+    assert set(out[200:]) == set(neighbours.upper())
+
+
+def test_weights_are_validated_and_parsed():
+    assert parse_typo_weights("keyboard=3, delete=1") == {"keyboard": 3.0, "delete": 1.0}
+    with pytest.raises(ValueError):
+        parse_typo_weights("keyboard")
+    with pytest.raises(ValueError):
+        TypoModel.from_weights({"smudge": 1})
+    with pytest.raises(ValueError):
+        TypoModel.from_weights({"insert": 0})
+    with pytest.raises(ValueError):
+        TypoModel.from_weights({"insert": 1}, keyboard="dvorak")
+
+
+def test_quality_counts_typos_per_error_type():
+    schema = DatasetSchema(
+        domain="test",
+        entity="customers",
+        fields=[
+            FieldSchema("entity_id", "id", pattern="CUST-{seq:05d}"),
+            FieldSchema("name", "name", pool_size=50),
+            FieldSchema("city", "city", pool_size=20),
+        ],
+    )
+    cfg = GenerationConfig(rows=400, seed=3, typo_rate=0.5, typo_weights={"keyboard": 1, "ocr": 1})
+    tracker = QualityTracker()
+    create_sources(schema, generate_clean(schema, cfg), cfg, tracker=tracker)
+
+    per_column = tracker.columns_frame()
+    by_type = per_column[[f"typo_{e}" for e in TYPO_ERRORS]]
+    assert (by_type.sum(axis=1) == per_column["typos"]).all()
+    assert by_type["typo_keyboard"].sum() > 0 and by_type["typo_ocr"].sum() > 0
+    assert by_type[["typo_delete", "typo_transpose", "typo_phonetic"]].sum().sum() == 0